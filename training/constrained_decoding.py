@@ -0,0 +1,312 @@
+"""
+Grammar-constrained decoding of probability outcome lists.
+
+OutcomeGrammar is a character-level DFA for the outcome schema
+
+    [{"event": "...", "probability": 0.42, "timeframe_months": 6}, ...]
+
+with "event" and "probability" required (in that order), "timeframe_months"
+optional, 1..max_items objects and probabilities restricted to [0, 1].
+Whitespace is allowed between tokens, so both json.dumps output and
+pretty-printed arrays are accepted.
+
+JsonConstraint turns the DFA into a HuggingFace logits processor: at each
+step only tokens whose whole text keeps the DFA alive are allowed, and once
+the closing bracket is produced only EOS is. The allowed-token mask of a DFA
+state is computed once (by walking the vocabulary's token strings in sorted
+order, pruning every token that shares a dead prefix) and cached, so
+steady-state decoding costs one cached-mask lookup per row and step.
+
+complete_outcomes salvages output cut off by max_new_tokens: the complete
+objects are kept and the array is closed.
+"""
+
+import bisect
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# DFA state: (objects completed, element position, sub-state within the element)
+State = Tuple[int, int, Any]
+
+# Grammar elements besides single literal characters
+WS = "ws"              # Optional whitespace
+STRING = "string"      # Non-empty JSON string, quotes included
+PROBABILITY = "prob"   # Number in [0, 1]
+INTEGER = "int"        # Non-negative integer
+NEXT_OBJECT = "next"   # ',' (another object) or ']' (done)
+
+WHITESPACE = " \t\n\r"
+HEX = "0123456789abcdefABCDEF"
+
+
+class OutcomeGrammar:
+    """Character-level DFA for a JSON array of outcome objects"""
+
+    def __init__(self, max_items: int = 5, max_decimals: int = 6, max_int_digits: int = 3):
+        """
+        Args:
+            max_items: Maximum number of outcome objects
+            max_decimals: Maximum digits after a probability's decimal point
+            max_int_digits: Maximum digits of timeframe_months
+        """
+        self.max_items = max_items
+        self.max_decimals = max_decimals
+        self.max_int_digits = max_int_digits
+
+        seq: List[Any] = [WS, "[", WS]
+        self.object_start = len(seq)
+        seq += ["{", WS, *'"event"', WS, ":", WS, STRING, WS, ",", WS,
+                *'"probability"', WS, ":", WS, PROBABILITY, WS]
+        # '}' ends the object; ',' starts the optional timeframe_months field
+        self.after_probability = len(seq)
+        seq.append(None)
+        self.timeframe = len(seq)
+        seq += [WS, *'"timeframe_months"', WS, ":", WS, INTEGER, WS, "}"]
+        self.object_end = len(seq)
+        seq += [WS, NEXT_OBJECT]
+        self.done = len(seq)
+        seq[self.after_probability] = {"}": self.object_end, ",": self.timeframe}
+        self.seq = seq
+
+        self.initial: State = (0, 0, None)
+
+    def is_done(self, state: Optional[State]) -> bool:
+        return state is not None and state[1] == self.done
+
+    def is_object_end(self, state: Optional[State]) -> bool:
+        """Just after an object's closing brace"""
+        return state is not None and state[1] == self.object_end and state[2] is None
+
+    def step(self, state: State, ch: str) -> Optional[State]:
+        """State after consuming ch, or None if ch is not allowed"""
+        items, pos, sub = state
+        if pos == self.done:
+            return None
+        element = self.seq[pos]
+
+        if element == WS:
+            if ch in WHITESPACE:
+                return state
+            return self.step((items, pos + 1, None), ch)
+
+        if element == STRING:
+            return self._step_string(items, pos, sub, ch)
+
+        if element == PROBABILITY or element == INTEGER:
+            nxt = self._step_number(element, sub, ch)
+            if nxt is not None:
+                return (items, pos, nxt)
+            if self._number_complete(element, sub):
+                return self.step((items, pos + 1, None), ch)
+            return None
+
+        if element == NEXT_OBJECT:
+            if ch == "]":
+                return (items + 1, self.done, None)
+            if ch == "," and items + 1 < self.max_items:
+                return (items + 1, self.object_start - 1, None)  # The WS before '{'
+            return None
+
+        if isinstance(element, dict):
+            target = element.get(ch)
+            return None if target is None else (items, target, None)
+
+        return (items, pos + 1, None) if ch == element else None
+
+    def _step_string(self, items: int, pos: int, sub: Any, ch: str) -> Optional[State]:
+        # sub: None (expect opening quote), 'empty', 'body', 'escape', or hex digits left
+        if sub is None:
+            return (items, pos, "empty") if ch == '"' else None
+        if sub == "escape":
+            if ch == "u":
+                return (items, pos, 4)
+            return (items, pos, "body") if ch in '"\\/bfnrt' else None
+        if isinstance(sub, int):
+            if ch not in HEX:
+                return None
+            return (items, pos, sub - 1 if sub > 1 else "body")
+        if ch == '"':
+            return (items, pos + 1, None) if sub == "body" else None
+        if ch == "\\":
+            return (items, pos, "escape")
+        if ord(ch) < 0x20:
+            return None
+        return (items, pos, "body")
+
+    def _step_number(self, element: str, sub: Any, ch: str) -> Any:
+        """Next number sub-state, or None if ch does not extend the number"""
+        if element == INTEGER:
+            digits = sub or 0
+            if ch.isdigit() and ch.isascii() and digits < self.max_int_digits:
+                return digits + 1
+            return None
+
+        # sub: None, then (leading digit, decimals or None before the point)
+        if sub is None:
+            return (ch, None) if ch in "01" else None
+        lead, decimals = sub
+        if decimals is None:
+            return (lead, 0) if ch == "." else None
+        if decimals < self.max_decimals and (ch == "0" or (lead == "0" and ch in "123456789")):
+            return (lead, decimals + 1)
+        return None
+
+    def _number_complete(self, element: str, sub: Any) -> bool:
+        if element == INTEGER:
+            return bool(sub)
+        return sub is not None and sub[1] != 0
+
+    def run(self, text: str, state: Optional[State] = None) -> Optional[State]:
+        """State after consuming text (None if it leaves the grammar)"""
+        state = self.initial if state is None else state
+        for ch in text:
+            state = self.step(state, ch)
+            if state is None:
+                return None
+        return state
+
+
+def complete_outcomes(text: str, grammar: Optional[OutcomeGrammar] = None) -> Optional[str]:
+    """
+    The longest valid outcome array in a (possibly truncated) generation
+
+    Returns the text up to the closing bracket if the array is complete, the
+    complete objects closed with ']' if generation stopped mid-object, or
+    None if the text leaves the grammar before the first object ends.
+    """
+    grammar = grammar or OutcomeGrammar()
+    state, last_object_end = grammar.initial, None
+    for i, ch in enumerate(text):
+        state = grammar.step(state, ch)
+        if state is None:
+            break
+        if grammar.is_done(state):
+            return text[:i + 1]
+        if grammar.is_object_end(state):
+            last_object_end = i + 1
+    if last_object_end is None:
+        return None
+    return text[:last_object_end] + "]"
+
+
+class JsonConstraint:
+    """
+    Token-level view of an OutcomeGrammar for one tokenizer
+
+    Holds the decoded vocabulary and the per-state allowed-token cache;
+    build once per tokenizer and call processor() for every generate call.
+    """
+
+    def __init__(self, tokenizer, grammar: Optional[OutcomeGrammar] = None):
+        self.grammar = grammar or OutcomeGrammar()
+        self.eos_token_id = tokenizer.eos_token_id
+
+        special = set(tokenizer.all_special_ids)
+        self.token_text: Dict[int, str] = {}
+        entries = []
+        for token_id in range(len(tokenizer)):
+            if token_id in special:
+                continue
+            text = tokenizer.decode([token_id])
+            if text:
+                self.token_text[token_id] = text
+                entries.append((text, token_id))
+        entries.sort()
+        self._texts = [text for text, _ in entries]
+        self._ids = [token_id for _, token_id in entries]
+
+        self._allowed: Dict[State, List[int]] = {}
+        self._masks: Dict[Tuple[State, Any, int], Any] = {}
+
+    def allowed_tokens(self, state: State) -> List[int]:
+        """Ids of tokens whose text keeps the DFA alive from state"""
+        if state in self._allowed:
+            return self._allowed[state]
+
+        step, texts = self.grammar.step, self._texts
+        allowed = []
+        # states[k]: DFA state after the first k characters of prev
+        prev, states = "", [state]
+        i = 0
+        while i < len(texts):
+            text = texts[i]
+            k = min(len(os.path.commonprefix((prev, text))), len(states) - 1)
+            del states[k + 1:]
+            current = states[k]
+            for j in range(k, len(text)):
+                current = step(current, text[j])
+                if current is None:
+                    # Every later token starting with text[:j + 1] dies here too
+                    i = bisect.bisect_left(texts, text[:j + 1] + "\U0010ffff", i + 1)
+                    prev = text[:j]
+                    break
+                states.append(current)
+            else:
+                allowed.append(self._ids[i])
+                prev = text
+                i += 1
+
+        self._allowed[state] = allowed
+        return allowed
+
+    def mask(self, state: Optional[State], vocab_size: int, device: Any):
+        """Boolean mask of allowed tokens (EOS only once done or off-grammar)"""
+        import torch
+
+        key = (state, device, vocab_size)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = torch.zeros(vocab_size, dtype=torch.bool)
+            if state is None or self.grammar.is_done(state):
+                mask[self.eos_token_id] = True
+            else:
+                allowed = self.allowed_tokens(state)
+                if allowed:
+                    mask[torch.tensor(allowed, dtype=torch.long)] = True
+            mask = mask.to(device)
+            self._masks[key] = mask
+        return mask
+
+    def processor(self) -> "JsonLogitsProcessor":
+        """A fresh logits processor (row states are per generate call)"""
+        return JsonLogitsProcessor(self)
+
+
+class JsonLogitsProcessor:
+    """Masks logits to tokens allowed by a JsonConstraint, tracking each row's DFA state"""
+
+    def __init__(self, constraint: JsonConstraint):
+        self.constraint = constraint
+        self.states: Optional[List[Optional[State]]] = None
+
+    def __call__(self, input_ids, scores):
+        import torch
+
+        grammar = self.constraint.grammar
+        if self.states is None:
+            # First step: nothing generated yet
+            self.states = [grammar.initial] * input_ids.shape[0]
+        else:
+            for row, token_id in enumerate(input_ids[:, -1].tolist()):
+                state = self.states[row]
+                if state is None or grammar.is_done(state):
+                    continue
+                self.states[row] = grammar.run(self.constraint.token_text.get(token_id, ""), state)
+
+        allowed = torch.stack([
+            self.constraint.mask(state, scores.shape[-1], scores.device) for state in self.states
+        ])
+        return scores.masked_fill(~allowed, float("-inf"))
+
+
+def generation_kwargs(constraint: Optional[JsonConstraint]) -> Dict[str, Any]:
+    """generate() kwargs applying a constraint (empty when constraint is None)"""
+    if constraint is None:
+        return {}
+    from transformers import LogitsProcessorList
+
+    return {
+        "logits_processor": LogitsProcessorList([constraint.processor()]),
+        "eos_token_id": constraint.eos_token_id,
+    }
@@ -3,14 +3,24 @@ Alternative Generator: Create counterfactual events
 
 For each depth level, generate 3 plausible alternatives that COULD have
 happened but didn't.
+
+The async path runs many cases at once (bounded by Config.ALTERNATIVE_WORKERS,
+with request rates enforced by the shared OpenRouter token bucket). With
+Config.BATCH_ALTERNATIVES, all depths of a case are requested in a single
+prompt instead of one call per level.
 """
 
 import sys
 sys.path.append('..')
 
-from typing import List, Dict
+import asyncio
+from typing import List, Dict, Optional
 from config import config
-from utils import llm_client, parse_json_response, save_checkpoint, load_checkpoint
+from journal import Journal
+from utils import (
+    llm_client, async_llm_client, parse_json_response,
+    save_checkpoint, load_checkpoint, open_journal, ProgressMeter
+)
 
 
 ALTERNATIVE_PROMPT = """You are generating counterfactual events that COULD have happened but DIDN'T.
@@ -56,25 +66,139 @@ Generate EXACTLY {count} alternatives.
 """
 
 
-def generate_alternatives(case: Dict) -> Dict:
-    """Add alternatives to each level in the case"""
+BATCH_ALTERNATIVE_PROMPT = """You are generating counterfactual events that COULD have happened but DIDN'T.
+
+CONTEXT:
+Seed Event: {seed_event} ({seed_date})
+
+Below are the outcomes that actually happened at each depth of this causal
+chain (each one label=1).
+
+{levels}
+
+TASK: For EACH depth, generate {count} plausible ALTERNATIVE events that:
+1. COULD have happened at that depth's timeframe
+2. Are similar in magnitude/impact to the actual event
+3. Are specific and measurable
+4. Did NOT actually happen (we've verified via search)
+5. Are diverse (different types of outcomes)
+
+REQUIREMENTS:
+- Be realistic given the path up to that depth
+- Match the domain/theme
+- NOT repeat the actual event at any depth
+
+OUTPUT FORMAT (JSON object keyed by depth):
+```json
+{{
+  "1": [
+    {{"event": "Fed announces pause in rate hikes citing recession concerns", "label": 0}},
+    {{"event": "Mortgage rates stabilize at 6.5% as investors flee to bonds", "label": 0}},
+    {{"event": "Housing market crashes 30% triggering emergency Fed action", "label": 0}}
+  ],
+  "2": [...]
+}}
+```
+
+Generate EXACTLY {count} alternatives for each of these depths: {depths}.
+"""
+
+
+def build_alternative_prompt(case: Dict, level: Dict) -> str:
+    """Counterfactual prompt for one level of a case"""
+    return ALTERNATIVE_PROMPT.format(
+        seed_event=case["seed"]["event"],
+        seed_date=case["seed"]["date"],
+        path=" → ".join(level["path"]),
+        actual_event=level["candidates"][0]["event"],  # The one with label=1
+        timeframe_months=level["timeframe_months"],
+        count=config.ALTERNATIVES_PER_DEPTH
+    )
+
+
+def build_batch_alternative_prompt(case: Dict, levels: List[Dict]) -> str:
+    """Counterfactual prompt covering several levels of a case at once"""
+    formatted_levels = "\n\n".join([
+        f"DEPTH {level['depth']} ({level['timeframe_months']} months):\n"
+        f"Path: {' → '.join(level['path'])}\n"
+        f"What Actually Happened: {level['candidates'][0]['event']}"
+        for level in levels
+    ])
+
+    return BATCH_ALTERNATIVE_PROMPT.format(
+        seed_event=case["seed"]["event"],
+        seed_date=case["seed"]["date"],
+        levels=formatted_levels,
+        count=config.ALTERNATIVES_PER_DEPTH,
+        depths=", ".join(str(level["depth"]) for level in levels)
+    )
+
+
+def parse_batch_alternatives(response: str) -> Dict[int, List[Dict]]:
+    """Parse a batched response into {depth: alternatives} (missing depths omitted)"""
+    parsed = parse_json_response(response)
+    if not isinstance(parsed, dict):
+        return {}
+
+    by_depth = {}
+    for depth, alternatives in parsed.items():
+        try:
+            depth = int(depth)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(alternatives, list):
+            by_depth[depth] = [alt for alt in alternatives if isinstance(alt, dict) and alt.get("event")]
+    return by_depth
+
+
+def add_alternatives(level: Dict, alternatives) -> bool:
+    """Append parsed alternatives to a level's candidates (True if any were added)"""
+    if alternatives:
+        # Add to candidates
+        level["candidates"].extend(alternatives[:config.ALTERNATIVES_PER_DEPTH])
+        print(f"    ✅ Added {len(alternatives[:config.ALTERNATIVES_PER_DEPTH])} alternatives")
+        return True
+
+    print(f"    ❌ Failed to generate alternatives")
+    return False
+
+
+def level_key(case: Dict, level: Dict) -> str:
+    """Journal key for one level of a case"""
+    return f"{case['case_id']}:{level['depth']}"
+
+
+def restore_level(case: Dict, level: Dict, journal: Optional[Journal]) -> bool:
+    """Restore a level's candidates from the journal (True if already done)"""
+    candidates = journal.get(level_key(case, level)) if journal is not None else None
+    if candidates is None:
+        return False
+
+    level["candidates"] = candidates
+    return True
+
+
+def record_level(journal: Optional[Journal], case: Dict, level: Dict):
+    """Durably record a finished level's candidates"""
+    if journal is not None:
+        journal.append(level_key(case, level), level["candidates"])
+
+
+def generate_alternatives(case: Dict, journal: Optional[Journal] = None) -> Dict:
+    """Add alternatives to each level in the case (levels already journaled are restored)"""
 
     print(f"\n🎲 Generating alternatives for: {case['case_id'][:50]}...")
 
     for level in case["levels"]:
         depth = level["depth"]
-        actual_event = level["candidates"][0]["event"]  # The one with label=1
+
+        if restore_level(case, level, journal):
+            print(f"  Depth {depth}: ⏭️  restored from journal")
+            continue
 
         print(f"  Depth {depth}: Generating {config.ALTERNATIVES_PER_DEPTH} alternatives...")
 
-        prompt = ALTERNATIVE_PROMPT.format(
-            seed_event=case["seed"]["event"],
-            seed_date=case["seed"]["date"],
-            path=" → ".join(level["path"]),
-            actual_event=actual_event,
-            timeframe_months=level["timeframe_months"],
-            count=config.ALTERNATIVES_PER_DEPTH
-        )
+        prompt = build_alternative_prompt(case, level)
 
         try:
             response = llm_client.call_research_model(
@@ -91,12 +215,8 @@ def generate_alternatives(case: Dict) -> Dict:
                 response = llm_client.call_research_model(prompt=prompt, temperature=0.95)
                 alternatives = parse_json_response(response)
 
-            if alternatives:
-                # Add to candidates
-                level["candidates"].extend(alternatives[:config.ALTERNATIVES_PER_DEPTH])
-                print(f"    ✅ Added {len(alternatives[:config.ALTERNATIVES_PER_DEPTH])} alternatives")
-            else:
-                print(f"    ❌ Failed to generate alternatives")
+            if add_alternatives(level, alternatives):
+                record_level(journal, case, level)
 
         except Exception as e:
             print(f"    ❌ Error: {e}")
@@ -105,6 +225,149 @@ def generate_alternatives(case: Dict) -> Dict:
     return case
 
 
+async def generate_level_alternatives_async(case: Dict, level: Dict, journal: Optional[Journal] = None) -> None:
+    """Async version of the per-level alternative generation"""
+    if restore_level(case, level, journal):
+        return
+
+    prompt = build_alternative_prompt(case, level)
+
+    try:
+        response = await async_llm_client.call_research_model(
+            prompt=prompt,
+            temperature=0.9,  # Higher for creativity
+            max_tokens=1000
+        )
+
+        alternatives = parse_json_response(response)
+
+        if not alternatives or len(alternatives) < config.ALTERNATIVES_PER_DEPTH:
+            print(f"    ⚠️  Depth {level['depth']}: only got {len(alternatives) if alternatives else 0} alternatives")
+            # Retry once
+            response = await async_llm_client.call_research_model(prompt=prompt, temperature=0.95)
+            alternatives = parse_json_response(response)
+
+        if add_alternatives(level, alternatives):
+            record_level(journal, case, level)
+
+    except Exception as e:
+        print(f"    ❌ Error: {e}")
+
+
+async def generate_batched_alternatives_async(case: Dict, journal: Optional[Journal] = None) -> None:
+    """
+    One research call for every pending level of a case
+
+    Levels the batched response leaves short fall back to the per-level prompt.
+    """
+    pending = [level for level in case["levels"] if not restore_level(case, level, journal)]
+    if not pending:
+        return
+
+    try:
+        response = await async_llm_client.call_research_model(
+            prompt=build_batch_alternative_prompt(case, pending),
+            temperature=0.9,  # Higher for creativity
+            max_tokens=1000 * len(pending)
+        )
+        by_depth = parse_batch_alternatives(response)
+    except Exception as e:
+        print(f"    ❌ Batched request failed: {e}")
+        by_depth = {}
+
+    retry = []
+    for level in pending:
+        alternatives = by_depth.get(level["depth"], [])
+        if len(alternatives) >= config.ALTERNATIVES_PER_DEPTH and add_alternatives(level, alternatives):
+            record_level(journal, case, level)
+        else:
+            retry.append(level)
+
+    if retry:
+        print(f"    ⚠️  Batched response short for depths {[level['depth'] for level in retry]}, retrying per level")
+        await asyncio.gather(*[
+            generate_level_alternatives_async(case, level, journal)
+            for level in retry
+        ])
+
+
+async def generate_alternatives_async(
+    case: Dict,
+    journal: Optional[Journal] = None,
+    batch: bool = None
+) -> Dict:
+    """
+    Async version of generate_alternatives
+
+    Args:
+        case: Chronicled case
+        journal: Alternatives journal to resume from and record each level in
+        batch: One prompt for all levels (default Config.BATCH_ALTERNATIVES),
+            otherwise all levels are requested concurrently
+
+    Returns:
+        The case with alternatives added
+    """
+    batch = config.BATCH_ALTERNATIVES if batch is None else batch
+    print(f"\n🎲 Generating alternatives for: {case['case_id'][:50]}...")
+
+    if batch:
+        await generate_batched_alternatives_async(case, journal)
+    else:
+        await asyncio.gather(*[
+            generate_level_alternatives_async(case, level, journal)
+            for level in case["levels"]
+        ])
+
+    return case
+
+
+def is_complete(case: Dict) -> bool:
+    """True if every level has its alternatives"""
+    return all(len(level["candidates"]) > 1 for level in case["levels"])
+
+
+async def generate_all_alternatives_async(
+    cases: List[Dict],
+    workers: int = None,
+    batch: bool = None,
+    journal: Optional[Journal] = None
+) -> List[Dict]:
+    """
+    Add alternatives to many cases concurrently
+
+    Args:
+        cases: Chronicled cases (updated in place)
+        workers: Cases in flight (default Config.ALTERNATIVE_WORKERS)
+        batch: One prompt per case (default Config.BATCH_ALTERNATIVES)
+        journal: Alternatives journal; finished levels are restored, not re-requested
+
+    Returns:
+        The cases, in input order
+    """
+    workers = workers or config.ALTERNATIVE_WORKERS
+    batch = config.BATCH_ALTERNATIVES if batch is None else batch
+
+    print(f"\n🚀 Parallel alternatives: {len(cases)} cases")
+    print(f"   Workers: {workers} | batched: {batch} | rate limit: OpenRouter {config.REQUESTS_PER_MINUTE}/min\n")
+
+    limit = asyncio.Semaphore(workers)
+    meter = ProgressMeter(len(cases))
+
+    async def run(case: Dict) -> Dict:
+        async with limit:
+            return await generate_alternatives_async(case, journal, batch)
+
+    try:
+        for next_done in asyncio.as_completed([run(case) for case in cases]):
+            case = await next_done
+            print(meter.update(ok=is_complete(case)), flush=True)
+    finally:
+        await async_llm_client.aclose()
+
+    return cases
+
+
 def main():
     """Main entry point"""
     print("=" * 80)
@@ -119,14 +382,17 @@ def main():
 
     print(f"\n📚 Loaded {len(cases)} cases")
 
-    # Add alternatives to each
-    for i, case in enumerate(cases):
-        print(f"\n[{i+1}/{len(cases)}]")
-        generate_alternatives(case)
-
-        # Save checkpoint every 10 cases
-        if (i + 1) % 10 == 0:
-            save_checkpoint(cases, "cases_with_alternatives.json")
+    # Every finished level is journaled, so reruns resume level by level
+    journal = open_journal("alternatives.journal.jsonl")
+    if len(journal):
+        print(f"  ✅ Resuming from journal: {len(journal)} levels done")
+
+    # Add alternatives to all cases concurrently
+    try:
+        asyncio.run(generate_all_alternatives_async(cases, journal=journal))
+        journal.compact()
+    finally:
+        journal.close()
 
     # Save final
     save_checkpoint(cases, "cases_complete.json")
@@ -3,14 +3,23 @@ Brainstormer Agent: Generate 100 seed events
 
 70% Post-Cutoff (July 2024 - June 2025): Out-of-distribution, true forecasting
 30% In-Distribution (2019-2022): Supplement for calibration learning
+
+Batches run concurrently and every seed passes a near-duplicate filter, so
+batches that return the same event are topped up until the target counts
+are unique. Every batch is a distinct request: it carries its own batch
+index (also its completion-cache sample key), a rotating domain focus and
+the events already accepted.
 """
 
 import sys
 sys.path.append('..')
 
-from typing import List, Dict
+import asyncio
+from typing import List, Dict, Optional
 from config import config
-from utils import llm_client, parse_json_response, save_checkpoint, load_checkpoint
+from journal import Journal
+from dedup import SeedDeduper
+from utils import llm_client, async_llm_client, parse_json_response, save_checkpoint, load_checkpoint, open_journal
 
 
 POST_CUTOFF_PROMPT = """You are generating RECENT historical events (July 2024 - June 2025) for a forecasting AI training dataset.
@@ -90,15 +99,70 @@ Generate EXACTLY {count} events from {start_year}-{end_year}.
 """
 
 
-def generate_post_cutoff_seeds(num_seeds: int) -> List[Dict]:
+EXCLUDE_PROMPT = """
+ALREADY COVERED (do NOT repeat these or near-identical events):
+{events}
+"""
+
+MAX_EXCLUDED_EVENTS = 50
+
+BATCH_FOCUS_PROMPT = """
+BATCH {index}: favour {domain} events in this batch (other domains are fine too).
+"""
+
+
+def new_deduper() -> SeedDeduper:
+    """Near-duplicate filter with the configured thresholds"""
+    return SeedDeduper(config.SEED_DEDUP_THRESHOLD, config.SEED_DEDUP_DATE_WINDOW_DAYS)
+
+
+def _batch_prefix(post_cutoff: bool) -> str:
+    return "post_cutoff-" if post_cutoff else "in_dist-"
+
+
+def journaled_seeds(journal: Optional[Journal], post_cutoff: bool) -> List[Dict]:
+    """Seeds from batches already recorded in the journal"""
+    if journal is None:
+        return []
+    prefix = _batch_prefix(post_cutoff)
+    return [seed for key, batch in journal.items() if key.startswith(prefix) for seed in batch]
+
+
+def journaled_batch_count(journal: Optional[Journal], post_cutoff: bool) -> int:
+    """Number of batches already recorded, so new batches get fresh indices across reruns"""
+    if journal is None:
+        return 0
+    prefix = _batch_prefix(post_cutoff)
+    return sum(1 for key, _ in journal.items() if key.startswith(prefix))
+
+
+def record_batch(journal: Optional[Journal], post_cutoff: bool, batch_seeds: List[Dict]):
+    """Durably record one generated batch"""
+    if journal is None:
+        return
+    prefix = _batch_prefix(post_cutoff)
+    batch_num = sum(1 for key, _ in journal.items() if key.startswith(prefix))
+    journal.append(f"{prefix}{batch_num}", batch_seeds)
+
+
+def generate_post_cutoff_seeds(
+    num_seeds: int,
+    journal: Optional[Journal] = None,
+    deduper: Optional[SeedDeduper] = None
+) -> List[Dict]:
     """Generate post-cutoff seeds (July 2024 - June 2025)"""
     print(f"\n🔮 Generating {num_seeds} POST-CUTOFF seeds (Jul 2024 - Jun 2025)...", flush=True)
     print(f"   These are outside GPT-OSS-20B's training data", flush=True)
 
-    seeds = []
+    deduper = deduper if deduper is not None else new_deduper()
+    seeds = deduper.filter(journaled_seeds(journal, post_cutoff=True))
+    if seeds:
+        print(f"   ✅ {len(seeds)} seeds restored from journal", flush=True)
     batch_size = 10
+    batch_index = journaled_batch_count(journal, post_cutoff=True)
 
-    for batch_num in range((num_seeds + batch_size - 1) // batch_size):
+    # Extra batches replace seeds dropped as duplicates
+    for batch_num in range(config.SEED_MAX_ROUNDS * ((num_seeds + batch_size - 1) // batch_size)):
         batch_count = min(batch_size, num_seeds - len(seeds))
         if batch_count <= 0:
             break
@@ -106,11 +170,8 @@ def generate_post_cutoff_seeds(num_seeds: int) -> List[Dict]:
         print(f"\n  📦 Batch {batch_num + 1}: Generating {batch_count} seeds...", flush=True)
         print(f"     Calling DeepSeek API (may take 30-60 seconds)...", flush=True)
 
-        prompt = POST_CUTOFF_PROMPT.format(
-            count=batch_count,
-            start_date=config.POST_CUTOFF_START,
-            end_date=config.POST_CUTOFF_END
-        )
+        prompt = _batch_prompt(batch_count, True, [seed["event"] for seed in seeds], batch_index)
+        batch_index += 1
 
         try:
             print(f"     🔄 Waiting for LLM response...", flush=True)
@@ -118,7 +179,8 @@ def generate_post_cutoff_seeds(num_seeds: int) -> List[Dict]:
                 prompt=prompt,
                 system_prompt="You are a current events researcher focused on 2024-2025 events.",
                 temperature=0.9,
-                max_tokens=4000
+                max_tokens=4000,
+                sample=batch_index - 1
             )
             print(f"     ✅ LLM response received ({len(response)} chars)", flush=True)
 
@@ -128,43 +190,52 @@ def generate_post_cutoff_seeds(num_seeds: int) -> List[Dict]:
                 # Mark as post-cutoff
                 for seed in batch_seeds:
                     seed["post_cutoff"] = True
-                seeds.extend(batch_seeds)
-                print(f"     ✅ {len(batch_seeds)} seeds generated")
+                record_batch(journal, True, batch_seeds)
+                unique = deduper.filter(batch_seeds)
+                seeds.extend(unique)
+                print(f"     ✅ {len(unique)} seeds generated ({len(batch_seeds) - len(unique)} duplicates dropped)")
             else:
                 print(f"     ❌ Parse failed, retrying...")
 
         except Exception as e:
             print(f"     ❌ Batch failed: {e}")
 
-    return seeds
+    return seeds[:num_seeds]
 
 
-def generate_in_dist_seeds(num_seeds: int) -> List[Dict]:
+def generate_in_dist_seeds(
+    num_seeds: int,
+    journal: Optional[Journal] = None,
+    deduper: Optional[SeedDeduper] = None
+) -> List[Dict]:
     """Generate in-distribution seeds (2019-2022)"""
     print(f"\n📚 Generating {num_seeds} IN-DISTRIBUTION seeds (2019-2022)...")
     print(f"   These supplement with calibration examples")
 
-    seeds = []
+    deduper = deduper if deduper is not None else new_deduper()
+    seeds = deduper.filter(journaled_seeds(journal, post_cutoff=False))
+    if seeds:
+        print(f"   ✅ {len(seeds)} seeds restored from journal")
     batch_size = 10
+    batch_index = journaled_batch_count(journal, post_cutoff=False)
 
-    for batch_num in range((num_seeds + batch_size - 1) // batch_size):
+    # Extra batches replace seeds dropped as duplicates
+    for batch_num in range(config.SEED_MAX_ROUNDS * ((num_seeds + batch_size - 1) // batch_size)):
         batch_count = min(batch_size, num_seeds - len(seeds))
         if batch_count <= 0:
             break
 
         print(f"\n  📦 Batch {batch_num + 1}: {batch_count} seeds...")
 
-        prompt = IN_DIST_PROMPT.format(
-            count=batch_count,
-            start_year=config.IN_DIST_START_YEAR,
-            end_year=config.IN_DIST_END_YEAR
-        )
+        prompt = _batch_prompt(batch_count, False, [seed["event"] for seed in seeds], batch_index)
+        batch_index += 1
 
         try:
             response = llm_client.call_research_model(
                 prompt=prompt,
                 temperature=0.9,
-                max_tokens=4000
+                max_tokens=4000,
+                sample=batch_index - 1
             )
 
             batch_seeds = parse_json_response(response)
@@ -173,13 +244,175 @@ def generate_in_dist_seeds(num_seeds: int) -> List[Dict]:
                 # Mark as in-dist
                 for seed in batch_seeds:
                     seed["post_cutoff"] = False
-                seeds.extend(batch_seeds)
-                print(f"     ✅ {len(batch_seeds)} seeds generated")
+                record_batch(journal, False, batch_seeds)
+                unique = deduper.filter(batch_seeds)
+                seeds.extend(unique)
+                print(f"     ✅ {len(unique)} seeds generated ({len(batch_seeds) - len(unique)} duplicates dropped)")
 
         except Exception as e:
             print(f"     ❌ Batch failed: {e}")
 
-    return seeds
+    return seeds[:num_seeds]
+
+
+def _batch_prompt(
+    count: int,
+    post_cutoff: bool,
+    exclude: Optional[List[str]] = None,
+    batch_index: Optional[int] = None
+) -> str:
+    """Seed-generation prompt for one batch (optionally numbered, with a domain focus and events to avoid)"""
+    if post_cutoff:
+        prompt = POST_CUTOFF_PROMPT.format(
+            count=count,
+            start_date=config.POST_CUTOFF_START,
+            end_date=config.POST_CUTOFF_END
+        )
+    else:
+        prompt = IN_DIST_PROMPT.format(
+            count=count,
+            start_year=config.IN_DIST_START_YEAR,
+            end_year=config.IN_DIST_END_YEAR
+        )
+
+    if batch_index is not None:
+        prompt += BATCH_FOCUS_PROMPT.format(index=batch_index + 1, domain=config.DOMAINS[batch_index % len(config.DOMAINS)])
+    if exclude:
+        events = "\n".join(f"- {event}" for event in exclude[-MAX_EXCLUDED_EVENTS:])
+        prompt += EXCLUDE_PROMPT.format(events=events)
+    return prompt
+
+
+async def generate_seed_batch_async(
+    count: int,
+    post_cutoff: bool,
+    journal: Optional[Journal] = None,
+    exclude: Optional[List[str]] = None,
+    batch_index: Optional[int] = None
+) -> List[Dict]:
+    """Generate one batch of seeds with the async client (batch_index keeps batches distinct)"""
+    kwargs = {}
+    if post_cutoff:
+        kwargs["system_prompt"] = "You are a current events researcher focused on 2024-2025 events."
+
+    try:
+        response = await async_llm_client.call_research_model(
+            prompt=_batch_prompt(count, post_cutoff, exclude, batch_index),
+            temperature=0.9,
+            max_tokens=4000,
+            sample=batch_index,
+            **kwargs
+        )
+    except Exception as e:
+        print(f"     ❌ Batch failed: {e}")
+        return []
+
+    batch_seeds = parse_json_response(response)
+
+    if not batch_seeds or not isinstance(batch_seeds, list):
+        print(f"     ❌ Parse failed")
+        return []
+
+    for seed in batch_seeds:
+        seed["post_cutoff"] = post_cutoff
+    record_batch(journal, post_cutoff, batch_seeds)
+    print(f"     ✅ {len(batch_seeds)} seeds generated")
+    return batch_seeds
+
+
+async def _generate_seeds_async(
+    num_seeds: int,
+    post_cutoff: bool,
+    journal: Optional[Journal] = None,
+    deduper: Optional[SeedDeduper] = None
+) -> List[Dict]:
+    """
+    Issue 10-seed batches concurrently until num_seeds unique seeds are collected
+
+    Each round requests only the shortfall left by failed batches and
+    duplicates. Every batch has its own index (domain focus and cache sample
+    key) and lists the events accepted so far, so no two requests are
+    identical. Gives up after Config.SEED_MAX_ROUNDS rounds.
+    """
+    deduper = deduper if deduper is not None else new_deduper()
+    seeds = deduper.filter(journaled_seeds(journal, post_cutoff))
+    if seeds:
+        print(f"   ✅ {len(seeds)} seeds restored from journal")
+
+    limit = asyncio.Semaphore(config.SEED_BATCH_WORKERS)
+    batch_size = 10
+
+    batch_index = journaled_batch_count(journal, post_cutoff)
+
+    async def run_batch(count: int, exclude: Optional[List[str]], index: int) -> List[Dict]:
+        async with limit:
+            return await generate_seed_batch_async(count, post_cutoff, journal, exclude, index)
+
+    for round_num in range(config.SEED_MAX_ROUNDS):
+        remaining = num_seeds - len(seeds)
+        if remaining <= 0:
+            break
+
+        exclude = [seed["event"] for seed in seeds] or None
+        if round_num:
+            print(f"  🔁 Top-up round {round_num}: {remaining} seeds short")
+
+        counts = [
+            min(batch_size, remaining - start)
+            for start in range(0, remaining, batch_size)
+        ]
+
+        batches = [run_batch(count, exclude, batch_index + i) for i, count in enumerate(counts)]
+        batch_index += len(counts)
+
+        duplicates = 0
+        for next_done in asyncio.as_completed(batches):
+            batch = await next_done
+            unique = deduper.filter(batch)
+            duplicates += len(batch) - len(unique)
+            seeds.extend(unique)
+
+        if duplicates:
+            print(f"  🧹 Dropped {duplicates} near-duplicate seeds")
+
+    if len(seeds) < num_seeds:
+        print(f"  ⚠️  Only {len(seeds)}/{num_seeds} unique seeds after {config.SEED_MAX_ROUNDS} rounds")
+
+    return seeds[:num_seeds]
+
+
+async def generate_post_cutoff_seeds_async(
+    num_seeds: int,
+    journal: Optional[Journal] = None,
+    deduper: Optional[SeedDeduper] = None
+) -> List[Dict]:
+    """Async version of generate_post_cutoff_seeds"""
+    print(f"\n🔮 Generating {num_seeds} POST-CUTOFF seeds (Jul 2024 - Jun 2025)...", flush=True)
+    return await _generate_seeds_async(num_seeds, True, journal, deduper)
+
+
+async def generate_in_dist_seeds_async(
+    num_seeds: int,
+    journal: Optional[Journal] = None,
+    deduper: Optional[SeedDeduper] = None
+) -> List[Dict]:
+    """Async version of generate_in_dist_seeds"""
+    print(f"\n📚 Generating {num_seeds} IN-DISTRIBUTION seeds (2019-2022)...")
+    return await _generate_seeds_async(num_seeds, False, journal, deduper)
+
+
+async def generate_all_seeds_async(journal: Optional[Journal] = None) -> List[Dict]:
+    """Both seed pools concurrently, deduplicated against each other"""
+    deduper = new_deduper()
+    try:
+        post_cutoff_seeds, in_dist_seeds = await asyncio.gather(
+            generate_post_cutoff_seeds_async(config.NUM_SEEDS_POST_CUTOFF, journal, deduper),
+            generate_in_dist_seeds_async(config.NUM_SEEDS_IN_DISTRIBUTION, journal, deduper)
+        )
+    finally:
+        await async_llm_client.aclose()
+
+    return post_cutoff_seeds + in_dist_seeds
 
 
 def main():
@@ -198,14 +431,15 @@ def main():
         print(f"\n✅ Checkpoint found: {len(checkpoint)} seeds already generated")
         return checkpoint
 
-    # Generate post-cutoff (priority)
-    post_cutoff_seeds = generate_post_cutoff_seeds(config.NUM_SEEDS_POST_CUTOFF)
-
-    # Generate in-distribution (supplement)
-    in_dist_seeds = generate_in_dist_seeds(config.NUM_SEEDS_IN_DISTRIBUTION)
+    # Each batch is journaled as it arrives, so reruns only generate what's missing
+    journal = open_journal("seeds.journal.jsonl")
 
-    # Combine
-    all_seeds = post_cutoff_seeds + in_dist_seeds
+    # Post-cutoff (priority) and in-distribution (supplement) batches all run concurrently
+    try:
+        all_seeds = asyncio.run(generate_all_seeds_async(journal))
+        journal.compact()
+    finally:
+        journal.close()
 
     print(f"\n📊 Final Distribution:")
     print(f"   Post-cutoff: {len([s for s in all_seeds if s.get('post_cutoff')])} seeds")
@@ -8,10 +8,15 @@ following the event. Build a causal chain of real outcomes.
 import sys
 sys.path.append('..')
 
+import asyncio
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from config import config
-from utils import llm_client, search_client, parse_json_response, save_checkpoint, load_checkpoint
+from journal import Journal
+from utils import (
+    llm_client, async_llm_client, search_client, parse_json_response,
+    save_checkpoint, load_checkpoint, open_journal
+)
 
 
 CHRONICLE_RESEARCH_PROMPT = """You are researching what happened AFTER this historical event:
@@ -55,6 +60,8 @@ If no clear event found, return:
 ```
 """
 
+OUTCOME_SYSTEM_PROMPT = "You are a factual historical researcher. Only report events that are clearly documented in the sources."
+
 
 def calculate_search_dates(seed_date: str, timeframe_months: int) -> Tuple[str, str]:
     """
@@ -72,6 +79,53 @@ def calculate_search_dates(seed_date: str, timeframe_months: int) -> Tuple[str,
     return start_dt.strftime("%Y-%m-%d"), end_dt.strftime("%Y-%m-%d")
 
 
+def build_search_query(parent_event: str, start_date: str) -> str:
+    """Focus the search on consequences of the parent event"""
+    return f"{parent_event} outcome consequence result {start_date}"
+
+
+def build_outcome_prompt(
+    seed_event: str,
+    seed_date: str,
+    parent_event: str,
+    path: List[str],
+    timeframe_months: int,
+    search_results: List[Dict]
+) -> str:
+    """Format search results into the R1 research prompt"""
+    formatted_results = "\n\n".join([
+        f"[{i+1}] {r['title']}\nURL: {r['url']}\n{r['content'][:500]}..."
+        for i, r in enumerate(search_results)
+    ])
+
+    return CHRONICLE_RESEARCH_PROMPT.format(
+        event=seed_event,
+        date=seed_date,
+        context="",  # Can add context if needed
+        path=" → ".join(path),
+        parent_event=parent_event,
+        timeframe_months=timeframe_months,
+        search_results=formatted_results
+    )
+
+
+def parse_outcome(response: str) -> Optional[Dict]:
+    """Parse the R1 response into an outcome dict (None if nothing found)"""
+    outcome = parse_json_response(response)
+
+    if not outcome:
+        print(f"     ❌ Failed to parse LLM response")
+        return None
+
+    if outcome.get("event") is None:
+        reason = outcome.get("reason", "Unknown")
+        print(f"     ⚠️  No outcome found: {reason}")
+        return None
+
+    print(f"     ✅ Found: {outcome['event'][:60]}...")
+    return outcome
+
+
 def search_for_outcome(
     seed_event: str,
     seed_date: str,
@@ -98,14 +152,10 @@ def search_for_outcome(
     start_date, end_date = calculate_search_dates(seed_date, timeframe_months)
     print(f"     Date range: {start_date} to {end_date}")
 
-    # Build search query
-    # Focus on consequences of the parent event
-    search_query = f"{parent_event} outcome consequence result {start_date}"
-
     try:
         # Search with date constraints
         search_results = search_client.search_with_date_range(
-            query=search_query,
+            query=build_search_query(parent_event, start_date),
             start_date=start_date,
             end_date=end_date,
             max_results=8
@@ -115,66 +165,75 @@ def search_for_outcome(
             print(f"     ⚠️  No search results found")
             return None
 
-        # Format search results for LLM
-        formatted_results = "\n\n".join([
-            f"[{i+1}] {r['title']}\nURL: {r['url']}\n{r['content'][:500]}..."
-            for i, r in enumerate(search_results)
-        ])
-
         print(f"     📚 Found {len(search_results)} search results")
 
         # Use reasoning model to analyze results
-        prompt = CHRONICLE_RESEARCH_PROMPT.format(
-            event=seed_event,
-            date=seed_date,
-            context="",  # Can add context if needed
-            path=" → ".join(path),
-            parent_event=parent_event,
-            timeframe_months=timeframe_months,
-            search_results=formatted_results
+        prompt = build_outcome_prompt(
+            seed_event, seed_date, parent_event, path, timeframe_months, search_results
         )
 
         response = llm_client.call_reasoning_model(
             prompt=prompt,
-            system_prompt="You are a factual historical researcher. Only report events that are clearly documented in the sources.",
+            system_prompt=OUTCOME_SYSTEM_PROMPT,
             temperature=0.3  # Lower temperature for factual extraction
         )
 
-        outcome = parse_json_response(response)
+        return parse_outcome(response)
+
+    except Exception as e:
+        print(f"     ❌ Search failed: {e}")
+        return None
 
-        if not outcome:
-            print(f"     ❌ Failed to parse LLM response")
-            return None
 
-        if outcome.get("event") is None:
-            reason = outcome.get("reason", "Unknown")
-            print(f"     ⚠️  No outcome found: {reason}")
+async def search_for_outcome_async(
+    seed_event: str,
+    seed_date: str,
+    parent_event: str,
+    path: List[str],
+    timeframe_months: int
+) -> Optional[Dict]:
+    """Async version of search_for_outcome (search in a thread, R1 on the event loop)"""
+    start_date, end_date = calculate_search_dates(seed_date, timeframe_months)
+
+    try:
+        search_results = await asyncio.to_thread(
+            search_client.search_with_date_range,
+            query=build_search_query(parent_event, start_date),
+            start_date=start_date,
+            end_date=end_date,
+            max_results=8
+        )
+
+        if not search_results:
+            print(f"     ⚠️  No search results found ({start_date} to {end_date})")
             return None
 
-        print(f"     ✅ Found: {outcome['event'][:60]}...")
-        return outcome
+        prompt = build_outcome_prompt(
+            seed_event, seed_date, parent_event, path, timeframe_months, search_results
+        )
+
+        response = await async_llm_client.call_reasoning_model(
+            prompt=prompt,
+            system_prompt=OUTCOME_SYSTEM_PROMPT,
+            temperature=0.3
+        )
+
+        return parse_outcome(response)
 
     except Exception as e:
         print(f"     ❌ Search failed: {e}")
         return None
 
 
-def chronicle_seed(seed: Dict) -> Optional[Dict]:
-    """
-    Chronicle a single seed: find 3-depth outcome chain
+def make_case_id(seed: Dict) -> str:
+    """Stable case identifier derived from the seed"""
+    return f"{seed['date']}_{seed['event'][:30].lower().replace(' ', '_')}"
 
-    Args:
-        seed: Seed event dict
 
-    Returns:
-        Full case dict with levels, or None if failed
-    """
-    case_id = f"{seed['date']}_{seed['event'][:30].lower().replace(' ', '_')}"
-    print(f"\n📖 Chronicling: {seed['event'][:70]}...")
-    print(f"   Date: {seed['date']} | Domain: {seed['domain']}")
-
-    case = {
-        "case_id": case_id,
+def new_case(seed: Dict) -> Dict:
+    """Empty case dict for a seed (levels filled in by the chronicler)"""
+    return {
+        "case_id": make_case_id(seed),
         "seed": {
             "event": seed["event"],
             "date": seed["date"],
@@ -185,12 +244,97 @@ def chronicle_seed(seed: Dict) -> Optional[Dict]:
         "levels": []
     }
 
-    # Track path through tree
-    path = [seed["event"]]
-    current_event = seed["event"]
+
+def make_level(depth: int, path: List[str], outcome: Dict) -> Dict:
+    """
+    Level entry for an outcome (candidates will be added later by Alternative Generator)
+
+    `path` must already end with the outcome event.
+    """
+    return {
+        "depth": depth,
+        "parent_event": path[-2],  # Previous event
+        "path": path.copy(),
+        "timeframe_months": depth,
+        "date": outcome["date"],
+        "research_summary": outcome.get("research_summary", ""),
+        "candidates": [
+            {
+                "event": outcome["event"],
+                "label": 1  # This actually happened
+            }
+            # Alternatives will be added by next agent
+        ]
+    }
+
+
+def open_chronicle_journal() -> Journal:
+    """
+    Per-seed chronicle journal keyed by case_id
+
+    Records are {"status": "partial" | "complete", "case": case}; a partial
+    record is rewritten after every depth so runs resume mid-chain. Cases
+    from a legacy cases_partial.json checkpoint are imported once.
+    """
+    journal = open_journal("chronicle.journal.jsonl")
+
+    if not len(journal):
+        legacy = load_checkpoint("cases_partial.json")
+        for case in legacy or []:
+            journal.append(case["case_id"], {"status": "complete", "case": case})
+
+    return journal
+
+
+def load_progress(seed: Dict, journal: Optional[Journal]) -> Dict:
+    """Journal record for a seed, or a fresh partial record"""
+    entry = journal.get(make_case_id(seed)) if journal is not None else None
+    if entry is None:
+        return {"status": "partial", "case": new_case(seed)}
+    return entry
+
+
+def record_progress(journal: Optional[Journal], case: Dict, status: str):
+    """Durably record a seed's chain after each depth (and when finished)"""
+    if journal is not None:
+        journal.append(case["case_id"], {"status": status, "case": case})
+
+
+def completed_cases(seeds: List[Dict], journal: Journal) -> List[Dict]:
+    """Completed cases from the journal, in seed order"""
+    cases = {}
+    for seed in seeds:
+        entry = journal.get(make_case_id(seed))
+        if entry and entry["status"] == "complete":
+            cases.setdefault(entry["case"]["case_id"], entry["case"])
+    return list(cases.values())
+
+
+def chronicle_seed(seed: Dict, journal: Optional[Journal] = None) -> Optional[Dict]:
+    """
+    Chronicle a single seed: find 3-depth outcome chain
+
+    Args:
+        seed: Seed event dict
+        journal: Chronicle journal to resume from and record each depth in
+
+    Returns:
+        Full case dict with levels, or None if failed
+    """
+    progress = load_progress(seed, journal)
+    case = progress["case"]
+    if progress["status"] == "complete":
+        return case
+
+    print(f"\n📖 Chronicling: {seed['event'][:70]}...")
+    print(f"   Date: {seed['date']} | Domain: {seed['domain']}")
+
+    # Track path through tree (resuming after the last journaled depth)
+    path = case["levels"][-1]["path"].copy() if case["levels"] else [seed["event"]]
+    current_event = path[-1]
 
     # Build 3-depth chain
-    for depth in range(1, config.MAX_DEPTH + 1):
+    for depth in range(len(case["levels"]) + 1, config.MAX_DEPTH + 1):
         timeframe = depth  # 1, 2, 3 months
 
         print(f"\n  🔍 Depth {depth} (t+{timeframe} months)...")
@@ -204,46 +348,62 @@ def chronicle_seed(seed: Dict) -> Optional[Dict]:
         )
 
         if not outcome:
+            # Can't continue without outcome (partial chain is ok)
             print(f"  ⚠️  Chain broken at depth {depth}")
-            # Can't continue without outcome
-            if depth == 1:
-                # If we can't even find first outcome, skip this seed
-                return None
-            else:
-                # Partial chain is ok
-                break
+            break
 
         # Add to path
         path.append(outcome["event"])
         current_event = outcome["event"]
 
-        # Create level entry (candidates will be added later by Alternative Generator)
-        level = {
-            "depth": depth,
-            "parent_event": path[-2],  # Previous event
-            "path": path.copy(),
-            "timeframe_months": timeframe,
-            "date": outcome["date"],
-            "research_summary": outcome.get("research_summary", ""),
-            "candidates": [
-                {
-                    "event": outcome["event"],
-                    "label": 1  # This actually happened
-                }
-                # Alternatives will be added by next agent
-            ]
-        }
-
-        case["levels"].append(level)
+        case["levels"].append(make_level(depth, path, outcome))
+        record_progress(journal, case, "partial")
 
     if not case["levels"]:
+        # If we can't even find first outcome, skip this seed
         print(f"  ❌ No outcomes found for this seed")
         return None
 
+    record_progress(journal, case, "complete")
     print(f"\n  ✅ Chronicle complete: {len(case['levels'])} levels")
     return case
 
 
+async def chronicle_seed_async(seed: Dict, journal: Optional[Journal] = None) -> Optional[Dict]:
+    """Async version of chronicle_seed"""
+    progress = load_progress(seed, journal)
+    case = progress["case"]
+    if progress["status"] == "complete":
+        return case
+
+    path = case["levels"][-1]["path"].copy() if case["levels"] else [seed["event"]]
+    current_event = path[-1]
+
+    for depth in range(len(case["levels"]) + 1, config.MAX_DEPTH + 1):
+        outcome = await search_for_outcome_async(
+            seed_event=seed["event"],
+            seed_date=seed["date"],
+            parent_event=current_event,
+            path=path,
+            timeframe_months=depth
+        )
+
+        if not outcome:
+            break  # Partial chain is OK
+
+        path.append(outcome["event"])
+        current_event = outcome["event"]
+
+        case["levels"].append(make_level(depth, path, outcome))
+        record_progress(journal, case, "partial")
+
+    if not case["levels"]:
+        return None  # Can't even find first outcome
+
+    record_progress(journal, case, "complete")
+    return case
+
+
 def main():
     """Main entry point"""
     print("=" * 80)
@@ -258,40 +418,33 @@ def main():
 
     print(f"\n📚 Loaded {len(seeds)} seeds")
 
-    # Check for existing cases
-    cases = load_checkpoint("cases_partial.json")
+    # Resume from the per-seed journal
+    journal = open_chronicle_journal()
+    cases = completed_cases(seeds, journal)
     if cases:
-        completed_ids = {c["case_id"] for c in cases}
-        print(f"  ✅ Resuming from checkpoint: {len(cases)} cases complete")
-    else:
-        cases = []
-        completed_ids = set()
+        print(f"  ✅ Resuming from journal: {len(cases)} cases complete")
 
     # Chronicle each seed
     for i, seed in enumerate(seeds):
-        case_id = f"{seed['date']}_{seed['event'][:30].lower().replace(' ', '_')}"
+        entry = journal.get(make_case_id(seed))
 
-        if case_id in completed_ids:
+        if entry and entry["status"] == "complete":
             print(f"\n[{i+1}/{len(seeds)}] ⏭️  Skipping (already done): {seed['event'][:50]}...")
             continue
 
         print(f"\n{'='*80}")
         print(f"[{i+1}/{len(seeds)}]")
 
-        case = chronicle_seed(seed)
-
-        if case:
-            cases.append(case)
-            completed_ids.add(case_id)
-
-            # Save checkpoint every 5 cases
-            if len(cases) % 5 == 0:
-                save_checkpoint(cases, "cases_partial.json")
+        # Each depth is journaled as it completes
+        case = chronicle_seed(seed, journal)
 
-        else:
+        if not case:
             print(f"  ⚠️  Skipping seed (could not chronicle)")
 
     # Save final
+    cases = completed_cases(seeds, journal)
+    journal.compact()
+    journal.close()
     save_checkpoint(cases, "cases_chronicled.json")
 
     print(f"\n" + "=" * 80)
@@ -1,139 +1,237 @@
 """
-Parallel Chronicler: Process multiple seeds concurrently with rate limiting
+Parallel Chronicler: Pipeline search and reasoning stages across all seeds
 
-Respects Exa API rate limits while maximizing throughput.
+Every seed runs as its own task, but the search and R1 stages have separate
+worker limits. While one seed waits on its depth-1 R1 call, other seeds'
+searches keep the Exa slots busy, so throughput approaches the limit of the
+slowest API instead of the sum of per-depth latencies.
+
+Request rates are enforced by the shared OpenRouter/Exa token buckets in utils.
+Progress goes to the chronicle journal after every depth, so an interrupted
+run resumes where it stopped and completed seeds are never re-sent.
 """
 
 import sys
 sys.path.append('..')
 
 import asyncio
-import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import List, Dict, Optional
-from datetime import datetime, timedelta
 from config import config
-from utils import llm_client, search_client, parse_json_response, save_checkpoint, load_checkpoint
-
+from journal import Journal
+from utils import async_llm_client, search_client, save_checkpoint, load_checkpoint, ProgressMeter
 
-# Import sync chronicler functions
 from agents.chronicler import (
+    OUTCOME_SYSTEM_PROMPT,
     calculate_search_dates,
-    search_for_outcome,
-    CHRONICLE_RESEARCH_PROMPT
+    build_search_query,
+    build_outcome_prompt,
+    parse_outcome,
+    make_case_id,
+    make_level,
+    open_chronicle_journal,
+    load_progress,
+    record_progress,
+    completed_cases,
 )
 
 
-async def chronicle_seed_async(seed: Dict, semaphore: asyncio.Semaphore, seed_idx: int, total: int) -> Optional[Dict]:
+class PipelineStages:
+    """Worker limits for the search and reasoning stages"""
+
+    def __init__(self, search_workers: int, llm_workers: int):
+        self.search = asyncio.Semaphore(search_workers)
+        self.llm = asyncio.Semaphore(llm_workers)
+        # Dedicated threads for the blocking Exa client (default pool is too small)
+        self.executor = ThreadPoolExecutor(max_workers=search_workers, thread_name_prefix="exa")
+
+    async def run_search(self, query: str, start_date: str, end_date: str) -> List[Dict]:
+        """Search stage: one date-window Exa query"""
+        async with self.search:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor,
+                partial(
+                    search_client.search_with_date_range,
+                    query=query,
+                    start_date=start_date,
+                    end_date=end_date,
+                    max_results=8
+                )
+            )
+
+    async def run_reasoning(self, prompt: str) -> str:
+        """Reasoning stage: one R1 call"""
+        async with self.llm:
+            return await async_llm_client.call_reasoning_model(
+                prompt=prompt,
+                system_prompt=OUTCOME_SYSTEM_PROMPT,
+                temperature=0.3
+            )
+
+
+def merge_search_results(primary: List[Dict], extra: List[Dict], limit: int = 8) -> List[Dict]:
+    """Top up primary results with unseen URLs from a prefetched search"""
+    merged = list(primary)
+    seen = {r["url"] for r in merged}
+    for result in extra:
+        if len(merged) >= limit:
+            break
+        if result["url"] not in seen:
+            merged.append(result)
+            seen.add(result["url"])
+    return merged
+
+
+async def chronicle_seed_pipelined(
+    seed: Dict,
+    stages: PipelineStages,
+    seed_idx: int,
+    total: int,
+    prefetch: bool = True,
+    journal: Optional[Journal] = None
+) -> Optional[Dict]:
     """
-    Chronicle a single seed with async/await
+    Chronicle one seed through the shared search/reasoning stages
 
-    Uses semaphore to limit concurrent API calls
+    With prefetch, the next depth's date window is searched (anchored on the
+    seed event) while the current depth's R1 call runs. Its results top up
+    the parent-anchored search and keep the chain alive if that comes back empty.
+
+    With a journal, the chain resumes after the last recorded depth and each
+    new depth is recorded as soon as it is found.
     """
-    async with semaphore:
-        # Run sync version in executor
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            chronicle_seed_sync,
-            seed,
-            seed_idx,
-            total
-        )
-        return result
-
-
-def chronicle_seed_sync(seed: Dict, seed_idx: int, total: int) -> Optional[Dict]:
-    """Synchronous version of chronicle_seed (from original chronicler.py)"""
-    case_id = f"{seed['date']}_{seed['event'][:30].lower().replace(' ', '_')}"
+    progress = load_progress(seed, journal)
+    case = progress["case"]
+    if progress["status"] == "complete":
+        return case
+
     print(f"\n[{seed_idx}/{total}] 📖 {seed['event'][:60]}...", flush=True)
 
-    case = {
-        "case_id": case_id,
-        "seed": {
-            "event": seed["event"],
-            "date": seed["date"],
-            "context": seed.get("context", "")
-        },
-        "domain": seed["domain"],
-        "knowledge_cutoff": seed["date"],
-        "levels": []
-    }
-
-    path = [seed["event"]]
-    current_event = seed["event"]
-
-    # Build 3-depth chain
-    for depth in range(1, config.MAX_DEPTH + 1):
-        timeframe = depth
-
-        outcome = search_for_outcome(
-            seed_event=seed["event"],
-            seed_date=seed["date"],
-            parent_event=current_event,
-            path=path,
-            timeframe_months=timeframe
-        )
-
-        if not outcome:
-            if depth == 1:
-                return None  # Can't even find first outcome
-            else:
-                break  # Partial chain is OK
-
-        path.append(outcome["event"])
-        current_event = outcome["event"]
-
-        level = {
-            "depth": depth,
-            "parent_event": path[-2],
-            "path": path.copy(),
-            "timeframe_months": timeframe,
-            "date": outcome["date"],
-            "research_summary": outcome.get("research_summary", ""),
-            "candidates": [{"event": outcome["event"], "label": 1}]
-        }
-
-        case["levels"].append(level)
-
-    if case["levels"]:
-        print(f"   ✅ {len(case['levels'])} levels", flush=True)
-        return case
-    else:
+    path = case["levels"][-1]["path"].copy() if case["levels"] else [seed["event"]]
+    current_event = path[-1]
+    prefetched: Optional[asyncio.Task] = None
+
+    try:
+        for depth in range(len(case["levels"]) + 1, config.MAX_DEPTH + 1):
+            start_date, end_date = calculate_search_dates(seed["date"], depth)
+
+            try:
+                search_results = await stages.run_search(
+                    build_search_query(current_event, start_date), start_date, end_date
+                )
+                if prefetched is not None:
+                    search_results = merge_search_results(search_results, await prefetched)
+                    prefetched = None
+            except Exception as e:
+                print(f"     ❌ [{seed_idx}] Search failed at depth {depth}: {e}", flush=True)
+                break
+
+            # Speculatively fetch the next window while R1 works on this one
+            if prefetch and depth < config.MAX_DEPTH:
+                next_start, next_end = calculate_search_dates(seed["date"], depth + 1)
+                prefetched = asyncio.create_task(stages.run_search(
+                    build_search_query(seed["event"], next_start), next_start, next_end
+                ))
+
+            if not search_results:
+                print(f"     ⚠️  [{seed_idx}] No search results at depth {depth}", flush=True)
+                break
+
+            prompt = build_outcome_prompt(
+                seed["event"], seed["date"], current_event, path, depth, search_results
+            )
+            try:
+                outcome = parse_outcome(await stages.run_reasoning(prompt))
+            except Exception as e:
+                print(f"     ❌ [{seed_idx}] Reasoning failed at depth {depth}: {e}", flush=True)
+                break
+
+            if not outcome:
+                break  # Partial chain is OK (empty chain is dropped below)
+
+            path.append(outcome["event"])
+            current_event = outcome["event"]
+            case["levels"].append(make_level(depth, path, outcome))
+            # Journal appends fsync; keep them off the event loop
+            await asyncio.to_thread(record_progress, journal, case, "partial")
+    finally:
+        if prefetched is not None:
+            prefetched.cancel()
+
+    if not case["levels"]:
         return None
 
+    await asyncio.to_thread(record_progress, journal, case, "complete")
+    print(f"   ✅ [{seed_idx}] {len(case['levels'])} levels", flush=True)
+    return case
+
 
-async def chronicle_all_parallel(seeds: List[Dict], max_concurrent: int = 10) -> List[Dict]:
+async def chronicle_all_parallel(
+    seeds: List[Dict],
+    search_workers: int = None,
+    llm_workers: int = None,
+    prefetch: bool = None,
+    journal: Optional[Journal] = None
+) -> List[Dict]:
     """
-    Chronicle all seeds in parallel with rate limiting
+    Chronicle all seeds with pipelined search/reasoning stages
 
     Args:
         seeds: List of seed events
-        max_concurrent: Max concurrent API calls (respect Exa limits)
+        search_workers: Concurrent Exa searches (default Config.SEARCH_WORKERS)
+        llm_workers: Concurrent R1 calls (default Config.LLM_WORKERS)
+        prefetch: Speculatively prefetch next-depth searches (default Config.PREFETCH_SEARCH)
+        journal: Chronicle journal; seeds already complete in it are skipped
+            and every depth is recorded as it finishes
 
     Returns:
-        List of cases with outcome chains
+        List of newly chronicled cases, in completion order
     """
-    print(f"\n🚀 Parallel Chronicle: {len(seeds)} seeds, max {max_concurrent} concurrent")
-    print(f"   Exa rate limit: ~{max_concurrent * 60} requests/min\n")
+    search_workers = search_workers or config.SEARCH_WORKERS
+    llm_workers = llm_workers or config.LLM_WORKERS
+    prefetch = config.PREFETCH_SEARCH if prefetch is None else prefetch
 
-    semaphore = asyncio.Semaphore(max_concurrent)
+    if journal is not None:
+        done_ids = {case["case_id"] for case in completed_cases(seeds, journal)}
+        pending = [seed for seed in seeds if make_case_id(seed) not in done_ids]
+        if len(pending) < len(seeds):
+            print(f"\n⏭️  Skipping {len(seeds) - len(pending)} seeds already chronicled")
+        seeds = pending
+
+    print(f"\n🚀 Pipelined Chronicle: {len(seeds)} seeds")
+    print(f"   Workers: {search_workers} search, {llm_workers} reasoning | prefetch: {prefetch}")
+    print(f"   Rate limits: OpenRouter {config.REQUESTS_PER_MINUTE}/min, Exa {config.EXA_REQUESTS_PER_MINUTE}/min\n")
+
+    if not seeds:
+        return []
+
+    stages = PipelineStages(search_workers, llm_workers)
+    meter = ProgressMeter(len(seeds))
 
-    # Create tasks
     tasks = [
-        chronicle_seed_async(seed, semaphore, i+1, len(seeds))
+        chronicle_seed_pipelined(seed, stages, i+1, len(seeds), prefetch, journal)
         for i, seed in enumerate(seeds)
     ]
 
-    # Run all concurrently
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    # Filter out failures
+    # Take cases as they finish (each is already journaled) rather than
+    # waiting on the slowest seed
     cases = []
-    for result in results:
-        if isinstance(result, Exception):
-            print(f"   ⚠️  Seed failed: {result}")
-        elif result is not None:
-            cases.append(result)
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                result = await next_done
+            except Exception as e:
+                print(f"   ⚠️  Seed failed: {e}", flush=True)
+                result = None
+
+            if result is not None:
+                cases.append(result)
+            print(meter.update(ok=result is not None), flush=True)
+    finally:
+        stages.executor.shutdown(wait=False)
+        await async_llm_client.aclose()
 
     return cases
 
@@ -152,18 +250,14 @@ def main():
 
     print(f"\n📚 Loaded {len(seeds)} seeds")
 
-    # Check checkpoint
-    cases = load_checkpoint("cases_partial.json")
-    if cases:
-        print(f"  ✅ Resuming: {len(cases)} cases already done")
-    else:
-        cases = []
-
-    # Run parallel chronicle
-    new_cases = asyncio.run(chronicle_all_parallel(seeds, max_concurrent=10))
-
-    # Merge with existing
-    all_cases = cases + new_cases
+    # Resume from the per-seed journal (shared with the sequential chronicler)
+    journal = open_chronicle_journal()
+    try:
+        asyncio.run(chronicle_all_parallel(seeds, journal=journal))
+        all_cases = completed_cases(seeds, journal)
+        journal.compact()
+    finally:
+        journal.close()
 
     # Save
     save_checkpoint(all_cases, "cases_chronicled.json")
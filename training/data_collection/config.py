@@ -43,9 +43,42 @@ class Config:
     CHECKPOINT_DIR: str = None
 
     # Rate Limiting
-    REQUESTS_PER_MINUTE: int = 60
+    REQUESTS_PER_MINUTE: int = 60  # OpenRouter token bucket
+    EXA_REQUESTS_PER_MINUTE: int = 300  # Exa token bucket (5 QPS)
+    RATE_LIMIT_DIR: str = None  # Bucket state shared by all local processes
     RETRY_ATTEMPTS: int = 3
     RETRY_DELAY: int = 2  # seconds
+    MAX_CONCURRENT_REQUESTS: int = 200  # Pooled connections for AsyncLLMClient
+
+    # LLM completion cache
+    LLM_CACHE_MODE: str = os.getenv("LLM_CACHE_MODE", "readwrite")  # readwrite | replay | off
+    LLM_CACHE_PATH: str = None
+    LLM_CACHE_MAX_MB: int = 1024
+
+    # Exa search cache / connection pool
+    SEARCH_CACHE_PATH: str = None
+    SEARCH_CACHE_MAX_MB: int = 256
+    SEARCH_CACHE_TTL_HOURS: int = 24 * 30  # Historical windows rarely change
+    SEARCH_POOL_SIZE: int = 32
+
+    # Pipelined chronicler stage workers
+    SEARCH_WORKERS: int = 16
+    LLM_WORKERS: int = 64  # R1 calls take 30-90s, so keep many in flight
+    PREFETCH_SEARCH: bool = True  # Speculatively search the next depth's window
+
+    # Stream mode (pipeline.py --stream)
+    CHRONICLE_WORKERS: int = 32  # Seeds being chronicled at once
+    STREAM_QUEUE_SIZE: int = 64  # Bound on each inter-stage queue
+
+    # Seed generation
+    SEED_BATCH_WORKERS: int = 8  # 10-seed batches in flight
+    SEED_MAX_ROUNDS: int = 5  # Top-up rounds to replace duplicate seeds
+    SEED_DEDUP_THRESHOLD: float = 0.5  # Event-token Jaccard for a near-duplicate
+    SEED_DEDUP_DATE_WINDOW_DAYS: int = 14
+
+    # Alternative generation
+    ALTERNATIVE_WORKERS: int = 16  # Cases in flight (levels of a case run concurrently)
+    BATCH_ALTERNATIVES: bool = False  # One prompt per case covering every depth
 
     def __post_init__(self):
         if self.DOMAINS is None:
@@ -64,12 +97,21 @@ class Config:
             self.OUTPUT_PATH = str(project_root / "training/data/real_historical_cases.jsonl")
         if self.CHECKPOINT_DIR is None:
             self.CHECKPOINT_DIR = str(project_root / "training/data_collection/checkpoints")
+        if self.LLM_CACHE_PATH is None:
+            self.LLM_CACHE_PATH = str(project_root / "training/data_collection/checkpoints/llm_cache.sqlite")
+        if self.SEARCH_CACHE_PATH is None:
+            self.SEARCH_CACHE_PATH = str(project_root / "training/data_collection/checkpoints/search_cache.sqlite")
+        if self.RATE_LIMIT_DIR is None:
+            import tempfile
+            self.RATE_LIMIT_DIR = os.path.join(tempfile.gettempdir(), "psychohistory-ratelimit")
 
         # Validation
         if not self.OPENROUTER_API_KEY:
             raise ValueError("OPENROUTER_API_KEY environment variable not set")
         if not self.EXA_API_KEY:
             print("⚠️  EXA_API_KEY not set - web search will be limited")
+        if self.LLM_CACHE_MODE not in ("readwrite", "replay", "off"):
+            raise ValueError(f"LLM_CACHE_MODE must be readwrite, replay or off (got {self.LLM_CACHE_MODE!r})")
 
         # Create directories
         os.makedirs(os.path.dirname(self.OUTPUT_PATH), exist_ok=True)
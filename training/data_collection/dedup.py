@@ -0,0 +1,103 @@
+"""
+Near-duplicate suppression for seed events.
+
+Seeds are compared on normalised `event` tokens (lowercased, punctuation and
+stopwords dropped, plural "s" stripped). An inverted token index means each
+new seed is only scored against seeds sharing a token with it, and the
+Jaccard similarity falls out of the shared-token counts. Two seeds are
+duplicates when their similarity reaches the threshold and their dates are
+within a small window (the same event is often reported a day or two apart).
+"""
+
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "to", "for", "by", "with", "and",
+    "or", "as", "from", "after", "its", "his", "her", "their", "is", "are",
+    "was", "were", "be", "into", "over", "amid", "new",
+}
+
+
+def normalize_tokens(text: str) -> Set[str]:
+    """Content tokens of an event description"""
+    tokens = set()
+    for token in re.findall(r"[a-z0-9]+", text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.add(token)
+    return tokens
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+class SeedDeduper:
+    """Inverted-index near-duplicate filter over seed event text and date"""
+
+    def __init__(self, threshold: float = 0.5, date_window_days: int = 14):
+        """
+        Args:
+            threshold: Token Jaccard similarity at or above which seeds match
+            date_window_days: Max date difference for a match (unparseable dates always pass)
+        """
+        self.threshold = threshold
+        self.date_window_days = date_window_days
+        self.seeds: List[Dict] = []
+        self._tokens: List[Set[str]] = []
+        self._dates: List[Optional[datetime]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+    def find_duplicate(self, seed: Dict) -> Optional[Dict]:
+        """Most similar accepted seed that duplicates this one, or None"""
+        tokens = normalize_tokens(seed.get("event", ""))
+        if not tokens:
+            return None
+
+        shared = defaultdict(int)
+        for token in tokens:
+            for idx in self._postings.get(token, ()):
+                shared[idx] += 1
+
+        date = _parse_date(seed.get("date", ""))
+        best, best_score = None, 0.0
+        for idx, overlap in shared.items():
+            score = overlap / (len(tokens) + len(self._tokens[idx]) - overlap)
+            if score < self.threshold or score <= best_score:
+                continue
+            other_date = self._dates[idx]
+            if date and other_date and abs((date - other_date).days) > self.date_window_days:
+                continue
+            best, best_score = idx, score
+
+        return self.seeds[best] if best is not None else None
+
+    def add(self, seed: Dict) -> bool:
+        """Accept the seed unless it duplicates one already accepted"""
+        if self.find_duplicate(seed) is not None:
+            return False
+
+        idx = len(self.seeds)
+        tokens = normalize_tokens(seed.get("event", ""))
+        self.seeds.append(seed)
+        self._tokens.append(tokens)
+        self._dates.append(_parse_date(seed.get("date", "")))
+        for token in tokens:
+            self._postings[token].append(idx)
+        return True
+
+    def filter(self, seeds: List[Dict]) -> List[Dict]:
+        """Accept each seed in order, returning the ones that were new"""
+        return [seed for seed in seeds if self.add(seed)]
+
+    def __len__(self) -> int:
+        return len(self.seeds)
@@ -0,0 +1,112 @@
+"""
+Append-only JSONL journal for incremental checkpoints.
+
+Each record is one line `{"key": ..., "record": ...}`, flushed and fsync'd
+before append() returns, so a crash loses at most the unit of work in
+progress. Later records for the same key supersede earlier ones; an
+in-memory index maps key -> latest record for O(1) resume checks.
+compact() atomically rewrites the file with one line per key.
+"""
+
+import os
+import json
+import threading
+from typing import Any, Dict, Iterator
+
+
+class Journal:
+    """Append-only, fsync'd JSONL journal with a key index"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Journal file (created if missing)
+        """
+        self.path = path
+        self._index: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._load()
+        self._file = open(self.path, "a")
+
+    def _load(self):
+        """Rebuild the index, dropping a torn trailing record from a crash"""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        # A crash mid-write leaves a partial last line: truncate it so the
+        # next append starts on a clean line
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+            data = data[:end]
+
+        for line in data.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self._index[entry["key"]] = entry["record"]
+
+    def append(self, key: str, record: Any):
+        """Durably append a record for key"""
+        line = json.dumps({"key": key, "record": record}) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._index[key] = record
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._index.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def items(self) -> Iterator:
+        return iter(list(self._index.items()))
+
+    def values(self) -> Iterator:
+        return iter(list(self._index.values()))
+
+    def compact(self):
+        """Atomically rewrite the journal with only the latest record per key"""
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                for key, record in self._index.items():
+                    f.write(json.dumps({"key": key, "record": record}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._fsync_dir()
+            self._file = open(self.path, "a")
+
+    def _fsync_dir(self):
+        """Make the rename durable (no-op where directories can't be opened)"""
+        try:
+            fd = os.open(os.path.dirname(self.path) or ".", os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -8,11 +8,14 @@ Usage:
     python pipeline.py --stage brainstorm  # Just generate seeds
     python pipeline.py --stage chronicle   # Just chronicle seeds
     python pipeline.py --stage verify      # Verify and output JSONL
+    python pipeline.py --stage stream      # Seeds flow chronicle → alternatives → export individually
 """
 
 import sys
 import os
 import json
+import time
+import asyncio
 import argparse
 from pathlib import Path
 
@@ -71,7 +74,44 @@ def export_to_jsonl(cases, output_path):
     print(f"✅ Exported to: {output_path}")
     print(f"   Format: {len(cases)} lines, one case per line")
 
-    # Print stats
+    print_case_stats(cases)
+
+    return output_path
+
+
+def load_exported_cases(output_path):
+    """
+    Cases already in an output JSONL (for resuming stream mode)
+
+    A torn last line from a crash is truncated so appends start on a clean line.
+    """
+    if not os.path.exists(output_path):
+        return []
+
+    with open(output_path, 'rb') as f:
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    if end < len(data):
+        with open(output_path, 'r+b') as f:
+            f.truncate(end)
+        data = data[:end]
+
+    cases = []
+    for line in data.decode('utf-8').splitlines():
+        if line.strip():
+            try:
+                cases.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return cases
+
+
+def print_case_stats(cases):
+    """Print level/candidate statistics for exported cases"""
+    if not cases:
+        print("\n📊 Statistics: no cases")
+        return
+
     total_levels = sum(len(c["levels"]) for c in cases)
     total_candidates = sum(
         len(level["candidates"])
@@ -93,14 +133,128 @@ def export_to_jsonl(cases, output_path):
     print(f"   Negative examples (label=0): {total_negatives}")
     print(f"   Avg depth per case: {total_levels / len(cases):.1f}")
 
-    return output_path
+
+async def run_streaming(
+    output_path: str,
+    chronicle_workers: int,
+    alternative_workers: int,
+    queue_size: int
+):
+    """
+    Streaming mode: each seed flows chronicle → alternatives → export on its own
+
+    Stages are connected by bounded queues, so a finished case is appended to
+    the output JSONL as soon as its alternatives are done instead of waiting
+    for every other seed. Brainstorming still runs first (seeds are needed
+    up front).
+
+    Resumable like the staged mode: chronicling and alternatives record
+    progress in the same journals, and a rerun appends to the output,
+    skipping seeds whose case is already in it.
+    """
+    from agents.chronicler_parallel import PipelineStages, chronicle_seed_pipelined
+    from agents.chronicler import make_case_id, open_chronicle_journal
+    from utils import async_llm_client, load_checkpoint, save_checkpoint, open_journal
+
+    print("\n" + "=" * 80)
+    print("STREAM: chronicle → alternatives → export")
+    print("=" * 80)
+
+    seeds = load_checkpoint("seeds_final.json")
+    if not seeds:
+        print("❌ No seeds found. Run --stage brainstorm first.")
+        return []
+
+    completed = load_exported_cases(output_path)
+    exported_ids = {case['case_id'] for case in completed}
+    if exported_ids:
+        print(f"\n♻️  {len(exported_ids)} cases already in {output_path}, skipping their seeds")
+    seeds = [seed for seed in seeds if make_case_id(seed) not in exported_ids]
+
+    print(f"\n📚 {len(seeds)} seeds | workers: {chronicle_workers} chronicle, "
+          f"{alternative_workers} alternatives | queue size: {queue_size}")
+
+    seed_queue = asyncio.Queue(maxsize=queue_size)
+    case_queue = asyncio.Queue(maxsize=queue_size)
+    export_queue = asyncio.Queue(maxsize=queue_size)
+    stages = PipelineStages(config.SEARCH_WORKERS, config.LLM_WORKERS)
+    chronicle_journal = open_chronicle_journal()
+    alternatives_journal = open_journal("alternatives.journal.jsonl")
+    start_time = time.time()
+
+    async def feed_seeds():
+        for i, seed in enumerate(seeds):
+            await seed_queue.put((i + 1, seed))
+        for _ in range(chronicle_workers):
+            await seed_queue.put(None)
+
+    async def chronicle_worker():
+        while (item := await seed_queue.get()) is not None:
+            idx, seed = item
+            try:
+                case = await chronicle_seed_pipelined(
+                    seed, stages, idx, len(seeds), config.PREFETCH_SEARCH, chronicle_journal
+                )
+            except Exception as e:
+                print(f"   ⚠️  Seed failed: {e}")
+                continue
+            if case:
+                await case_queue.put(case)
+
+    async def alternatives_worker():
+        while (case := await case_queue.get()) is not None:
+            await export_queue.put(await alternative_gen.generate_alternatives_async(case, alternatives_journal))
+
+    async def exporter():
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'a') as f:
+            while (case := await export_queue.get()) is not None:
+                if case['case_id'] in exported_ids:
+                    continue
+                f.write(json.dumps(case) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+                exported_ids.add(case['case_id'])
+                completed.append(case)
+                elapsed = time.time() - start_time
+                print(f"   📝 Exported {len(completed)} cases ({elapsed / 60:.1f} min): {case['case_id'][:50]}", flush=True)
+
+    async def close_after(workers, queue, count):
+        await asyncio.gather(*workers)
+        for _ in range(count):
+            await queue.put(None)
+
+    chronicle_tasks = [asyncio.create_task(chronicle_worker()) for _ in range(chronicle_workers)]
+    alternative_tasks = [asyncio.create_task(alternatives_worker()) for _ in range(alternative_workers)]
+
+    try:
+        await asyncio.gather(
+            feed_seeds(),
+            close_after(chronicle_tasks, case_queue, alternative_workers),
+            close_after(alternative_tasks, export_queue, 1),
+            exporter()
+        )
+        chronicle_journal.compact()
+        alternatives_journal.compact()
+    finally:
+        stages.executor.shutdown(wait=False)
+        await async_llm_client.aclose()
+        chronicle_journal.close()
+        alternatives_journal.close()
+
+    save_checkpoint(completed, "cases_complete.json")
+
+    print(f"\n✅ Streamed {len(completed)} cases to {output_path} in {(time.time() - start_time) / 60:.1f} min")
+    print_case_stats(completed)
+
+    return completed
 
 
 def main():
     parser = argparse.ArgumentParser(description="Run data collection pipeline")
     parser.add_argument(
         "--stage",
-        choices=["all", "brainstorm", "chronicle", "alternatives", "export"],
+        choices=["all", "brainstorm", "chronicle", "alternatives", "export", "stream"],
         default="all",
         help="Which stage to run"
     )
@@ -109,18 +263,46 @@ def main():
         default=config.OUTPUT_PATH,
         help="Output path for final JSONL"
     )
+    parser.add_argument(
+        "--cache-mode",
+        choices=["readwrite", "replay", "off"],
+        default=config.LLM_CACHE_MODE,
+        help="LLM completion cache: reuse and record, replay only (offline), or bypass"
+    )
+
+    parser.add_argument(
+        "--chronicle-workers",
+        type=int,
+        default=config.CHRONICLE_WORKERS,
+        help="Stream mode: seeds being chronicled at once"
+    )
+    parser.add_argument(
+        "--alternative-workers",
+        type=int,
+        default=config.ALTERNATIVE_WORKERS,
+        help="Stream mode: cases getting alternatives at once"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=config.STREAM_QUEUE_SIZE,
+        help="Stream mode: bound on each inter-stage queue"
+    )
 
     args = parser.parse_args()
+    config.LLM_CACHE_MODE = args.cache_mode
 
     print("\n" + "="*80)
     print("🏭 PSYCHOHISTORY DATA COLLECTION PIPELINE")
     print("="*80)
     print(f"\nConfiguration:")
-    print(f"  Target: {config.NUM_SEEDS} cases")
-    print(f"  Years: {config.SEED_START_YEAR}-{config.SEED_END_YEAR}")
+    print(f"  Target: {config.NUM_SEEDS_POST_CUTOFF + config.NUM_SEEDS_IN_DISTRIBUTION} cases")
+    print(f"  Post-cutoff: {config.POST_CUTOFF_START} to {config.POST_CUTOFF_END}")
+    print(f"  In-distribution: {config.IN_DIST_START_YEAR}-{config.IN_DIST_END_YEAR}")
     print(f"  Depth: {config.MAX_DEPTH} levels")
     print(f"  Alternatives: {config.ALTERNATIVES_PER_DEPTH} per level")
     print(f"  Output: {args.output}")
+    print(f"  LLM cache: {config.LLM_CACHE_MODE}")
 
     try:
         if args.stage == "all":
@@ -146,6 +328,17 @@ def main():
         elif args.stage == "alternatives":
             run_alternatives()
 
+        elif args.stage == "stream":
+            from utils import load_checkpoint
+            if not load_checkpoint("seeds_final.json"):
+                run_brainstorm()
+            asyncio.run(run_streaming(
+                args.output,
+                args.chronicle_workers,
+                args.alternative_workers,
+                args.queue_size
+            ))
+
         elif args.stage == "export":
             from utils import load_checkpoint
             cases = load_checkpoint("cases_complete.json")
@@ -165,6 +358,9 @@ def main():
         print(f"\n\n❌ Pipeline failed: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        from utils import print_cache_stats
+        print_cache_stats()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,225 @@
+"""
+Token-bucket rate limiting for API providers.
+
+One bucket per provider (OpenRouter, Exa). Buckets are safe to share between
+threads and asyncio tasks, and their state lives in a small file guarded by
+an exclusive lock so several pipeline processes on the same machine draw
+from the same budget.
+
+429 responses block the bucket for the Retry-After period and halve the
+refill rate; successful calls restore it gradually.
+
+The *_async methods run file-locked updates on a worker thread, so waiting
+for another process's flock never stalls the event loop.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: buckets are per-process only
+    fcntl = None
+
+
+MIN_RATE_FACTOR = 0.1  # Never throttle below 10% of the configured rate
+RECOVERY_STEP = 0.05  # Rate factor regained per successful call
+
+
+class RateLimiter:
+    """Token bucket shared across threads, asyncio tasks and processes"""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        burst: Optional[int] = None,
+        state_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            name: Provider name (also the state file name)
+            requests_per_minute: Sustained request rate
+            burst: Bucket capacity (defaults to 10 seconds worth of requests)
+            state_dir: Directory for the shared state file (None = per-process)
+        """
+        self.name = name
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst or max(1, requests_per_minute // 6)
+        self.state_path = None
+        if state_dir and fcntl is not None:
+            os.makedirs(state_dir, exist_ok=True)
+            self.state_path = os.path.join(state_dir, f"{name}.bucket")
+
+        self._lock = threading.Lock()
+        self._state = self._initial_state()
+
+    def _initial_state(self) -> Dict[str, float]:
+        return {
+            "tokens": float(self.burst),
+            "updated": time.time(),
+            "blocked_until": 0.0,
+            "factor": 1.0
+        }
+
+    def _update(self, fn: Callable[[Dict[str, float]], Any]) -> Any:
+        """Apply fn to the bucket state under the thread and file locks"""
+        with self._lock:
+            if self.state_path is None:
+                return fn(self._state)
+
+            with open(self.state_path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    raw = f.read()
+                    try:
+                        state = json.loads(raw) if raw else self._initial_state()
+                    except json.JSONDecodeError:
+                        state = self._initial_state()
+
+                    result = fn(state)
+
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                    return result
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    async def _update_async(self, fn: Callable[[Dict[str, float]], Any]) -> Any:
+        """_update without blocking the event loop (in-memory buckets update inline)"""
+        if self.state_path is None:
+            return self._update(fn)
+        return await asyncio.to_thread(self._update, fn)
+
+    def _take(self, state: Dict[str, float]) -> float:
+        """Consume a token if available, else return seconds to wait"""
+        now = time.time()
+        if now < state["blocked_until"]:
+            return state["blocked_until"] - now
+
+        rate = self.rate * state["factor"]
+        state["tokens"] = min(self.burst, state["tokens"] + (now - state["updated"]) * rate)
+        state["updated"] = now
+
+        if state["tokens"] >= 1.0:
+            state["tokens"] -= 1.0
+            return 0.0
+        return (1.0 - state["tokens"]) / rate
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent"""
+        while True:
+            wait = self._update(self._take)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait on the event loop until a request may be sent"""
+        while True:
+            wait = await self._update_async(self._take)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """
+        Record a 429: pause the bucket and halve the refill rate
+
+        Args:
+            retry_after: Seconds from the Retry-After header (None = 1/rate)
+        """
+        delay, apply = self._penalty(retry_after)
+        self._report_penalty(delay, self._update(apply))
+
+    async def penalize_async(self, retry_after: Optional[float] = None):
+        """penalize without blocking the event loop"""
+        delay, apply = self._penalty(retry_after)
+        self._report_penalty(delay, await self._update_async(apply))
+
+    def _penalty(self, retry_after: Optional[float]):
+        """(pause in seconds, state update) for a 429"""
+        delay = retry_after if retry_after is not None else 1.0 / self.rate
+
+        def apply(state):
+            now = time.time()
+            state["blocked_until"] = max(state["blocked_until"], now + delay)
+            state["factor"] = max(MIN_RATE_FACTOR, state["factor"] * 0.5)
+            state["tokens"] = 0.0
+            state["updated"] = now
+            return state["factor"]
+
+        return delay, apply
+
+    def _report_penalty(self, delay: float, factor: float):
+        print(f"⏳ {self.name} rate limited: pausing {delay:.1f}s, "
+              f"rate now {factor * 100:.0f}%")
+
+    def record_success(self):
+        """Gradually restore the refill rate after a 429"""
+        self._update(self._restore)
+
+    async def record_success_async(self):
+        """record_success without blocking the event loop"""
+        await self._update_async(self._restore)
+
+    def _restore(self, state: Dict[str, float]):
+        if state["factor"] < 1.0:
+            state["factor"] = min(1.0, state["factor"] + RECOVERY_STEP)
+
+
+def _error_response(error: Exception):
+    return getattr(error, "response", None)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True if the exception came from an HTTP 429 (openai or requests)"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(_error_response(error), "status_code", None)
+    return status == 429
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Parse Retry-After (seconds or HTTP date) from an exception's response"""
+    headers = getattr(_error_response(error), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float, error: Optional[Exception] = None) -> float:
+    """
+    Delay before the next retry
+
+    Honours Retry-After when the provider sends one, otherwise exponential
+    backoff with jitter starting at base_delay.
+    """
+    if error is not None:
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return retry_after
+
+    return base_delay * (2 ** attempt) * (0.5 + random.random())
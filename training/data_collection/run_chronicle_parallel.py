@@ -1,5 +1,5 @@
 """
-Run Parallel Chronicler: 10 concurrent seeds with rate limiting
+Run Parallel Chronicler: pipelined search/reasoning stages with rate limiting
 """
 
 import os
@@ -38,8 +38,8 @@ from agents import chronicler_parallel
 if __name__ == "__main__":
     print("\n🚀 PARALLEL CHRONICLER")
     print(f"   {len(verified_seeds)} seeds")
-    print(f"   10 concurrent workers")
-    print(f"   ~600 requests/min (within Exa limits)")
+    print(f"   {config.SEARCH_WORKERS} search / {config.LLM_WORKERS} reasoning workers")
+    print(f"   Rate limits: OpenRouter {config.REQUESTS_PER_MINUTE}/min, Exa {config.EXA_REQUESTS_PER_MINUTE}/min")
     print("="*80, flush=True)
 
     cases = chronicler_parallel.main()
@@ -4,19 +4,41 @@ Shared utilities for data collection agents.
 
 import json
 import time
+import asyncio
+import threading
 import requests
+from concurrent.futures import Future
 from typing import Dict, List, Any, Optional
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from config import config
+from journal import Journal
+from cache import DiskCache, CacheMissError, make_key
+from rate_limiter import RateLimiter, is_rate_limit_error, retry_after_seconds, backoff_delay
+
+
+def completion_key(
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    sample: Optional[int] = None
+) -> str:
+    """Completion cache key (unchanged from earlier runs when sample is None)"""
+    if sample is None:
+        return make_key(model, system_prompt, prompt, temperature, max_tokens)
+    return make_key(model, system_prompt, prompt, temperature, max_tokens, {"sample": sample})
 
 
 class LLMClient:
     """Client for calling DeepSeek models via OpenRouter"""
 
     def __init__(self):
+        # Retries go through our own loop so they respect the rate limiter
         self.client = OpenAI(
             api_key=config.OPENROUTER_API_KEY,
-            base_url=config.OPENROUTER_BASE_URL
+            base_url=config.OPENROUTER_BASE_URL,
+            max_retries=0
         )
 
     def call_research_model(
@@ -24,13 +46,49 @@ class LLMClient:
         prompt: str,
         system_prompt: str = "You are a helpful research assistant.",
         temperature: float = 0.7,
-        max_tokens: int = 4000
+        max_tokens: int = 4000,
+        sample: Optional[int] = None
+    ) -> str:
+        """Call DeepSeek V3.1 for research/generation tasks (see _complete for sample)"""
+        return self._complete(config.RESEARCH_MODEL, prompt, system_prompt, temperature, max_tokens, sample)
+
+    def call_reasoning_model(
+        self,
+        prompt: str,
+        system_prompt: str = "You are a reasoning assistant that thinks step-by-step.",
+        temperature: float = 1.0,
+        max_tokens: int = 8000,
+        sample: Optional[int] = None
     ) -> str:
-        """Call DeepSeek V3.1 for research/generation tasks"""
+        """Call DeepSeek R1 for reasoning/analysis tasks (see _complete for sample)"""
+        return self._complete(config.REASONING_MODEL, prompt, system_prompt, temperature, max_tokens, sample)
+
+    def _complete(
+        self,
+        model: str,
+        prompt: str,
+        system_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        sample: Optional[int] = None
+    ) -> str:
+        """
+        Run a chat completion with retries (served from the completion cache when possible)
+
+        Identical requests share one cache entry. Callers that want several
+        independent samples of the same prompt pass a distinct `sample` index
+        per draw, which becomes part of the cache key.
+        """
+        key = completion_key(model, system_prompt, prompt, temperature, max_tokens, sample)
+        cached = cache_lookup(key)
+        if cached is not None:
+            return cached
+
         for attempt in range(config.RETRY_ATTEMPTS):
+            openrouter_limiter.acquire()
             try:
                 response = self.client.chat.completions.create(
-                    model=config.RESEARCH_MODEL,
+                    model=model,
                     messages=[
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": prompt}
@@ -38,26 +96,108 @@ class LLMClient:
                     temperature=temperature,
                     max_tokens=max_tokens
                 )
-                return response.choices[0].message.content
+                openrouter_limiter.record_success()
+                content = response.choices[0].message.content
+                break
             except Exception as e:
                 print(f"LLM call failed (attempt {attempt + 1}/{config.RETRY_ATTEMPTS}): {e}")
+                if is_rate_limit_error(e):
+                    openrouter_limiter.penalize(retry_after_seconds(e))
                 if attempt < config.RETRY_ATTEMPTS - 1:
-                    time.sleep(config.RETRY_DELAY)
+                    time.sleep(backoff_delay(attempt, config.RETRY_DELAY, e))
                 else:
                     raise
 
-    def call_reasoning_model(
+        # Outside the retry loop: a cache write error is not a failed LLM call
+        cache_store(key, content)
+        return content
+
+
+class AsyncLLMClient:
+    """
+    Asyncio client for calling DeepSeek models via OpenRouter
+
+    Every call goes through one pooled HTTP client, so hundreds of requests
+    can be in flight from a single event loop without executor threads.
+    Same models, defaults and retry semantics as LLMClient.
+    """
+
+    def __init__(self, max_connections: Optional[int] = None):
+        self.max_connections = max_connections or config.MAX_CONCURRENT_REQUESTS
+        self._client = None
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Lazily create the pooled client (bound to the running event loop)"""
+        if self._client is None:
+            import httpx
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            )
+            self._client = AsyncOpenAI(
+                api_key=config.OPENROUTER_API_KEY,
+                base_url=config.OPENROUTER_BASE_URL,
+                http_client=httpx.AsyncClient(limits=limits),
+                max_retries=0
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the connection pool (call before the event loop shuts down)"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def call_research_model(
+        self,
+        prompt: str,
+        system_prompt: str = "You are a helpful research assistant.",
+        temperature: float = 0.7,
+        max_tokens: int = 4000,
+        sample: Optional[int] = None
+    ) -> str:
+        """Call DeepSeek V3.1 for research/generation tasks (see _complete for sample)"""
+        return await self._complete(config.RESEARCH_MODEL, prompt, system_prompt, temperature, max_tokens, sample)
+
+    async def call_reasoning_model(
         self,
         prompt: str,
         system_prompt: str = "You are a reasoning assistant that thinks step-by-step.",
         temperature: float = 1.0,
-        max_tokens: int = 8000
+        max_tokens: int = 8000,
+        sample: Optional[int] = None
+    ) -> str:
+        """Call DeepSeek R1 for reasoning/analysis tasks (see _complete for sample)"""
+        return await self._complete(config.REASONING_MODEL, prompt, system_prompt, temperature, max_tokens, sample)
+
+    async def _complete(
+        self,
+        model: str,
+        prompt: str,
+        system_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        sample: Optional[int] = None
     ) -> str:
-        """Call DeepSeek R1 for reasoning/analysis tasks"""
+        """
+        Run a chat completion with retries (served from the completion cache when possible)
+
+        Identical requests share one cache entry. Callers that want several
+        independent samples of the same prompt pass a distinct `sample` index
+        per draw, which becomes part of the cache key.
+        """
+        key = completion_key(model, system_prompt, prompt, temperature, max_tokens, sample)
+        # SQLite calls (locks, busy timeout, commits) run off the event loop
+        cached = await asyncio.to_thread(cache_lookup, key)
+        if cached is not None:
+            return cached
+
         for attempt in range(config.RETRY_ATTEMPTS):
+            await openrouter_limiter.acquire_async()
             try:
-                response = self.client.chat.completions.create(
-                    model=config.REASONING_MODEL,
+                response = await self.client.chat.completions.create(
+                    model=model,
                     messages=[
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": prompt}
@@ -65,22 +205,65 @@ class LLMClient:
                     temperature=temperature,
                     max_tokens=max_tokens
                 )
-                return response.choices[0].message.content
+                await openrouter_limiter.record_success_async()
+                content = response.choices[0].message.content
+                break
             except Exception as e:
                 print(f"LLM call failed (attempt {attempt + 1}/{config.RETRY_ATTEMPTS}): {e}")
+                if is_rate_limit_error(e):
+                    await openrouter_limiter.penalize_async(retry_after_seconds(e))
                 if attempt < config.RETRY_ATTEMPTS - 1:
-                    time.sleep(config.RETRY_DELAY)
+                    await asyncio.sleep(backoff_delay(attempt, config.RETRY_DELAY, e))
                 else:
                     raise
 
+        # Outside the retry loop: a cache write error is not a failed LLM call
+        await asyncio.to_thread(cache_store, key, content)
+        return content
+
+
+def normalize_search_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical form of an Exa payload for cache keys (case/whitespace-insensitive query)"""
+    normalized = dict(payload)
+    normalized["query"] = " ".join(payload["query"].lower().split())
+    for field in ("include_domains", "exclude_domains"):
+        if field in normalized:
+            normalized[field] = sorted({d.lower() for d in normalized[field]})
+    return normalized
+
 
 class WebSearchClient:
-    """Client for web search via Exa API"""
+    """
+    Client for web search via Exa API
+
+    Requests go through one pooled requests.Session. Results are cached on
+    disk (TTL-aware, keyed by the normalized payload), and concurrent
+    threads asking the same query share a single in-flight HTTP call.
+    """
 
     def __init__(self):
         self.api_key = config.EXA_API_KEY
         self.base_url = "https://api.exa.ai"
 
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=config.SEARCH_POOL_SIZE
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "x-api-key": self.api_key
+        })
+
+        self.cache = DiskCache(
+            config.SEARCH_CACHE_PATH,
+            config.SEARCH_CACHE_MAX_MB * 1024 * 1024,
+            ttl_seconds=config.SEARCH_CACHE_TTL_HOURS * 3600
+        )
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
     def search(
         self,
         query: str,
@@ -122,37 +305,7 @@ class WebSearchClient:
         if exclude_domains:
             payload["exclude_domains"] = exclude_domains
 
-        for attempt in range(config.RETRY_ATTEMPTS):
-            try:
-                response = requests.post(
-                    f"{self.base_url}/search",
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "x-api-key": self.api_key
-                    },
-                    timeout=30
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                # Convert Exa format to our format
-                results = []
-                for result in data.get("results", []):
-                    results.append({
-                        "title": result.get("title", ""),
-                        "url": result.get("url", ""),
-                        "content": result.get("text", "") or result.get("summary", ""),
-                        "score": result.get("score", 0.0)
-                    })
-
-                return results
-            except Exception as e:
-                print(f"Search failed (attempt {attempt + 1}/{config.RETRY_ATTEMPTS}): {e}")
-                if attempt < config.RETRY_ATTEMPTS - 1:
-                    time.sleep(config.RETRY_DELAY)
-                else:
-                    return []
+        return self._search(payload, with_dates=False, label="Search")
 
     def search_with_date_range(
         self,
@@ -185,38 +338,75 @@ class WebSearchClient:
         if end_date:
             payload["end_published_date"] = end_date
 
+        return self._search(payload, with_dates=True, label="Date search")
+
+    def _search(self, payload: Dict[str, Any], with_dates: bool, label: str) -> List[Dict[str, Any]]:
+        """Serve from cache, join an identical in-flight request, or POST to Exa"""
+        key = make_key(normalize_search_payload(payload), with_dates)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            results = self._post(payload, with_dates, label)
+            if results is not None:
+                self.cache.put(key, results)
+            future.set_result(results or [])
+            return results or []
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _post(self, payload: Dict[str, Any], with_dates: bool, label: str) -> Optional[List[Dict[str, Any]]]:
+        """POST to Exa with retries; None if every attempt failed"""
         for attempt in range(config.RETRY_ATTEMPTS):
+            exa_limiter.acquire()
             try:
-                response = requests.post(
+                response = self.session.post(
                     f"{self.base_url}/search",
                     json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "x-api-key": self.api_key
-                    },
                     timeout=30
                 )
                 response.raise_for_status()
+                exa_limiter.record_success()
                 data = response.json()
 
-                # Convert to our format
+                # Convert Exa format to our format
                 results = []
                 for result in data.get("results", []):
-                    results.append({
+                    item = {
                         "title": result.get("title", ""),
                         "url": result.get("url", ""),
                         "content": result.get("text", "") or result.get("summary", ""),
-                        "score": result.get("score", 0.0),
-                        "published_date": result.get("published_date", "")
-                    })
+                        "score": result.get("score", 0.0)
+                    }
+                    if with_dates:
+                        item["published_date"] = result.get("published_date", "")
+                    results.append(item)
 
                 return results
             except Exception as e:
-                print(f"Date search failed (attempt {attempt + 1}/{config.RETRY_ATTEMPTS}): {e}")
+                print(f"{label} failed (attempt {attempt + 1}/{config.RETRY_ATTEMPTS}): {e}")
+                if is_rate_limit_error(e):
+                    exa_limiter.penalize(retry_after_seconds(e))
                 if attempt < config.RETRY_ATTEMPTS - 1:
-                    time.sleep(config.RETRY_DELAY)
+                    time.sleep(backoff_delay(attempt, config.RETRY_DELAY, e))
                 else:
-                    return []
+                    return None
 
 
 def parse_json_response(response: str) -> Optional[Dict]:
@@ -248,6 +438,12 @@ def save_checkpoint(data: Any, filename: str):
     print(f"💾 Checkpoint saved: {filepath}")
 
 
+def open_journal(filename: str) -> Journal:
+    """Open (or create) an append-only journal in the checkpoint directory"""
+    import os
+    return Journal(os.path.join(config.CHECKPOINT_DIR, filename))
+
+
 def load_checkpoint(filename: str) -> Optional[Any]:
     """Load checkpoint data from JSON file"""
     import os
@@ -261,6 +457,66 @@ def load_checkpoint(filename: str) -> Optional[Any]:
     return data
 
 
+class ProgressMeter:
+    """Live completed/failed counts with throughput and ETA"""
+
+    def __init__(self, total: int, unit: str = "cases"):
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.failed = 0
+        self.start = time.time()
+
+    def update(self, ok: bool = True) -> str:
+        """Count one finished item and return a status line"""
+        if ok:
+            self.done += 1
+        else:
+            self.failed += 1
+
+        finished = self.done + self.failed
+        elapsed = time.time() - self.start
+        per_min = finished / elapsed * 60 if elapsed > 0 else 0.0
+        remaining = self.total - finished
+        eta = remaining / per_min if per_min > 0 else 0.0
+        return (f"📈 {finished}/{self.total} {self.unit} ({self.failed} failed) | "
+                f"{per_min:.1f} {self.unit}/min | ETA {eta:.1f} min")
+
+
+# Shared per-provider rate limits (synced across processes via RATE_LIMIT_DIR)
+openrouter_limiter = RateLimiter("openrouter", config.REQUESTS_PER_MINUTE, state_dir=config.RATE_LIMIT_DIR)
+exa_limiter = RateLimiter("exa", config.EXA_REQUESTS_PER_MINUTE, state_dir=config.RATE_LIMIT_DIR)
+
+# Persistent completion cache (see Config.LLM_CACHE_MODE)
+completion_cache = DiskCache(config.LLM_CACHE_PATH, config.LLM_CACHE_MAX_MB * 1024 * 1024)
+
+
+def cache_lookup(key: str) -> Optional[str]:
+    """Cached completion for key (raises CacheMissError on a miss in replay mode)"""
+    if config.LLM_CACHE_MODE == "off":
+        return None
+
+    cached = completion_cache.get(key)
+    if cached is None and config.LLM_CACHE_MODE == "replay":
+        raise CacheMissError(f"No cached completion for {key[:12]} (replay mode)")
+    return cached
+
+
+def cache_store(key: str, content: Optional[str]):
+    """Persist a completion unless caching is disabled"""
+    if content is not None and config.LLM_CACHE_MODE != "off":
+        completion_cache.put(key, content)
+
+
+def print_cache_stats():
+    """Print completion and search cache hit/miss counters"""
+    for name, cache in (("LLM", completion_cache), ("Search", search_client.cache)):
+        stats = cache.stats()
+        print(f"🗄️  {name} cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate'] * 100:.0f}% hit rate), {stats['entries']} entries, {stats['size_mb']:.1f} MB")
+
+
 # Global clients
 llm_client = LLMClient()
+async_llm_client = AsyncLLMClient()
 search_client = WebSearchClient()
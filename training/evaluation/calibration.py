@@ -0,0 +1,223 @@
+"""
+Calibration metrics over full predicted distributions.
+
+Each (case, depth) is one forecast "question": the predicted distribution is
+every node at that depth, weighted by its path probability (product of the
+conditional probabilities from the root), plus an implicit "other" class
+holding any mass the tree left unassigned. The outcome is the node matched
+to the actual event, or "other" when nothing matched.
+
+All questions are scored in one vectorized pass over a padded (questions x
+classes) matrix:
+- multi-class Brier: sum over classes of (p - y)^2, in [0, 2]
+- log loss: -log p(outcome), floored at min_probability
+- ECE and reliability bins over every predicted node (confidence = its
+  probability, hit = it was the matched node)
+
+Bootstrap intervals resample cases (or questions) with a multinomial weight
+matrix, so every replicate is a matrix product over per-case sums rather
+than a Python loop.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# (path probabilities of the candidate nodes, index of the matched one or -1)
+Question = Tuple[List[float], int]
+
+
+@dataclass
+class ReliabilityBin:
+    """One bin of a reliability diagram"""
+    lower: float
+    upper: float
+    count: int
+    confidence: float  # Mean predicted probability
+    frequency: float   # Fraction that happened
+
+
+@dataclass
+class CalibrationMetrics:
+    """Distribution-level calibration metrics"""
+    brier: float
+    log_loss: float
+    ece: float
+    num_questions: int
+    reliability: List[ReliabilityBin]
+    intervals: Dict[str, List[float]] = field(default_factory=dict)  # metric -> [low, high]
+
+
+def path_probabilities(nodes: Sequence[Dict[str, Any]], parent: Sequence[int]) -> List[float]:
+    """Product of conditional probabilities from the root, for preorder nodes (root = 1)"""
+    joint = []
+    for i, node in enumerate(nodes):
+        p = parent[i]
+        joint.append(1.0 if p < 0 else joint[p] * node.get('probability', 0.0))
+    return joint
+
+
+def tree_questions(flat: Any, actual_chain: List[Dict[str, Any]], matches: List[Any]) -> List[Question]:
+    """
+    One question per actual event of a case
+
+    Args:
+        flat: evaluator.FlatTree of the prediction
+        actual_chain: Ground-truth events ({'depth', 'event'})
+        matches: MatchResult per actual event (from the same match pass)
+    """
+    joint = path_probabilities(flat.nodes, flat.parent)
+    questions = []
+    for event_data, match in zip(actual_chain, matches):
+        ids = flat.by_depth.get(event_data['depth'], [])
+        outcome = -1
+        if match.matched:
+            outcome = next((k for k, i in enumerate(ids) if flat.nodes[i].get('event') == match.matched_event), -1)
+        questions.append(([joint[i] for i in ids], outcome))
+    return questions
+
+
+def _distribution_matrix(questions: Sequence[Question]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Padded (Q, K + 1) probabilities with 'other' last, outcome columns and the node mask"""
+    lengths = np.fromiter((len(p) for p, _ in questions), dtype=np.int64, count=len(questions))
+    width = int(lengths.max(initial=0))
+    rows = np.repeat(np.arange(len(questions)), lengths)
+    cols = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    probs = np.zeros((len(questions), width + 1))
+    probs[rows, cols] = np.clip(np.fromiter(
+        (p for ps, _ in questions for p in ps), dtype=np.float64, count=len(rows)
+    ), 0.0, None)
+    mask = np.zeros_like(probs, dtype=bool)
+    mask[rows, cols] = True
+
+    # Over-full rows are renormalised; under-full ones put the rest on 'other'
+    total = probs.sum(axis=1)
+    probs[total > 1.0] /= total[total > 1.0, None]
+    probs[:, width] = np.clip(1.0 - probs.sum(axis=1), 0.0, None)
+
+    outcome = np.fromiter((o for _, o in questions), dtype=np.int64, count=len(questions))
+    outcome[outcome < 0] = width
+    return probs, outcome, mask
+
+
+def question_scores(questions: Sequence[Question], min_probability: float = 0.001) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-question (multi-class Brier, log loss) arrays"""
+    if not questions:
+        return np.zeros(0), np.zeros(0)
+    probs, outcome, _ = _distribution_matrix(questions)
+    return _scores(probs, outcome, min_probability)
+
+
+def _scores(probs: np.ndarray, outcome: np.ndarray, min_probability: float) -> Tuple[np.ndarray, np.ndarray]:
+    rows = np.arange(len(outcome))
+    target = np.zeros_like(probs)
+    target[rows, outcome] = 1.0
+    brier = ((probs - target) ** 2).sum(axis=1)
+    log_loss = -np.log(np.maximum(probs[rows, outcome], min_probability))
+    return brier, log_loss
+
+
+def calibration_metrics(
+    questions: Sequence[Question],
+    groups: Optional[Sequence[int]] = None,
+    n_bins: int = 10,
+    n_bootstrap: int = 1000,
+    confidence: float = 0.95,
+    min_probability: float = 0.001,
+    seed: int = 0
+) -> CalibrationMetrics:
+    """
+    Brier, log loss, ECE and reliability bins, with bootstrap intervals
+
+    Args:
+        questions: (candidate path probabilities, matched index or -1) per question
+        groups: Resampling unit per question, e.g. its case index (default: each question)
+        n_bins: Equal-width reliability bins
+        n_bootstrap: Bootstrap replicates (0 = no intervals)
+        confidence: Interval coverage
+        min_probability: Floor for log loss
+        seed: RNG seed for the resampling
+
+    Returns:
+        CalibrationMetrics
+    """
+    if not questions:
+        return CalibrationMetrics(0.0, 0.0, 0.0, 0, [])
+
+    probs, outcome, mask = _distribution_matrix(questions)
+    num_questions = len(questions)
+    brier, log_loss = _scores(probs, outcome, min_probability)
+
+    # Reliability over predicted nodes only (not padding or 'other')
+    q_idx, k_idx = np.nonzero(mask)
+    conf = probs[q_idx, k_idx]
+    hit = (outcome[q_idx] == k_idx).astype(np.float64)
+    bins = np.minimum((conf * n_bins).astype(np.int64), n_bins - 1)
+
+    # Per-group sums: every metric (and every bootstrap replicate) is built from these
+    groups = np.arange(num_questions) if groups is None else np.unique(np.asarray(groups), return_inverse=True)[1]
+    num_groups = int(groups.max()) + 1
+    per_group = np.stack([
+        np.bincount(groups, minlength=num_groups).astype(np.float64),
+        np.bincount(groups, weights=brier, minlength=num_groups),
+        np.bincount(groups, weights=log_loss, minlength=num_groups),
+    ], axis=1)
+    cell = groups[q_idx] * n_bins + bins
+    bin_count = np.bincount(cell, minlength=num_groups * n_bins).reshape(num_groups, n_bins).astype(np.float64)
+    bin_conf = np.bincount(cell, weights=conf, minlength=num_groups * n_bins).reshape(num_groups, n_bins)
+    bin_hit = np.bincount(cell, weights=hit, minlength=num_groups * n_bins).reshape(num_groups, n_bins)
+
+    def summarize(weights: np.ndarray):
+        """(brier, log loss, ece) for group weights of shape (R, G)"""
+        totals = weights @ per_group
+        counts, confs, hits = weights @ bin_count, weights @ bin_conf, weights @ bin_hit
+        ece = np.abs(hits - confs).sum(axis=1) / np.maximum(counts.sum(axis=1), 1.0)
+        return totals[:, 1] / totals[:, 0], totals[:, 2] / totals[:, 0], ece, counts, confs, hits
+
+    brier_mean, log_loss_mean, ece, counts, confs, hits = summarize(np.ones((1, num_groups)))
+    reliability = [
+        ReliabilityBin(
+            lower=b / n_bins,
+            upper=(b + 1) / n_bins,
+            count=int(counts[0, b]),
+            confidence=float(confs[0, b] / counts[0, b]) if counts[0, b] else 0.0,
+            frequency=float(hits[0, b] / counts[0, b]) if counts[0, b] else 0.0
+        )
+        for b in range(n_bins)
+    ]
+
+    intervals = {}
+    if n_bootstrap > 0:
+        rng = np.random.default_rng(seed)
+        # Replicates in blocks so the weight matrix stays ~10M entries
+        block = max(1, 10_000_000 // num_groups)
+        replicates = []
+        for start in range(0, n_bootstrap, block):
+            size = min(block, n_bootstrap - start)
+            weights = rng.multinomial(num_groups, np.full(num_groups, 1.0 / num_groups), size=size)
+            replicates.append(np.stack(summarize(weights.astype(np.float64))[:3], axis=1))
+        replicates = np.concatenate(replicates)
+
+        tail = (1.0 - confidence) / 2 * 100
+        for name, values in zip(("brier", "log_loss", "ece"), replicates.T):
+            low, high = np.percentile(values, [tail, 100 - tail])
+            intervals[name] = [float(low), float(high)]
+
+    return CalibrationMetrics(
+        brier=float(brier_mean[0]),
+        log_loss=float(log_loss_mean[0]),
+        ece=float(ece[0]),
+        num_questions=num_questions,
+        reliability=reliability,
+        intervals=intervals
+    )
+
+
+def calibration_from_dict(data: Dict[str, Any]) -> CalibrationMetrics:
+    """Rebuild CalibrationMetrics from its asdict() form"""
+    data = dict(data)
+    data['reliability'] = [ReliabilityBin(**b) for b in data['reliability']]
+    return CalibrationMetrics(**data)
@@ -0,0 +1,247 @@
+"""
+Candidate-set evaluation in the training data format.
+
+Each level of a case (data/train.jsonl, data/val.jsonl) has a fixed set of
+candidate events, exactly one labelled as what happened. Instead of
+generating free-form trees and fuzzy-matching them, the model scores every
+candidate: the teacher-forced log-likelihood of the candidate's text as the
+first event of the SFT target JSON, after the same prompt SFT trains on.
+A softmax over a level's candidates gives the model's distribution, and
+the metric is the log loss of the labelled candidate.
+
+All levels of all cases are scored in one batched pass, and the metrics are
+computed with NumPy over a padded (levels x candidates) matrix. No matching
+and no sampling are involved, so the result is deterministic for a given
+checkpoint.
+
+Usage:
+    python training/evaluation/candidate_eval.py --data training/data/val.jsonl \\
+        --adapter /data/models/sft/checkpoint-10 --adapter /data/models/sft/final
+"""
+
+import json
+import argparse
+import sys
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from evaluation.calibration import CalibrationMetrics, calibration_metrics
+except ImportError:  # Running from inside evaluation/
+    from calibration import CalibrationMetrics, calibration_metrics
+
+
+# Start of the SFT target (json.dumps of [{"event": ..., "probability": ...}])
+TARGET_PREFIX = '[{"event": "'
+
+# (prompt, candidate continuations, index of the labelled candidate, depth)
+CandidateLevel = Tuple[str, List[str], int, int]
+
+
+@dataclass
+class CandidateMetrics:
+    """Candidate-set scores for one model"""
+    log_loss: float
+    accuracy: float           # Labelled candidate ranked first (k-way ties earn 1/k)
+    label_probability: float  # Mean probability assigned to the labelled candidate
+    num_levels: int
+    depth_log_loss: Dict[int, float]
+    model_name: str
+    calibration: Optional[CalibrationMetrics] = None
+
+
+def build_level_prompt(case: Dict[str, Any], level: Dict[str, Any]) -> str:
+    """SFT prompt for a level (must match modal_sft.format_example)"""
+    path_str = ' → '.join(level['path']) if level.get('path') else case['seed']['event']
+
+    return f"""Initial Event: {case['seed']['event']}
+Path so far: {path_str}
+Current Event: {level['parent_event']}
+Depth: {level['depth']}/3
+Timeframe: next {level['timeframe_months']} months
+
+Research:
+{level['research_summary']}
+
+Predict 1-5 possible next events following from the current situation.
+
+Requirements:
+- Probabilities sum to 1.0
+- Specific, measurable outcomes
+- Base predictions on research evidence
+
+Output JSON only:
+[{{"event": "...", "probability": 0.3}}]
+"""
+
+
+def candidate_continuation(event: str) -> str:
+    """The candidate's JSON-escaped text plus its closing quote, which ends the event"""
+    return json.dumps(event)[1:]
+
+
+def candidate_levels(cases: Sequence[Dict[str, Any]]) -> List[CandidateLevel]:
+    """Every scoreable level: at least two candidates and exactly one label"""
+    levels = []
+    for case in cases:
+        for level in case.get('levels', []):
+            candidates = level.get('candidates', [])
+            labels = [i for i, c in enumerate(candidates) if c.get('label') == 1]
+            if len(candidates) < 2 or len(labels) != 1:
+                continue
+            levels.append((
+                build_level_prompt(case, level) + "\n" + TARGET_PREFIX,
+                [candidate_continuation(c['event']) for c in candidates],
+                labels[0],
+                level['depth']
+            ))
+    return levels
+
+
+def candidate_metrics(
+    levels: Sequence[CandidateLevel],
+    log_likelihoods: Sequence[Sequence[float]],
+    model_name: str = "unknown",
+    calibration: bool = True
+) -> CandidateMetrics:
+    """
+    Metrics from per-candidate log-likelihoods
+
+    Args:
+        levels: Levels as returned by candidate_levels
+        log_likelihoods: Log-likelihood of each level's candidates, in order
+        model_name: Name/identifier of the model
+        calibration: Also compute Brier/ECE over the candidate distributions
+    """
+    if not levels:
+        raise ValueError("No scoreable candidate levels")
+
+    sizes = np.fromiter((len(c) for _, c, _, _ in levels), dtype=np.int64, count=len(levels))
+    scores = np.full((len(levels), int(sizes.max())), -np.inf)
+    scores[np.arange(sizes.max()) < sizes[:, None]] = np.fromiter(
+        (x for row in log_likelihoods for x in row), dtype=np.float64, count=int(sizes.sum())
+    )
+    labels = np.fromiter((label for _, _, label, _ in levels), dtype=np.int64, count=len(levels))
+    depths = np.fromiter((depth for _, _, _, depth in levels), dtype=np.int64, count=len(levels))
+
+    # Softmax over each level's candidates
+    log_probs = scores - scores.max(axis=1, keepdims=True)
+    log_probs -= np.log(np.exp(log_probs).sum(axis=1, keepdims=True))
+    rows = np.arange(len(levels))
+    label_log_probs = log_probs[rows, labels]
+
+    losses = -label_log_probs
+    depth_log_loss = {int(d): float(losses[depths == d].mean()) for d in np.unique(depths)}
+
+    # Top-1 with ties split evenly: the label sits at index 0 in the training
+    # data, so argmax's first-index tie-break would count every tie as a hit
+    top = log_probs == log_probs.max(axis=1, keepdims=True)
+    top1 = top[rows, labels] / top.sum(axis=1)
+
+    calibration_result = None
+    if calibration:
+        probs = np.exp(log_probs)
+        calibration_result = calibration_metrics(
+            [(probs[i, :sizes[i]].tolist(), int(labels[i])) for i in range(len(levels))]
+        )
+
+    return CandidateMetrics(
+        log_loss=float(losses.mean()),
+        accuracy=float(top1.mean()),
+        label_probability=float(np.exp(label_log_probs).mean()),
+        num_levels=len(levels),
+        depth_log_loss=depth_log_loss,
+        model_name=model_name,
+        calibration=calibration_result
+    )
+
+
+def evaluate_candidates(
+    score_batch: Callable[[List[Tuple[str, str]]], List[float]],
+    cases: Sequence[Dict[str, Any]],
+    model_name: str = "unknown"
+) -> CandidateMetrics:
+    """
+    Score every level's candidates in one batched call and compute metrics
+
+    Args:
+        score_batch: (prompt, continuation) pairs -> log-likelihoods, e.g.
+            ProbabilityTreeInference.score_candidates_batch
+        cases: Cases in the training data format
+        model_name: Name/identifier of the model
+    """
+    levels = candidate_levels(cases)
+    pairs = [(prompt, c) for prompt, candidates, _, _ in levels for c in candidates]
+    flat_scores = score_batch(pairs)
+
+    log_likelihoods, k = [], 0
+    for _, candidates, _, _ in levels:
+        log_likelihoods.append(flat_scores[k:k + len(candidates)])
+        k += len(candidates)
+
+    return candidate_metrics(levels, log_likelihoods, model_name)
+
+
+def print_candidate_metrics(metrics: CandidateMetrics):
+    """Pretty print candidate-set metrics"""
+    print(f"\n{'='*60}")
+    print(f"Candidate-Set Evaluation: {metrics.model_name}")
+    print(f"{'='*60}")
+    print(f"  Levels:            {metrics.num_levels}")
+    print(f"  Log loss:          {metrics.log_loss:.3f}")
+    print(f"  Accuracy (top-1):  {metrics.accuracy*100:.1f}%")
+    print(f"  Label probability: {metrics.label_probability:.3f}")
+    if metrics.calibration is not None:
+        print(f"  Brier (multi):     {metrics.calibration.brier:.3f}")
+        print(f"  ECE:               {metrics.calibration.ece:.3f}")
+    for depth, loss in sorted(metrics.depth_log_loss.items()):
+        print(f"  Depth {depth} log loss:  {loss:.3f}")
+    print(f"{'='*60}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a model on labelled candidate sets")
+    parser.add_argument("--data", default="training/data/val.jsonl", help="Cases JSONL (training format)")
+    parser.add_argument("--base-model", default="openai/gpt-oss-20b")
+    parser.add_argument("--adapter", action="append", default=[], help="Adapter checkpoint (repeatable)")
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the base model")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--output", help="Write all metrics to this JSON file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # training/, for inference.py
+    from inference import ProbabilityTreeInference
+
+    with open(args.data) as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    print(f"📚 {len(cases)} cases, {len(candidate_levels(cases))} scoreable levels")
+
+    inference = ProbabilityTreeInference(base_model_name=args.base_model)
+    # (adapter path, peft adapter name, display name); peft rejects '.' in
+    # adapter names, so checkpoint paths are only used for display
+    models = ([] if args.no_baseline else [(None, "baseline", "baseline")]) + [
+        (path, f"adapter_{i}", path) for i, path in enumerate(args.adapter)
+    ]
+
+    results = []
+    for adapter_path, adapter_name, name in models:
+        inference.load_adapter(adapter_path, adapter_name)
+        metrics = evaluate_candidates(
+            lambda pairs: inference.score_candidates_batch(pairs, batch_size=args.batch_size),
+            cases,
+            model_name=name
+        )
+        print_candidate_metrics(metrics)
+        results.append(asdict(metrics))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Metrics saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
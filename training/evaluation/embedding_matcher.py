@@ -0,0 +1,259 @@
+"""
+Embedding-based event matching.
+
+EmbeddingMatcher is a drop-in EventMatcher backend: exact matches are
+unchanged, but the semantic/llm tiers use cosine similarity between sentence
+embeddings instead of word Jaccard. MatchCoverage accounting is the same.
+
+Embedders:
+- HashingEmbedder: dependency-free signed feature hashing of words, word
+  bigrams and character trigrams (deterministic across processes). Still
+  lexical, but tolerant of inflection and extra words ("drops" / "dropped").
+- SentenceTransformerEmbedder: a local CPU model via sentence-transformers,
+  which also matches true paraphrases ("Stock price drops 15%" vs "Shares
+  fell sharply").
+
+Vectors are cached on disk by (embedder, text) hash, behind a bounded
+in-memory LRU. Exceptionally wide depths are searched with a
+random-hyperplane LSH index before exact re-ranking; below ann_min_nodes an
+exact matrix-vector product is as fast.
+"""
+
+import re
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from evaluation.evaluator import EventMatcher, NodeIndex, MatchResult
+    from evaluation.store import KeyValueStore, text_key
+except ImportError:  # Running from inside evaluation/
+    from evaluator import EventMatcher, NodeIndex, MatchResult
+    from store import KeyValueStore, text_key
+
+
+class HashingEmbedder:
+    """Signed feature-hashing sentence vectors (no model download)"""
+
+    # Cosine thresholds (semantic, llm) that suit this embedder's score range
+    thresholds = (0.55, 0.35)
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.name = f"hashing-v1-{dim}"
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        words = re.findall(r"[a-z0-9]+", text.lower())
+        features = [(f"w:{w}", 1.0) for w in words]
+        features += [(f"b:{a}_{b}", 0.5) for a, b in zip(words, words[1:])]
+        for w in words:
+            padded = f"<{w}>"
+            features += [(f"c:{padded[i:i + 3]}", 0.25) for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """L2-normalised float32 vectors, one row per text"""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if h & 0x80000000 else -1.0
+                vectors[row, h % self.dim] += sign * weight
+        return _normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (imported lazily)"""
+
+    thresholds = (0.7, 0.5)
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", device: str = "cpu"):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device=device)
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=64, convert_to_numpy=True, show_progress_bar=False)
+        return _normalize(vectors.astype(np.float32))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class EmbeddingCache:
+    """
+    In-memory + on-disk cache of embeddings keyed by (embedder, text) hash
+
+    The in-memory layer is an LRU of at most max_entries vectors; evicted
+    vectors are read back from the on-disk store when needed again.
+    """
+
+    def __init__(self, embedder: Any, path: Optional[str] = None, max_entries: int = 100_000):
+        """
+        Args:
+            embedder: Object with .name and .embed(texts) -> (n, dim) array
+            path: SQLite file for persistent vectors (None = memory only)
+            max_entries: Vectors kept in memory (least recently used evicted first)
+        """
+        self.embedder = embedder
+        self.store = KeyValueStore(path) if path else None
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        """Vectors for texts, embedding only those not cached"""
+        texts = list(texts)
+        found: Dict[str, np.ndarray] = {}
+        for text in dict.fromkeys(texts):
+            if text in self._memory:
+                self._memory.move_to_end(text)
+                found[text] = self._memory[text]
+        missing = [t for t in dict.fromkeys(texts) if t not in found]
+        new: Dict[str, np.ndarray] = {}
+
+        if missing and self.store is not None:
+            keys = {text_key(self.embedder.name, t): t for t in missing}
+            for key, blob in self.store.get_many(keys).items():
+                new[keys[key]] = np.frombuffer(blob, dtype=np.float32)
+            missing = [t for t in missing if t not in new]
+
+        if missing:
+            vectors = self.embedder.embed(missing)
+            new.update(zip(missing, vectors))
+            if self.store is not None:
+                self.store.put_many([
+                    (text_key(self.embedder.name, text), vector.tobytes())
+                    for text, vector in zip(missing, vectors)
+                ])
+
+        found.update(new)
+        self._memory.update(new)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[t] for t in texts])
+
+
+class LSHIndex:
+    """
+    Random-hyperplane LSH over unit vectors, with exact cosine re-ranking
+
+    Each table hashes a vector to the sign pattern of n_bits projections;
+    candidates are the union of the query's buckets across tables.
+    """
+
+    def __init__(self, vectors: np.ndarray, n_tables: int = 16, n_bits: int = 8, seed: int = 0):
+        self.vectors = vectors
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((n_tables, vectors.shape[1], n_bits)).astype(np.float32)
+        self.weights = 1 << np.arange(n_bits, dtype=np.int64)
+        self.tables: List[Dict[int, np.ndarray]] = []
+
+        for codes in self._codes(vectors):
+            order = np.argsort(codes, kind="stable")
+            unique, starts = np.unique(codes[order], return_index=True)
+            buckets = np.split(order, starts[1:])
+            self.tables.append(dict(zip(unique.tolist(), buckets)))
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        """(n_tables, n) bucket codes"""
+        bits = np.einsum("nd,tdb->tnb", vectors, self.planes) > 0
+        return bits.astype(np.int64) @ self.weights
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Approximate top-k (row, cosine) by exact score over LSH candidates"""
+        codes = self._codes(query[None, :])[:, 0]
+        found = [table.get(int(code)) for table, code in zip(self.tables, codes)]
+        found = [ids for ids in found if ids is not None]
+        if not found:
+            return []
+
+        candidates = np.unique(np.concatenate(found))
+        scores = self.vectors[candidates] @ query
+        order = np.lexsort((candidates, -scores))[:k]
+        return [(int(candidates[i]), float(scores[i])) for i in order]
+
+
+class EmbeddingMatcher(EventMatcher):
+    """EventMatcher backend scoring semantic/llm tiers by embedding cosine"""
+
+    similarity = 'cosine'
+
+    def __init__(
+        self,
+        embedder: Any = None,
+        cache_path: Optional[str] = None,
+        use_llm: bool = False,
+        semantic_threshold: Optional[float] = None,
+        llm_threshold: Optional[float] = None,
+        ann_min_nodes: int = 20000
+    ):
+        """
+        Args:
+            embedder: Embedding backend (default HashingEmbedder)
+            cache_path: SQLite file for cached vectors (None = memory only)
+            use_llm: Accept matches in the llm band (see EventMatcher)
+            semantic_threshold: Cosine above which a match is 'semantic'
+                (default: the embedder's thresholds)
+            llm_threshold: Cosine above which a match is 'llm' when use_llm
+            ann_min_nodes: Use the LSH index at depths with at least this many nodes
+                (smaller depths are scored exactly)
+        """
+        embedder = embedder or HashingEmbedder()
+        default_semantic, default_llm = getattr(embedder, "thresholds", (0.7, 0.5))
+        super().__init__(
+            use_llm,
+            default_semantic if semantic_threshold is None else semantic_threshold,
+            default_llm if llm_threshold is None else llm_threshold
+        )
+        self.cache = EmbeddingCache(embedder, cache_path)
+        self.ann_min_nodes = ann_min_nodes
+
+    def prepare(self, texts: Iterable[str]):
+        """Embed a whole batch's texts in one call"""
+        self.cache.embed(texts)
+
+    def _node_vectors(self, index: NodeIndex) -> Tuple[np.ndarray, Optional[LSHIndex]]:
+        if 'embedding' not in index.cache:
+            vectors = self.cache.embed([node.get('event', '') for node in index.nodes])
+            ann = LSHIndex(vectors) if len(index) >= self.ann_min_nodes else None
+            index.cache['embedding'] = (vectors, ann)
+        return index.cache['embedding']
+
+    def top_k(self, actual_event: str, index: NodeIndex, k: int) -> List[Tuple[int, float]]:
+        """The k most similar (node position, cosine) pairs, best first"""
+        if not len(index):
+            return []
+
+        vectors, ann = self._node_vectors(index)
+        query = self.cache.embed([actual_event])[0]
+        if ann is not None:
+            hits = ann.search(query, k)
+            if hits:
+                return hits
+
+        scores = vectors @ query
+        order = np.lexsort((np.arange(len(scores)), -scores))[:k]
+        return [(int(i), float(scores[i])) for i in order]
+
+    def match_indexed(self, actual_event: str, index: NodeIndex) -> MatchResult:
+        """Exact match first, then the most similar node by embedding cosine"""
+        if not len(index):
+            return self.no_nodes()
+
+        exact = index.exact_match(actual_event)
+        if exact is not None:
+            return self.exact(index.nodes[exact])
+
+        hits = self.top_k(actual_event, index, 1)
+        if not hits or hits[0][1] <= 0.0:
+            return self.resolve(None, 0.0)
+
+        best_index, best_similarity = hits[0]
+        return self.resolve(index.nodes[best_index], best_similarity)
@@ -7,7 +7,11 @@ Tracks both performance metrics (loss, perplexity) and match coverage
 
 import math
 import json
-from typing import List, Dict, Any, Optional, Tuple
+import heapq
+import itertools
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
@@ -66,13 +70,173 @@ class EvaluationMetrics:
     timestamp: str
     model_name: str
     num_cases: int
+    calibration: Optional[Any] = None  # calibration.CalibrationMetrics, when requested
+
+
+def tokenize(text: str) -> frozenset:
+    """Word set used for Jaccard matching"""
+    return frozenset(text.lower().split())
+
+
+class NodeIndex:
+    """
+    Predicted nodes at one depth, tokenized once, with an inverted token index
+
+    The first query is a linear scan of set intersections over the
+    pre-tokenized nodes; from the second query on, an inverted index is
+    built so only nodes sharing a word with the actual event are touched.
+    Either way, scores are identical to EventMatcher._jaccard_similarity.
+    """
+
+    def __init__(self, nodes: List[Dict[str, Any]], tokens: Optional[List[frozenset]] = None):
+        """
+        Args:
+            nodes: Predicted nodes at one depth
+            tokens: Precomputed word sets for the nodes (tokenized here if None)
+        """
+        self.nodes = nodes
+        self.exact: Dict[str, int] = {}
+        self.tokens: List[frozenset] = tokens if tokens is not None else [tokenize(n['event']) for n in nodes]
+        self.postings: Optional[Dict[str, List[int]]] = None
+        self._queries = 0
+        # Derived per-backend data (e.g. node embeddings), built on first use
+        self.cache: Dict[str, Any] = {}
+
+        for i, node in enumerate(nodes):
+            self.exact.setdefault(node['event'].lower(), i)
+
+    def _build_postings(self):
+        self.postings = defaultdict(list)
+        for i, tokens in enumerate(self.tokens):
+            for token in tokens:
+                self.postings[token].append(i)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def exact_match(self, text: str) -> Optional[int]:
+        """Index of the first node whose event equals text (case-insensitive)"""
+        return self.exact.get(text.lower())
+
+    def scores(self, text: str) -> Dict[int, float]:
+        """Jaccard similarity of text to every node sharing at least one word"""
+        query = tokenize(text)
+        if not query:
+            return {}
+
+        # Indexing only pays off once the same depth is queried repeatedly
+        self._queries += 1
+        if self.postings is None and self._queries > 1:
+            self._build_postings()
+
+        if self.postings is None:
+            overlap = {}
+            for i, tokens in enumerate(self.tokens):
+                shared = len(query & tokens)
+                if shared:
+                    overlap[i] = shared
+        else:
+            overlap: Dict[int, int] = defaultdict(int)
+            for token in query:
+                for i in self.postings.get(token, ()):
+                    overlap[i] += 1
+
+        return {
+            i: shared / (len(query) + len(self.tokens[i]) - shared)
+            for i, shared in overlap.items()
+        }
+
+    def best(self, text: str) -> Tuple[Optional[int], float]:
+        """Highest-scoring node, ties going to the earliest (as in a linear scan)"""
+        best_index, best_similarity = None, 0.0
+        for i, similarity in self.scores(text).items():
+            if similarity > best_similarity or (
+                similarity == best_similarity and best_index is not None and i < best_index
+            ):
+                best_index, best_similarity = i, similarity
+        return best_index, best_similarity
+
+    def top_k(self, text: str, k: int) -> List[Tuple[int, float]]:
+        """The k highest-scoring (node index, similarity) pairs, best first"""
+        scored = self.scores(text)
+        return heapq.nsmallest(k, scored.items(), key=lambda item: (-item[1], item[0]))
+
+
+class FlatTree:
+    """
+    Predicted tree flattened once into parallel arrays (preorder)
+
+    Node i has depth[i], probability[i], parent[i] (-1 for the root) and its
+    tokenized event text in tokens[i]. Per-depth NodeIndexes are built lazily
+    from these arrays, so a prediction is walked and tokenized exactly once.
+    """
+
+    def __init__(self, tree: Dict[str, Any]):
+        self.nodes: List[Dict[str, Any]] = []
+        self.depth: List[int] = []
+        self.parent: List[int] = []
+        self.probability: List[float] = []
+        self.tokens: List[frozenset] = []
+        self.by_depth: Dict[int, List[int]] = defaultdict(list)
+        self._indexes: Dict[int, NodeIndex] = {}
+        self._exact: Dict[int, Dict[str, int]] = {}
+
+        nodes, by_depth = self.nodes, self.by_depth
+        stack = [(tree, 0, -1)]
+        while stack:
+            node, depth, parent = stack.pop()
+            i = len(nodes)
+            nodes.append(node)
+            self.depth.append(depth)
+            self.parent.append(parent)
+            self.probability.append(node.get('probability', 0.0))
+            self.tokens.append(frozenset(node.get('event', '').lower().split()))
+            by_depth[depth].append(i)
+            # Reversed so siblings come off the stack in tree order
+            children = node.get('children')
+            if children:
+                stack.extend((child, depth + 1, i) for child in reversed(children))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def nodes_at_depth(self, depth: int) -> List[Dict[str, Any]]:
+        """Nodes at a depth, in the same order as a recursive walk"""
+        return [self.nodes[i] for i in self.by_depth.get(depth, [])]
+
+    def exact_match(self, depth: int, text: str) -> Optional[int]:
+        """Node id of the first node at depth whose event equals text (case-insensitive)"""
+        if depth not in self._exact:
+            exact: Dict[str, int] = {}
+            for i in self.by_depth.get(depth, []):
+                exact.setdefault(self.nodes[i]['event'].lower(), i)
+            self._exact[depth] = exact
+        return self._exact[depth].get(text.lower())
+
+    def index(self, depth: int) -> NodeIndex:
+        """NodeIndex over the nodes at a depth (empty if the tree doesn't reach it)"""
+        if depth not in self._indexes:
+            ids = self.by_depth.get(depth, [])
+            self._indexes[depth] = NodeIndex(
+                [self.nodes[i] for i in ids],
+                [self.tokens[i] for i in ids]
+            )
+        return self._indexes[depth]
 
 
 class EventMatcher:
     """Match actual events to predicted nodes with multiple strategies"""
 
-    def __init__(self, use_llm: bool = False):
+    # Name of the similarity measure behind semantic/llm matches
+    similarity = 'jaccard'
+
+    def __init__(self, use_llm: bool = False, semantic_threshold: float = 0.6, llm_threshold: float = 0.3):
         self.use_llm = use_llm
+        self.semantic_threshold = semantic_threshold
+        self.llm_threshold = llm_threshold
+
+    def prepare(self, texts: Iterable[str]):
+        """Hook to precompute per-text data for a batch (no-op for Jaccard)"""
 
     def find_best_match(
         self,
@@ -85,38 +249,55 @@ class EventMatcher:
         2. Semantic similarity (Jaccard for now, embeddings later)
         3. LLM judge (if enabled)
         """
-        if not predicted_nodes:
-            return MatchResult(
-                matched=False,
-                match_type='none',
-                matched_event=None,
-                probability=0.001,
-                similarity_score=0.0
-            )
+        return self.match_indexed(actual_event, NodeIndex(predicted_nodes))
+
+    def match_indexed(self, actual_event: str, index: NodeIndex) -> MatchResult:
+        """find_best_match against a prebuilt NodeIndex (reuse it across actual events)"""
+        if not len(index):
+            return self.no_nodes()
 
         # Strategy 1: Exact match
-        for node in predicted_nodes:
-            if node['event'].lower() == actual_event.lower():
-                return MatchResult(
-                    matched=True,
-                    match_type='exact',
-                    matched_event=node['event'],
-                    probability=node['probability'],
-                    similarity_score=1.0
-                )
+        exact = index.exact_match(actual_event)
+        if exact is not None:
+            return self.exact(index.nodes[exact])
 
         # Strategy 2: Semantic similarity (Jaccard on words)
-        best_similarity = 0.0
-        best_node = None
+        best_index, best_similarity = index.best(actual_event)
+        best_node = index.nodes[best_index] if best_index is not None else None
+        return self.resolve(best_node, best_similarity)
+
+    def match_all(self, queries: List[Tuple[str, NodeIndex]]) -> List[MatchResult]:
+        """match_indexed for many (actual event, index) pairs; backends may batch work across them"""
+        return [self.match_indexed(actual_event, index) for actual_event, index in queries]
+
+    def top_k(self, actual_event: str, index: NodeIndex, k: int) -> List[Tuple[int, float]]:
+        """The k most similar (node position, similarity) pairs, best first"""
+        return index.top_k(actual_event, k)
+
+    def no_nodes(self) -> MatchResult:
+        """Result when the tree has no nodes at the event's depth"""
+        return MatchResult(
+            matched=False,
+            match_type='none',
+            matched_event=None,
+            probability=0.001,
+            similarity_score=0.0
+        )
 
-        for node in predicted_nodes:
-            similarity = self._jaccard_similarity(actual_event, node['event'])
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_node = node
+    def exact(self, node: Dict[str, Any]) -> MatchResult:
+        """Result for a node whose text equals the actual event"""
+        return MatchResult(
+            matched=True,
+            match_type='exact',
+            matched_event=node['event'],
+            probability=node['probability'],
+            similarity_score=1.0
+        )
 
+    def resolve(self, best_node: Optional[Dict[str, Any]], best_similarity: float) -> MatchResult:
+        """Apply the semantic/LLM thresholds to the most similar node (no exact match)"""
         # Threshold for semantic match
-        if best_similarity > 0.6:
+        if best_similarity > self.semantic_threshold:
             return MatchResult(
                 matched=True,
                 match_type='semantic',
@@ -125,10 +306,9 @@ class EventMatcher:
                 similarity_score=best_similarity
             )
 
-        # Strategy 3: LLM judge (placeholder for now)
-        if self.use_llm and best_similarity > 0.3:
-            # TODO: Implement LLM-based matching
-            # For now, accept if similarity > 0.3
+        # Strategy 3: accept the ambiguous band outright (llm_judge.LLMJudgeMatcher
+        # asks a judge model instead)
+        if self.use_llm and best_similarity > self.llm_threshold:
             return MatchResult(
                 matched=True,
                 match_type='llm',
@@ -160,11 +340,187 @@ class EventMatcher:
         return len(intersection) / len(union)
 
 
+class ExactSum:
+    """
+    Running float sum that is exactly rounded, whatever the order of adds
+
+    Keeps Shewchuk's non-overlapping partials (the algorithm behind
+    math.fsum), so sums built from the same values in any order, or split
+    across processes, round to the same float.
+    """
+
+    def __init__(self):
+        self.partials: List[float] = []
+
+    def add(self, x: float):
+        i = 0
+        for y in self.partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo:
+                self.partials[i] = lo
+                i += 1
+            x = hi
+        self.partials[i:] = [x]
+
+    def value(self) -> float:
+        return math.fsum(self.partials)
+
+
+class MetricsAggregator:
+    """Incremental, order-independent aggregation of per-case EvaluationMetrics"""
+
+    def __init__(self, calibration: bool = False):
+        """
+        Args:
+            calibration: Also keep each case's forecast questions for
+                calibration metrics (memory then grows with the number of cases)
+        """
+        self.num_cases = 0
+        self.loss = ExactSum()
+        self.brier = ExactSum()
+        self.coverage = MatchCoverage()
+        # depth -> [loss sum, match-rate sum, cases, events]
+        self.depths: Dict[int, list] = {}
+        self.calibration = calibration
+        # (case index, questions) per case, sorted by case index before scoring
+        self.questions: List[Tuple[int, list]] = []
+
+    def add(self, metrics: EvaluationMetrics, questions: Optional[list] = None, case_index: Optional[int] = None):
+        """
+        Fold in one case (or an already-aggregated batch, weighted as one case)
+
+        Args:
+            metrics: The case's metrics
+            questions: Its calibration questions (see calibration.tree_questions)
+            case_index: Position of the case in the input, which fixes the
+                question order whatever order cases arrive in
+        """
+        if self.calibration and questions is not None:
+            self.questions.append((self.num_cases if case_index is None else case_index, questions))
+
+        self.num_cases += 1
+        self.loss.add(metrics.loss)
+        self.brier.add(metrics.brier_score)
+
+        self.coverage.exact_matches += metrics.match_coverage.exact_matches
+        self.coverage.semantic_matches += metrics.match_coverage.semantic_matches
+        self.coverage.llm_matches += metrics.match_coverage.llm_matches
+        self.coverage.no_matches += metrics.match_coverage.no_matches
+
+        for dm in metrics.depth_metrics:
+            if dm.depth not in self.depths:
+                self.depths[dm.depth] = [ExactSum(), ExactSum(), 0, 0]
+            stats = self.depths[dm.depth]
+            stats[0].add(dm.loss)
+            stats[1].add(dm.match_rate)
+            stats[2] += 1
+            stats[3] += dm.total_events
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe state (floats round-trip exactly), for resumable runs"""
+        return {
+            'calibration': self.calibration,
+            'questions': self.questions,
+            'num_cases': self.num_cases,
+            'loss': self.loss.partials,
+            'brier': self.brier.partials,
+            'match_coverage': asdict(self.coverage),
+            'depths': {
+                str(depth): [losses.partials, match_rates.partials, cases, events]
+                for depth, (losses, match_rates, cases, events) in self.depths.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MetricsAggregator':
+        """Rebuild an aggregator saved with to_dict"""
+        def exact(partials):
+            total = ExactSum()
+            total.partials = list(partials)
+            return total
+
+        aggregator = cls(calibration=data.get('calibration', False))
+        aggregator.questions = [
+            (case_index, [(list(probs), outcome) for probs, outcome in questions])
+            for case_index, questions in data.get('questions', [])
+        ]
+        aggregator.num_cases = data['num_cases']
+        aggregator.loss = exact(data['loss'])
+        aggregator.brier = exact(data['brier'])
+        aggregator.coverage = MatchCoverage(**data['match_coverage'])
+        aggregator.depths = {
+            int(depth): [exact(losses), exact(match_rates), cases, events]
+            for depth, (losses, match_rates, cases, events) in data['depths'].items()
+        }
+        return aggregator
+
+    def result(self, model_name: str) -> EvaluationMetrics:
+        """Aggregate metrics: per-case means, summed coverage and event counts"""
+        depth_metrics = []
+        for depth, (losses, match_rates, cases, events) in sorted(self.depths.items()):
+            avg_loss = losses.value() / cases
+            depth_metrics.append(DepthMetrics(
+                depth=depth,
+                loss=avg_loss,
+                perplexity=math.exp(avg_loss),
+                match_rate=match_rates.value() / cases,
+                total_events=events
+            ))
+
+        avg_loss = self.loss.value() / self.num_cases
+
+        calibration = calibration_from_cases(self.questions) if self.calibration else None
+
+        return EvaluationMetrics(
+            loss=avg_loss,
+            perplexity=math.exp(avg_loss),
+            brier_score=self.brier.value() / self.num_cases,
+            match_coverage=MatchCoverage(**asdict(self.coverage)),
+            depth_metrics=depth_metrics,
+            timestamp=datetime.now().isoformat(),
+            model_name=model_name,
+            num_cases=self.num_cases,
+            calibration=calibration
+        )
+
+
+def calibration_from_cases(cases: List[Tuple[int, list]]):
+    """Calibration metrics over (case index, questions) pairs, resampled by case"""
+    ordered = sorted(cases, key=lambda item: item[0])
+    return _load_calibration().calibration_metrics(
+        [q for _, questions in ordered for q in questions],
+        groups=[case_index for case_index, questions in ordered for _ in questions]
+    )
+
+
 class TreeEvaluator:
     """Evaluate probability trees against ground truth"""
 
-    def __init__(self, use_llm_matcher: bool = False):
-        self.matcher = EventMatcher(use_llm=use_llm_matcher)
+    def __init__(
+        self,
+        use_llm_matcher: bool = False,
+        vectorized: bool = False,
+        matcher: Optional[EventMatcher] = None,
+        calibration: bool = False
+    ):
+        """
+        Args:
+            use_llm_matcher: Accept 0.3-0.6 similarity matches as 'llm' matches
+            vectorized: Match whole batches with one NumPy join (results are
+                identical; pays off when many actual events share a depth,
+                and falls back to the scalar path if NumPy is unavailable)
+            matcher: Alternative matcher backend, e.g. EmbeddingMatcher
+                (overrides use_llm_matcher)
+            calibration: Also score each depth's full predicted distribution
+                (multi-class Brier, log loss, ECE, reliability bins; see
+                calibration.py) into EvaluationMetrics.calibration
+        """
+        self.matcher = matcher if matcher is not None else EventMatcher(use_llm=use_llm_matcher)
+        self.vectorized = vectorized
+        self.calibration = calibration
 
     def evaluate(
         self,
@@ -185,6 +541,105 @@ class TreeEvaluator:
         """
         actual_chain = ground_truth['outcome_chain']
 
+        # One flattening and one match pass feed loss, Brier and coverage
+        flat = FlatTree(predicted_tree)
+        matches = self._match_events(flat, actual_chain)
+        metrics = self._metrics_from_matches(actual_chain, matches, model_name)
+
+        if self.calibration:
+            calibration_module = _load_calibration()
+            metrics.calibration = calibration_module.calibration_metrics(
+                calibration_module.tree_questions(flat, actual_chain, matches),
+                n_bootstrap=0
+            )
+        return metrics
+
+    def _match_events(
+        self,
+        flat: FlatTree,
+        actual_chain: List[Dict[str, Any]]
+    ) -> List[MatchResult]:
+        """Match each actual event against the predicted nodes at its depth"""
+        return self.matcher.match_all([
+            (event_data['event'], flat.index(event_data['depth']))
+            for event_data in actual_chain
+        ])
+
+    def _match_batch(
+        self,
+        flats: List[FlatTree],
+        chains: List[List[Dict[str, Any]]]
+    ) -> List[List[MatchResult]]:
+        """
+        Match every case in a batch
+
+        Jaccard scores for the whole batch come from one vectorized join
+        (see batch_matcher); per-case results equal _match_events exactly.
+        """
+        # Lazy, so backends that don't precompute anything pay nothing
+        self.matcher.prepare(itertools.chain(
+            (node.get('event', '') for flat in flats for node in flat.nodes),
+            (event_data['event'] for chain in chains for event_data in chain)
+        ))
+
+        use_numpy = self.vectorized and self.matcher.similarity == 'jaccard'
+        batch_matcher = _load_batch_matcher() if use_numpy else None
+        if batch_matcher is None:
+            # One match_all call for the whole batch, so e.g. judge calls are batched across cases
+            results = self.matcher.match_all([
+                (event_data['event'], flat.index(event_data['depth']))
+                for flat, chain in zip(flats, chains)
+                for event_data in chain
+            ])
+            all_matches, k = [], 0
+            for chain in chains:
+                all_matches.append(results[k:k + len(chain)])
+                k += len(chain)
+            return all_matches
+
+        # One group of candidate nodes per (case, depth)
+        group_ids: Dict[Tuple[int, int], int] = {}
+        node_groups: List[List[frozenset]] = []
+        queries: List[Tuple[int, frozenset]] = []
+        for c, (flat, chain) in enumerate(zip(flats, chains)):
+            for event_data in chain:
+                key = (c, event_data['depth'])
+                if key not in group_ids:
+                    group_ids[key] = len(node_groups)
+                    node_groups.append([flat.tokens[i] for i in flat.by_depth.get(key[1], [])])
+                queries.append((group_ids[key], tokenize(event_data['event'])))
+
+        best, similarity = batch_matcher.best_jaccard_matches(node_groups, queries)
+        best, similarity = best.tolist(), similarity.tolist()
+
+        all_matches = []
+        k = 0
+        for flat, chain in zip(flats, chains):
+            matches = []
+            for event_data in chain:
+                depth, actual_event = event_data['depth'], event_data['event']
+                ids = flat.by_depth.get(depth, [])
+                exact = flat.exact_match(depth, actual_event) if ids else None
+
+                if not ids:
+                    matches.append(self.matcher.no_nodes())
+                elif exact is not None:
+                    matches.append(self.matcher.exact(flat.nodes[exact]))
+                else:
+                    best_node = flat.nodes[ids[best[k]]] if best[k] >= 0 else None
+                    matches.append(self.matcher.resolve(best_node, similarity[k]))
+                k += 1
+            all_matches.append(matches)
+
+        return all_matches
+
+    def _metrics_from_matches(
+        self,
+        actual_chain: List[Dict[str, Any]],
+        matches: List[MatchResult],
+        model_name: str
+    ) -> EvaluationMetrics:
+        """Loss, Brier, coverage and per-depth metrics for one case's matches"""
         total_loss = 0.0
         match_coverage = MatchCoverage()
         depth_metrics_list = []
@@ -192,15 +647,8 @@ class TreeEvaluator:
         # Track per-depth
         depths = {}
 
-        for actual_event_data in actual_chain:
+        for actual_event_data, match in zip(actual_chain, matches):
             depth = actual_event_data['depth']
-            actual_event = actual_event_data['event']
-
-            # Get nodes at this depth
-            predicted_nodes = self._get_nodes_at_depth(predicted_tree, depth)
-
-            # Find match
-            match = self.matcher.find_best_match(actual_event, predicted_nodes)
 
             # Calculate loss for this event
             event_loss = -math.log(max(match.probability, 0.001))
@@ -233,7 +681,7 @@ class TreeEvaluator:
         perplexity = math.exp(avg_loss)
 
         # Brier score (simplified for now)
-        brier_score = self._calculate_brier_score(predicted_tree, actual_chain)
+        brier_score = self._brier_from_matches(matches)
 
         # Per-depth metrics
         for depth, stats in sorted(depths.items()):
@@ -259,62 +707,74 @@ class TreeEvaluator:
 
     def evaluate_batch(
         self,
-        predictions: List[Dict[str, Any]],
-        ground_truths: List[Dict[str, Any]],
-        model_name: str = "unknown"
+        predictions: Iterable[Dict[str, Any]],
+        ground_truths: Iterable[Dict[str, Any]],
+        model_name: str = "unknown",
+        workers: int = 1,
+        chunk_size: int = 256
     ) -> EvaluationMetrics:
-        """Evaluate multiple cases and aggregate"""
-        all_metrics = [
-            self.evaluate(pred, gt, model_name)
-            for pred, gt in zip(predictions, ground_truths)
-        ]
-
-        # Aggregate
-        total_loss = sum(m.loss for m in all_metrics)
-        total_brier = sum(m.brier_score for m in all_metrics)
-
-        # Aggregate match coverage
-        agg_coverage = MatchCoverage()
-        for m in all_metrics:
-            agg_coverage.exact_matches += m.match_coverage.exact_matches
-            agg_coverage.semantic_matches += m.match_coverage.semantic_matches
-            agg_coverage.llm_matches += m.match_coverage.llm_matches
-            agg_coverage.no_matches += m.match_coverage.no_matches
-
-        # Aggregate depth metrics
-        depth_agg = {}
-        for m in all_metrics:
-            for dm in m.depth_metrics:
-                if dm.depth not in depth_agg:
-                    depth_agg[dm.depth] = {'losses': [], 'match_rates': [], 'totals': []}
-                depth_agg[dm.depth]['losses'].append(dm.loss)
-                depth_agg[dm.depth]['match_rates'].append(dm.match_rate)
-                depth_agg[dm.depth]['totals'].append(dm.total_events)
-
-        agg_depth_metrics = []
-        for depth, stats in sorted(depth_agg.items()):
-            avg_loss = sum(stats['losses']) / len(stats['losses'])
-            agg_depth_metrics.append(DepthMetrics(
-                depth=depth,
-                loss=avg_loss,
-                perplexity=math.exp(avg_loss),
-                match_rate=sum(stats['match_rates']) / len(stats['match_rates']),
-                total_events=sum(stats['totals'])
-            ))
+        """
+        Evaluate multiple cases and aggregate
 
-        avg_loss = total_loss / len(all_metrics)
-        avg_brier = total_brier / len(all_metrics)
+        Cases are consumed lazily in chunks and folded into a
+        MetricsAggregator, so memory stays flat in the number of cases.
+        With workers > 1, chunks are evaluated in a process pool and their
+        per-case metrics streamed back; aggregation is exact and
+        order-independent, so the result is bit-identical to workers=1.
 
-        return EvaluationMetrics(
-            loss=avg_loss,
-            perplexity=math.exp(avg_loss),
-            brier_score=avg_brier,
-            match_coverage=agg_coverage,
-            depth_metrics=agg_depth_metrics,
-            timestamp=datetime.now().isoformat(),
-            model_name=model_name,
-            num_cases=len(all_metrics)
-        )
+        Args:
+            predictions: Predicted trees (any iterable)
+            ground_truths: Matching ground truths (any iterable)
+            model_name: Name/identifier of the model
+            workers: Worker processes (1 = evaluate in this process)
+            chunk_size: Cases per chunk (per pool task when parallel)
+        """
+        cases = zip(predictions, ground_truths)
+        chunks = iter(lambda: list(itertools.islice(cases, chunk_size)), [])
+        aggregator = MetricsAggregator(calibration=self.calibration)
+
+        def collect(start: int, results):
+            for i, (metrics, questions) in enumerate(results):
+                aggregator.add(metrics, questions, start + i)
+
+        if workers <= 1:
+            for n, chunk in enumerate(chunks):
+                collect(n * chunk_size, self.evaluate_chunk(chunk, model_name))
+            return aggregator.result(model_name)
+
+        # Bounded submission window: at most 2 chunks per worker in flight
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            pending = {}
+            for n, chunk in enumerate(chunks):
+                pending[pool.submit(_evaluate_chunk_in_worker, chunk, model_name)] = n * chunk_size
+                if len(pending) >= 2 * workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(pending.pop(future), future.result())
+
+            for future in as_completed(pending):
+                collect(pending[future], future.result())
+
+        return aggregator.result(model_name)
+
+    def evaluate_chunk(
+        self,
+        chunk: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        model_name: str
+    ) -> List[Tuple[EvaluationMetrics, Optional[list]]]:
+        """Per-case (metrics, calibration questions or None) for a chunk of (prediction, ground truth) pairs"""
+        flats = [FlatTree(pred) for pred, _ in chunk]
+        chains = [gt['outcome_chain'] for _, gt in chunk]
+        all_matches = self._match_batch(flats, chains)
+        tree_questions = _load_calibration().tree_questions if self.calibration else None
+
+        return [
+            (
+                self._metrics_from_matches(chain, matches, model_name),
+                tree_questions(flat, chain, matches) if tree_questions else None
+            )
+            for flat, chain, matches in zip(flats, chains, all_matches)
+        ]
 
     def _get_nodes_at_depth(
         self,
@@ -342,19 +802,50 @@ class TreeEvaluator:
 
         Simplified: for each actual event, score = (1 - P(event))^2
         """
-        scores = []
-        for actual_event_data in actual_chain:
-            depth = actual_event_data['depth']
-            actual_event = actual_event_data['event']
+        return self._brier_from_matches(self._match_events(FlatTree(tree), actual_chain))
+
+    def _brier_from_matches(self, matches: List[MatchResult]) -> float:
+        """Brier score from an existing match pass"""
+        # Brier: (forecast - actual)^2, where actual = 1 (it happened)
+        scores = [(match.probability - 1.0) ** 2 for match in matches]
+        return sum(scores) / len(scores) if scores else 0.0
 
-            nodes = self._get_nodes_at_depth(tree, depth)
-            match = self.matcher.find_best_match(actual_event, nodes)
 
-            # Brier: (forecast - actual)^2, where actual = 1 (it happened)
-            score = (match.probability - 1.0) ** 2
-            scores.append(score)
+# Per-process evaluator for parallel evaluate_batch (set by the pool initializer)
+_worker_evaluator: Optional['TreeEvaluator'] = None
 
-        return sum(scores) / len(scores) if scores else 0.0
+
+def _init_worker(evaluator: 'TreeEvaluator'):
+    global _worker_evaluator
+    _worker_evaluator = evaluator
+
+
+def _evaluate_chunk_in_worker(
+    chunk: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    model_name: str
+) -> List[Tuple[EvaluationMetrics, Optional[list]]]:
+    return _worker_evaluator.evaluate_chunk(chunk, model_name)
+
+
+def _load_calibration():
+    """calibration module (needs NumPy; only imported when calibration is requested)"""
+    try:
+        from evaluation import calibration
+    except ImportError:  # Running from inside evaluation/
+        import calibration
+    return calibration
+
+
+def _load_batch_matcher():
+    """The NumPy batch matcher, or None if NumPy isn't installed"""
+    try:
+        from evaluation import batch_matcher
+    except ImportError:
+        try:
+            import batch_matcher  # Running from inside evaluation/
+        except ImportError:
+            return None
+    return batch_matcher
 
 
 def save_metrics(metrics: EvaluationMetrics, output_path: str):
@@ -371,6 +862,8 @@ def load_metrics(input_path: str) -> EvaluationMetrics:
     # Reconstruct dataclasses
     data['match_coverage'] = MatchCoverage(**data['match_coverage'])
     data['depth_metrics'] = [DepthMetrics(**dm) for dm in data['depth_metrics']]
+    if data.get('calibration'):
+        data['calibration'] = _load_calibration().calibration_from_dict(data['calibration'])
 
     return EvaluationMetrics(**data)
 
@@ -401,6 +894,22 @@ def print_metrics(metrics: EvaluationMetrics):
     for dm in metrics.depth_metrics:
         print(f"  {dm.depth:<8} {dm.loss:<8.3f} {dm.perplexity:<12.2f} {dm.match_rate*100:<11.1f}% {dm.total_events:<8}")
 
+    if metrics.calibration is not None:
+        cal = metrics.calibration
+        intervals = cal.intervals
+
+        def interval(name):
+            return f"  [{intervals[name][0]:.3f}, {intervals[name][1]:.3f}]" if name in intervals else ""
+
+        print(f"\n🎲 Calibration ({cal.num_questions} forecasts):")
+        print(f"  Brier (multi): {cal.brier:.3f}{interval('brier')}")
+        print(f"  Log loss:      {cal.log_loss:.3f}{interval('log_loss')}")
+        print(f"  ECE:           {cal.ece:.3f}{interval('ece')}")
+        print(f"  {'Bin':<12} {'Count':<8} {'Confidence':<12} {'Frequency':<10}")
+        for b in cal.reliability:
+            if b.count:
+                print(f"  {b.lower:.1f}-{b.upper:.1f}{'':<5} {b.count:<8} {b.confidence:<12.3f} {b.frequency:<10.3f}")
+
     print(f"\n{'='*60}\n")
 
 
@@ -0,0 +1,260 @@
+"""
+LLM-judge matching for the ambiguous similarity band.
+
+LLMJudgeMatcher wraps a similarity matcher (lexical EventMatcher or
+EmbeddingMatcher). Exact and clearly-similar matches are decided as before;
+only events whose best candidates fall in the (llm_threshold,
+semantic_threshold] band are sent to a judge, and accepted ones count as
+'llm' matches.
+
+Judging is batched and cached:
+- match_all collects the band candidates of a whole evaluation chunk and
+  judges them together, many pairs per prompt.
+- Verdicts are stored in a KeyValueStore keyed by the judge name and the
+  normalised (actual, candidate) texts, so reruns and evaluations of other
+  models reuse earlier judgments and only new pairs cost a call.
+
+StubJudge is a deterministic local judge for tests and dry runs.
+"""
+
+import os
+import re
+import json
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from evaluation.evaluator import EventMatcher, NodeIndex, MatchResult
+    from evaluation.store import KeyValueStore, text_key
+except ImportError:  # Running from inside evaluation/
+    from evaluator import EventMatcher, NodeIndex, MatchResult
+    from store import KeyValueStore, text_key
+
+
+JUDGE_PROMPT = """You are grading event forecasts. For each numbered pair, decide whether the PREDICTED event describes the same real-world outcome as the ACTUAL event. Paraphrases, different wording and minor differences in numbers or detail still count as the same outcome; a different actor, action or direction of change does not.
+
+{pairs}
+
+Return ONLY a JSON array of {count} booleans (true = same outcome), one per pair, in order."""
+
+
+def normalize_event(text: str) -> str:
+    """Case- and whitespace-insensitive form of an event, used for cache keys"""
+    return " ".join(re.findall(r"\S+", text.lower())).strip(" .;:")
+
+
+class StubJudge:
+    """Offline judge: same outcome when normalised word overlap reaches a threshold"""
+
+    def __init__(self, threshold: float = 0.4, batch_size: int = 25):
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.name = f"stub-{threshold}"
+        self.calls = 0
+
+    def judge_batch(self, pairs: Sequence[Tuple[str, str]]) -> List[Optional[bool]]:
+        self.calls += 1
+        verdicts = []
+        for actual, candidate in pairs:
+            a, b = set(actual.split()), set(candidate.split())
+            verdicts.append(bool(a and b) and len(a & b) / len(a | b) >= self.threshold)
+        return verdicts
+
+
+class OpenRouterJudge:
+    """Chat-completion judge via OpenRouter (openai client imported lazily)"""
+
+    def __init__(
+        self,
+        model: str = "deepseek/deepseek-chat",
+        api_key: Optional[str] = None,
+        base_url: str = "https://openrouter.ai/api/v1",
+        batch_size: int = 25,
+        retries: int = 3
+    ):
+        """
+        Args:
+            model: Judge model id
+            api_key: OpenRouter key (default: OPENROUTER_API_KEY)
+            base_url: OpenAI-compatible endpoint
+            batch_size: Pairs per judge prompt
+            retries: Attempts per prompt before giving up on its pairs
+        """
+        from openai import OpenAI
+
+        self.client = OpenAI(api_key=api_key or os.getenv("OPENROUTER_API_KEY"), base_url=base_url)
+        self.model = model
+        self.batch_size = batch_size
+        self.retries = retries
+        self.name = f"openrouter-{model}"
+        self.calls = 0
+
+    def judge_batch(self, pairs: Sequence[Tuple[str, str]]) -> List[Optional[bool]]:
+        """Verdict per pair; None where the response could not be parsed"""
+        prompt = JUDGE_PROMPT.format(
+            pairs="\n".join(
+                f"{i}. ACTUAL: {actual}\n   PREDICTED: {candidate}"
+                for i, (actual, candidate) in enumerate(pairs, 1)
+            ),
+            count=len(pairs)
+        )
+
+        for attempt in range(self.retries):
+            self.calls += 1
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.0,
+                    max_tokens=16 + 8 * len(pairs)
+                )
+                verdicts = parse_verdicts(response.choices[0].message.content, len(pairs))
+                if verdicts is not None:
+                    return verdicts
+                print(f"⚠️  Unparseable judge response (attempt {attempt + 1}/{self.retries})")
+            except Exception as e:
+                print(f"⚠️  Judge call failed (attempt {attempt + 1}/{self.retries}): {e}")
+                time.sleep(2 ** attempt)
+
+        return [None] * len(pairs)
+
+
+def parse_verdicts(response: str, count: int) -> Optional[List[bool]]:
+    """The JSON boolean array in a judge response, or None if it is missing or the wrong length"""
+    start, end = response.find("["), response.rfind("]")
+    if start < 0 or end < start:
+        return None
+    try:
+        verdicts = json.loads(response[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    if len(verdicts) != count or not all(isinstance(v, bool) for v in verdicts):
+        return None
+    return verdicts
+
+
+class JudgeCache:
+    """Memoises a judge's verdicts in memory and (optionally) on disk"""
+
+    def __init__(self, judge: Any, path: Optional[str] = None):
+        """
+        Args:
+            judge: Object with .name, .batch_size and .judge_batch(pairs)
+            path: SQLite file for persistent verdicts (None = memory only)
+        """
+        self.judge = judge
+        self.store = KeyValueStore(path) if path else None
+        self._memory: Dict[Tuple[str, str], bool] = {}
+
+    def verdicts(self, pairs: Sequence[Tuple[str, str]]) -> List[Optional[bool]]:
+        """Verdict per (actual, candidate) pair, judging only uncached ones"""
+        normalized = [(normalize_event(a), normalize_event(b)) for a, b in pairs]
+        missing = list(dict.fromkeys(p for p in normalized if p not in self._memory))
+
+        if missing and self.store is not None:
+            keys = {text_key(self.judge.name, a, b): (a, b) for a, b in missing}
+            for key, value in self.store.get_many(keys).items():
+                self._memory[keys[key]] = value == b"1"
+            missing = [p for p in missing if p not in self._memory]
+
+        for start in range(0, len(missing), self.judge.batch_size):
+            batch = missing[start:start + self.judge.batch_size]
+            judged = [
+                (pair, verdict)
+                for pair, verdict in zip(batch, self.judge.judge_batch(batch))
+                if verdict is not None  # Failed judgments are retried next time, not cached
+            ]
+            self._memory.update(judged)
+            if self.store is not None:
+                self.store.put_many([
+                    (text_key(self.judge.name, a, b), b"1" if verdict else b"0")
+                    for (a, b), verdict in judged
+                ])
+
+        return [self._memory.get(p) for p in normalized]
+
+
+class LLMJudgeMatcher(EventMatcher):
+    """EventMatcher whose 'llm' tier is decided by a batched, cached judge"""
+
+    def __init__(
+        self,
+        base: Optional[EventMatcher] = None,
+        judge: Any = None,
+        cache_path: Optional[str] = None,
+        band: Optional[Tuple[float, float]] = None,
+        max_candidates: int = 3
+    ):
+        """
+        Args:
+            base: Similarity matcher for the exact/semantic tiers (default: lexical EventMatcher)
+            judge: Judge backend (default: OpenRouterJudge)
+            cache_path: SQLite file for persistent verdicts (None = memory only)
+            band: (low, high) similarity band sent to the judge
+                (default: the base matcher's llm/semantic thresholds)
+            max_candidates: Candidates per event judged, most similar first
+        """
+        self.base = base or EventMatcher()
+        low, high = band or (self.base.llm_threshold, self.base.semantic_threshold)
+        super().__init__(use_llm=False, semantic_threshold=high, llm_threshold=low)
+        self.cache = JudgeCache(judge or OpenRouterJudge(), cache_path)
+        self.max_candidates = max_candidates
+        # Not 'jaccard': the vectorized path would bypass the judge
+        self.similarity = f"{self.base.similarity}+judge"
+
+    def prepare(self, texts):
+        self.base.prepare(texts)
+
+    def top_k(self, actual_event: str, index: NodeIndex, k: int) -> List[Tuple[int, float]]:
+        return self.base.top_k(actual_event, index, k)
+
+    def match_indexed(self, actual_event: str, index: NodeIndex) -> MatchResult:
+        return self.match_all([(actual_event, index)])[0]
+
+    def match_all(self, queries: List[Tuple[str, NodeIndex]]) -> List[MatchResult]:
+        """Decide clear cases directly, then judge every in-band candidate in one batch"""
+        results: List[Optional[MatchResult]] = []
+        # query position -> [(node, similarity)] in-band candidates, best first
+        pending: Dict[int, List[Tuple[Dict[str, Any], float]]] = {}
+
+        for q, (actual_event, index) in enumerate(queries):
+            if not len(index):
+                results.append(self.no_nodes())
+                continue
+
+            exact = index.exact_match(actual_event)
+            if exact is not None:
+                results.append(self.exact(index.nodes[exact]))
+                continue
+
+            hits = self.top_k(actual_event, index, self.max_candidates)
+            best_similarity = hits[0][1] if hits else 0.0
+            if best_similarity > self.semantic_threshold:
+                results.append(self.resolve(index.nodes[hits[0][0]], best_similarity))
+                continue
+
+            candidates = [(index.nodes[i], s) for i, s in hits if s > self.llm_threshold]
+            if candidates:
+                pending[q] = candidates
+            results.append(self.resolve(None, best_similarity))
+
+        pairs = [
+            (queries[q][0], node['event'])
+            for q, candidates in pending.items()
+            for node, _ in candidates
+        ]
+        verdicts = iter(self.cache.verdicts(pairs))
+
+        for q, candidates in pending.items():
+            accepted = [(node, s) for (node, s), same in zip(candidates, verdicts) if same]
+            if accepted:
+                node, similarity = accepted[0]
+                results[q] = MatchResult(
+                    matched=True,
+                    match_type='llm',
+                    matched_event=node['event'],
+                    probability=node['probability'],
+                    similarity_score=similarity
+                )
+
+        return results
@@ -0,0 +1,72 @@
+"""
+Small SQLite key/value store for evaluation caches (embeddings, judge verdicts).
+
+Keys are SHA-256 hashes of the inputs; values are raw bytes. Reads and
+writes are batched so a whole evaluation batch costs one round trip.
+"""
+
+import os
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+
+def text_key(*parts: str) -> str:
+    """Stable SHA-256 key for a tuple of strings"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class KeyValueStore:
+    """Thread-safe bytes store backed by one SQLite table"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Values for the keys that are present"""
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_many(self, items: List[Tuple[str, bytes]]):
+        """Insert or replace several values in one transaction"""
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO entries (key, value) VALUES (?, ?)", items)
+            self._conn.commit()
+
+    def __getstate__(self) -> Dict:
+        # Connections don't pickle: worker processes reopen the file by path
+        return {"path": self.path}
+
+    def __setstate__(self, state: Dict):
+        self.__init__(state["path"])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,297 @@
+"""
+Streaming evaluation over JSONL predictions and ground truth.
+
+Predictions are read one line at a time and joined to ground truth by
+case_id through a byte-offset index (one scan of the ground-truth file; only
+offsets are kept in memory). Cases are scored in chunks and folded into a
+MetricsAggregator, so memory is bounded regardless of the number of cases.
+
+With calibration on, each case's forecast questions are appended to a side
+file ({output}.questions.jsonl) instead of being kept in memory; they are only
+read back for the final calibration metrics.
+
+Every `report_every` cases the running metrics are printed and a small state
+file (prediction byte offset, questions-file offset and the aggregator's
+running sums) is written atomically; a rerun with the same inputs resumes
+from there. "Same" includes each input
+file's size and modification time, so regenerated predictions start over
+instead of resuming into the old run's metrics. The final metrics file is the
+same format as save_metrics / load_metrics.
+
+Prediction lines: {"case_id": ..., "tree": {...}} (a bare tree with a
+case_id is also accepted). Ground-truth lines carry either an
+`outcome_chain` or chronicler `levels`, which are converted on the fly.
+
+Usage:
+    python evaluation/stream_eval.py \\
+        --predictions results/sft_predictions.jsonl \\
+        --ground-truth data/val.jsonl \\
+        --output results/sft_metrics.json --model-name sft
+"""
+
+import os
+import json
+import argparse
+import itertools
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from evaluation.evaluator import (
+        TreeEvaluator, MetricsAggregator, EvaluationMetrics, calibration_from_cases, save_metrics
+    )
+except ImportError:  # Running from inside evaluation/
+    from evaluator import (
+        TreeEvaluator, MetricsAggregator, EvaluationMetrics, calibration_from_cases, save_metrics
+    )
+
+
+def outcome_chain(case: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Actual outcome chain of a ground-truth case
+
+    Uses `outcome_chain` when present; otherwise each chronicler level
+    contributes its label-1 candidate (falling back to the end of its path).
+    """
+    if 'outcome_chain' in case:
+        return case['outcome_chain']
+
+    chain = []
+    for level in case.get('levels', []):
+        actual = next((c['event'] for c in level.get('candidates', []) if c.get('label') == 1), None)
+        if actual is None and level.get('path'):
+            actual = level['path'][-1]
+        if actual is not None:
+            chain.append({'depth': level['depth'], 'event': actual, 'date': level.get('date')})
+    return chain
+
+
+class JsonlIndex:
+    """case_id -> byte offset index over a JSONL file, for random-access lookups"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offsets: Dict[str, int] = {}
+
+        offset = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    case_id = json.loads(line).get('case_id')
+                    if case_id is not None:
+                        self.offsets.setdefault(str(case_id), offset)
+                offset += len(line)
+
+        self._file = open(path, 'rb')
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def get(self, case_id: Any) -> Optional[Dict[str, Any]]:
+        """The record for case_id, or None if it is not in the file"""
+        offset = self.offsets.get(str(case_id))
+        if offset is None:
+            return None
+        self._file.seek(offset)
+        return json.loads(self._file.readline())
+
+    def close(self):
+        self._file.close()
+
+
+def read_predictions(path: str, offset: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(end offset, record) for each prediction line from a byte offset on"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            if line.strip():
+                yield offset, json.loads(line)
+
+
+def file_fingerprint(path: str) -> Dict[str, Any]:
+    """Identity of an input file for the resume signature"""
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _load_state(path: str, signature: Dict[str, Any]) -> Tuple[int, int, MetricsAggregator]:
+    """(prediction offset, questions-file offset, aggregator) to resume from"""
+    if os.path.exists(path):
+        with open(path) as f:
+            state = json.load(f)
+        if state.get('signature') == signature and 'questions_offset' in state:
+            return state['offset'], state['questions_offset'], MetricsAggregator.from_dict(state['aggregator'])
+        print(f"⚠️  Ignoring {path}: written for different inputs")
+    return 0, 0, MetricsAggregator()
+
+
+def _save_state(
+    path: str,
+    signature: Dict[str, Any],
+    offset: int,
+    questions_offset: int,
+    aggregator: MetricsAggregator
+):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'signature': signature,
+            'offset': offset,
+            'questions_offset': questions_offset,
+            'aggregator': aggregator.to_dict()
+        }, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_case_questions(path: str) -> List[Tuple[int, list]]:
+    """(case index, questions) pairs from a questions side file"""
+    cases = []
+    with open(path) as f:
+        for line in f:
+            case_index, questions = json.loads(line)
+            cases.append((case_index, [(probs, outcome) for probs, outcome in questions]))
+    return cases
+
+
+def _running_summary(metrics: EvaluationMetrics) -> str:
+    return (
+        f"{metrics.num_cases} cases | loss {metrics.loss:.3f} | ppl {metrics.perplexity:.2f} | "
+        f"brier {metrics.brier_score:.3f} | match {metrics.match_coverage.match_rate * 100:.1f}%"
+    )
+
+
+def stream_evaluate(
+    predictions_path: str,
+    ground_truth_path: str,
+    output_path: str,
+    model_name: str = "unknown",
+    evaluator: Optional[TreeEvaluator] = None,
+    report_every: int = 1000,
+    chunk_size: int = 256,
+    resume: bool = True
+) -> EvaluationMetrics:
+    """
+    Evaluate a predictions JSONL against a ground-truth JSONL in bounded memory
+
+    Args:
+        predictions_path: JSONL of {"case_id", "tree"} records
+        ground_truth_path: JSONL of cases (outcome_chain or chronicler levels)
+        output_path: Where to write the final metrics (save_metrics format)
+        model_name: Name/identifier of the model
+        evaluator: TreeEvaluator to score with (default: lexical matcher)
+        report_every: Print running metrics and checkpoint every N cases
+        chunk_size: Cases scored per matcher batch
+        resume: Continue from the checkpoint left by an interrupted run
+
+    Returns:
+        Final aggregate metrics
+    """
+    evaluator = evaluator or TreeEvaluator(use_llm_matcher=False)
+    state_path = output_path + '.state.json'
+    questions_path = output_path + '.questions.jsonl'
+    signature = {
+        'predictions': file_fingerprint(predictions_path),
+        'ground_truth': file_fingerprint(ground_truth_path),
+        'model_name': model_name,
+        'calibration': evaluator.calibration
+    }
+
+    # The aggregator only keeps running sums; calibration questions go to questions_path
+    if resume:
+        offset, questions_offset, aggregator = _load_state(state_path, signature)
+    else:
+        offset, questions_offset, aggregator = 0, 0, MetricsAggregator()
+    if aggregator.num_cases:
+        print(f"♻️  Resuming after {aggregator.num_cases} cases")
+
+    questions_file = None
+    if evaluator.calibration:
+        # Drop questions written after the checkpoint being resumed from
+        questions_file = open(questions_path, 'a+')
+        questions_file.truncate(questions_offset)
+
+    ground_truth = JsonlIndex(ground_truth_path)
+    print(f"📚 Indexed {len(ground_truth)} ground-truth cases")
+
+    missing = 0
+    next_report = (aggregator.num_cases // report_every + 1) * report_every
+    predictions = read_predictions(predictions_path, offset)
+
+    try:
+        while True:
+            chunk, end = [], offset
+            for end, record in itertools.islice(predictions, chunk_size):
+                case = ground_truth.get(record.get('case_id'))
+                if case is None:
+                    missing += 1
+                    continue
+                chunk.append((record.get('tree', record), {'outcome_chain': outcome_chain(case)}))
+            if end == offset:
+                break
+
+            for metrics, questions in evaluator.evaluate_chunk(chunk, model_name):
+                if questions_file is not None:
+                    questions_file.write(json.dumps([aggregator.num_cases, questions]) + "\n")
+                aggregator.add(metrics)
+            offset = end
+
+            if aggregator.num_cases >= next_report:
+                print(f"  📊 {_running_summary(aggregator.result(model_name))}")
+                if questions_file is not None:
+                    questions_file.flush()
+                    os.fsync(questions_file.fileno())
+                    questions_offset = questions_file.tell()
+                _save_state(state_path, signature, offset, questions_offset, aggregator)
+                next_report = (aggregator.num_cases // report_every + 1) * report_every
+    finally:
+        ground_truth.close()
+        if questions_file is not None:
+            questions_file.close()
+
+    if missing:
+        print(f"⚠️  {missing} predictions had no ground truth and were skipped")
+    if not aggregator.num_cases:
+        raise ValueError(f"No predictions in {predictions_path} matched a ground-truth case")
+
+    metrics = aggregator.result(model_name)
+    if evaluator.calibration:
+        metrics.calibration = calibration_from_cases(read_case_questions(questions_path))
+    save_metrics(metrics, output_path)
+    for path in (state_path, questions_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    print(f"✅ {_running_summary(metrics)}")
+    print(f"💾 Metrics saved to: {output_path}")
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream-evaluate JSONL predictions against ground truth")
+    parser.add_argument("--predictions", required=True, help="Predictions JSONL ({case_id, tree} per line)")
+    parser.add_argument("--ground-truth", required=True, help="Ground-truth cases JSONL")
+    parser.add_argument("--output", required=True, help="Metrics JSON to write")
+    parser.add_argument("--model-name", default="unknown")
+    parser.add_argument("--report-every", type=int, default=1000, help="Running metrics/checkpoint interval (cases)")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--vectorized", action="store_true", help="Use the NumPy batch matcher")
+    parser.add_argument("--calibration", action="store_true", help="Also compute calibration metrics (Brier, ECE, reliability)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore any checkpoint and start over")
+    args = parser.parse_args()
+
+    stream_evaluate(
+        args.predictions,
+        args.ground_truth,
+        args.output,
+        model_name=args.model_name,
+        evaluator=TreeEvaluator(use_llm_matcher=False, vectorized=args.vectorized, calibration=args.calibration),
+        report_every=args.report_every,
+        chunk_size=args.chunk_size,
+        resume=not args.no_resume
+    )
+
+
+if __name__ == "__main__":
+    main()
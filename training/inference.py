@@ -2,14 +2,284 @@
 Hot-swappable inference layer for probability tree models.
 
 Allows comparing baseline vs SFT vs GRPO models apples-to-apples by swapping
-LoRA adapters without reloading the base model.
+LoRA adapters without reloading the base model. Adapters are loaded once into
+a single PeftModel (see AdapterRegistry); switching only changes which one is
+active, and a batch can mix rows for different adapters and the baseline.
+
+stream_outcomes / astream_outcomes yield each outcome node as soon as its
+JSON object closes in the token stream (see OutcomeStreamParser).
 """
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, AsyncIterator, Iterator, List, Tuple
+from collections import OrderedDict
 from pathlib import Path
+import copy
 import json
 
 
+class PrefixCache:
+    """
+    LRU of prefilled KV caches keyed by (model, adapter, prompt-prefix token ids)
+
+    Bounded by the total number of cached prefix tokens (KV memory is
+    proportional to it); least recently used prefixes are evicted first.
+    """
+
+    def __init__(self, max_tokens: int = 32768):
+        self.max_tokens = max_tokens
+        self._entries: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        self._tokens = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[Any]:
+        cache = self._entries.get(key)
+        if cache is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return cache
+
+    def put(self, key: Tuple[Any, ...], cache: Any):
+        """Store a cache; the last key element is the prefix token ids"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = cache
+        self._tokens += len(key[-1])
+        while self._tokens > self.max_tokens and len(self._entries) > 1:
+            evicted, _ = self._entries.popitem(last=False)
+            self._tokens -= len(evicted[-1])
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def repeat_cache(cache: Any, n: int) -> Any:
+    """A copy of a batch-1 KV cache repeated n times along the batch dimension"""
+    if hasattr(cache, "batch_repeat_interleave"):
+        # transformers Cache object: repeats in place, so work on a copy
+        cache = copy.deepcopy(cache)
+        cache.batch_repeat_interleave(n)
+        return cache
+    # Legacy tuple-of-(key, value) format
+    return tuple(tuple(t.repeat_interleave(n, dim=0) for t in layer) for layer in cache)
+
+
+def common_prefix_length(sequences: List[List[int]]) -> int:
+    """Length of the longest token prefix shared by all sequences"""
+    shortest = min(sequences, key=len)
+    for i, token in enumerate(shortest):
+        if any(seq[i] != token for seq in sequences):
+            return i
+    return len(shortest)
+
+
+class OutcomeStreamParser:
+    """
+    Incremental parser for a streamed JSON array of outcomes
+
+    feed() takes text chunks as they are decoded and returns the outcome
+    objects completed by that chunk. Text before the array (prose, a ```json
+    fence) is skipped: the array starts at a '[' followed by '{', and an
+    array that closes without yielding an outcome (e.g. "[1]") is treated as
+    prose too. Strings are tracked so braces inside events don't count.
+    Objects that aren't valid JSON are dropped.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.bracket = False   # Last non-whitespace character before the array was '['
+        self.started = False   # Seen the opening '[' followed by '{'
+        self.finished = False  # Seen the closing ']'
+        self.emitted = 0       # Outcomes yielded from the current array
+        self.depth = 0         # Brace depth inside the array
+        self.in_string = False
+        self.escaped = False
+        self.object_start = 0  # Buffer index of the current top-level '{'
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        completed = []
+        start = len(self.buffer)
+        self.buffer += text
+
+        for i in range(start, len(self.buffer)):
+            if self.finished:
+                break
+            ch = self.buffer[i]
+            if not self.started:
+                if not (self.bracket and ch == "{"):
+                    if not (self.bracket and ch.isspace()):
+                        self.bracket = ch == "["
+                    continue
+                self.started = True  # This '{' opens the first object
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                if self.depth == 0:
+                    self.object_start = i
+                self.depth += 1
+            elif ch == "}" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        outcome = json.loads(self.buffer[self.object_start:i + 1])
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(outcome, dict):
+                        completed.append(outcome)
+                        self.emitted += 1
+            elif ch == "]" and self.depth == 0:
+                if self.emitted:
+                    self.finished = True
+                else:
+                    # Nothing usable in this array: keep looking for the real one
+                    self.started = self.bracket = False
+
+        return completed
+
+
+def adapter_mtime(path: str) -> int:
+    """Newest modification time (ns) of an adapter checkpoint directory or file"""
+    path = Path(path)
+    files = [path, *path.iterdir()] if path.is_dir() else [path]
+    return max(f.stat().st_mtime_ns for f in files)
+
+
+class AdapterRegistry:
+    """
+    LoRA adapters loaded once, by name, into a single PeftModel
+
+    The first adapter wraps the base model; later ones are added to the same
+    PeftModel with load_adapter, so the base weights are never rewrapped or
+    copied. Switching is set_adapter (a flag flip per LoRA layer, no disk or
+    weight movement). Adapters are evicted least recently used first once
+    their parameters exceed max_bytes; the active adapter is never evicted.
+    An adapter is identified by its path and checkpoint mtime, so a
+    checkpoint retrained in place is read again.
+
+    Rows of one batch can use different adapters by passing peft's
+    per-row `adapter_names` to forward/generate (see row_name).
+    """
+
+    # peft's per-row adapter name for "no adapter"
+    BASE = "__base__"
+
+    def __init__(self, base_model, max_bytes: int = 4 * 1024 ** 3):
+        """
+        Args:
+            base_model: The loaded transformers model
+            max_bytes: Budget for the parameters of all loaded adapters
+        """
+        self.base_model = base_model
+        self.max_bytes = max_bytes
+        self.model = None  # PeftModel, created with the first adapter
+        self.paths: "OrderedDict[str, str]" = OrderedDict()  # name -> path, least recently used first
+        self.mtimes: Dict[str, int] = {}
+        self.sizes: Dict[str, int] = {}
+        self.active: Optional[str] = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.paths
+
+    def load(self, name: str, path: str) -> bool:
+        """
+        Make adapter `name` available, reading it from disk only if needed
+
+        Returns:
+            True if the weights were read from disk (new name, new path or
+            a checkpoint modified since it was loaded)
+        """
+        mtime = adapter_mtime(path)
+        if self.paths.get(name) == path and self.mtimes[name] == mtime:
+            self.paths.move_to_end(name)
+            return False
+        if name in self.paths:
+            self.delete(name)
+
+        from peft import PeftModel
+
+        if self.model is None:
+            self.model = PeftModel.from_pretrained(
+                self.base_model,
+                path,
+                adapter_name=name,
+                is_trainable=False,
+            )
+        else:
+            self.model.load_adapter(path, adapter_name=name, is_trainable=False)
+
+        self.paths[name] = path
+        self.mtimes[name] = mtime
+        self.sizes[name] = self._adapter_bytes(name)
+        self._evict(keep=name)
+        return True
+
+    def activate(self, name: Optional[str]):
+        """Make `name` the adapter used by default (None = baseline)"""
+        if name is not None:
+            if name not in self.paths:
+                raise KeyError(f"Adapter '{name}' is not loaded")
+            self.model.set_adapter(name)
+            self.paths.move_to_end(name)
+        self.active = name
+
+    def delete(self, name: str):
+        """Unload an adapter's weights"""
+        if name == self.active:
+            self.active = None
+        if len(self.paths) > 1 and self.model.active_adapter == name:
+            # peft needs another adapter to fall back on
+            self.model.set_adapter(next(n for n in self.paths if n != name))
+        self.model.delete_adapter(name)
+        del self.paths[name], self.mtimes[name], self.sizes[name]
+
+    def row_name(self, name: Optional[str]) -> str:
+        """peft adapter name for a batch row (None or 'baseline' = no adapter)"""
+        if name is None or name == "baseline":
+            return self.BASE
+        if name not in self.paths:
+            raise KeyError(f"Adapter '{name}' is not loaded")
+        self.paths.move_to_end(name)
+        return name
+
+    def weights_key(self, name: Optional[str]) -> Optional[Tuple[str, int]]:
+        """(path, mtime) of the weights behind a name (None = no adapter), for cache keys"""
+        if name is None or name in ("baseline", self.BASE):
+            return None
+        if name not in self.paths:
+            raise KeyError(f"Adapter '{name}' is not loaded")
+        return self.paths[name], self.mtimes[name]
+
+    def _adapter_bytes(self, name: str) -> int:
+        marker = f".{name}."
+        return sum(
+            p.numel() * p.element_size()
+            for n, p in self.model.named_parameters()
+            if marker in n
+        )
+
+    def _evict(self, keep: str):
+        for name in list(self.paths):
+            if sum(self.sizes.values()) <= self.max_bytes:
+                break
+            if name not in (keep, self.active):
+                print(f"♻️  Evicting adapter '{name}'")
+                self.delete(name)
+
+
 class ProbabilityTreeInference:
     """
     Inference engine with hot-swappable LoRA adapters
@@ -24,6 +294,9 @@ class ProbabilityTreeInference:
         self,
         base_model_name: str = "openai/gpt-oss-20b",
         device: str = "auto",
+        prefix_cache_tokens: int = 0,
+        max_adapter_bytes: int = 4 * 1024 ** 3,
+        constrained_decoding: bool = True,
     ):
         """
         Initialize inference engine
@@ -31,13 +304,26 @@ class ProbabilityTreeInference:
         Args:
             base_model_name: HuggingFace model ID
             device: Device to load model on
+            prefix_cache_tokens: Token budget of the shared-prefix KV cache
+                (0, the default, disables prefix reuse; see _generate_frontier
+                for when enabling it pays off)
+            max_adapter_bytes: Memory budget for loaded adapters (LRU eviction)
+            constrained_decoding: Only allow tokens that keep the output a valid
+                outcome JSON array (see constrained_decoding.py)
         """
         self.base_model_name = base_model_name
         self.device = device
         self.base_model = None
         self.tokenizer = None
+        self.max_adapter_bytes = max_adapter_bytes
+        self.adapters: Optional[AdapterRegistry] = None
         self.current_adapter = None
         self.current_adapter_name = "baseline"
+        self.prefix_cache = PrefixCache(prefix_cache_tokens) if prefix_cache_tokens > 0 else None
+        self.constrained_decoding = constrained_decoding
+        self._json_constraint = None
+        # Sampling settings of every generate call
+        self.sampling = {"temperature": 0.7, "do_sample": True}
 
     def _load_base_model(self):
         """Lazy load base model (only once)"""
@@ -59,39 +345,38 @@ class ProbabilityTreeInference:
             device_map=self.device,
             trust_remote_code=True,
         )
+        self.adapters = AdapterRegistry(self.base_model, self.max_adapter_bytes)
 
         print("✅ Base model loaded")
 
     def load_adapter(self, adapter_path: Optional[str] = None, adapter_name: str = "custom"):
         """
-        Load LoRA adapter weights
+        Load (if needed) and activate LoRA adapter weights
+
+        An adapter already loaded under this name and path (and not modified
+        on disk since) is only re-activated, without touching the base model.
 
         Args:
             adapter_path: Path to adapter checkpoint (None for baseline)
-            adapter_name: Name for this adapter (for tracking)
+            adapter_name: Name for this adapter (for tracking and mixed batches)
         """
         self._load_base_model()
 
         if adapter_path is None:
             # Baseline: no adapter
+            self.adapters.activate(None)
             self.current_adapter = None
             self.current_adapter_name = "baseline"
             print("🔄 Switched to baseline (no adapter)")
             return
 
-        print(f"🔄 Loading adapter from {adapter_path}...")
-
-        from peft import PeftModel
-
-        # Load adapter on top of base model
-        self.current_adapter = PeftModel.from_pretrained(
-            self.base_model,
-            adapter_path,
-            is_trainable=False,
-        )
+        if self.adapters.load(adapter_name, adapter_path):
+            print(f"🔄 Loaded adapter from {adapter_path}")
+        self.adapters.activate(adapter_name)
 
+        self.current_adapter = self.adapters.model
         self.current_adapter_name = adapter_name
-        print(f"✅ Adapter '{adapter_name}' loaded")
+        print(f"✅ Adapter '{adapter_name}' active")
 
     def generate_tree(
         self,
@@ -99,6 +384,8 @@ class ProbabilityTreeInference:
         context: str = "",
         max_depth: int = 3,
         use_baseline: bool = False,
+        beam_width: Optional[int] = None,
+        max_nodes: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         Generate probability tree for a seed event
@@ -108,41 +395,558 @@ class ProbabilityTreeInference:
             context: Additional context
             max_depth: Maximum tree depth
             use_baseline: Force using baseline (ignore current adapter)
+            beam_width: Expand at most this many nodes per depth (see expand_trees)
+            max_nodes: Stop adding nodes once the tree has this many
 
         Returns:
             Probability tree structure
         """
+        return self.generate_trees_batch(
+            [(seed_event, context)],
+            max_depth=max_depth,
+            use_baseline=use_baseline,
+            beam_width=beam_width,
+            max_nodes=max_nodes,
+        )[0]
+
+    def generate_trees_batch(
+        self,
+        seeds: List[Tuple[str, str]],
+        max_depth: int = 1,
+        max_new_tokens: int = 512,
+        token_budget: int = 16384,
+        max_batch_size: int = 32,
+        use_baseline: bool = False,
+        beam_width: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        min_path_probability: float = 0.0,
+        adapter_names: Optional[List[Optional[str]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate trees for many seeds with batched model.generate calls
+
+        Trees are expanded breadth-first: at each depth, every frontier node
+        of every seed is generated in one batched call (see _generate_batch),
+        so a depth-3 forest costs 3 rounds of batched generation rather than
+        one call per node. With prefix reuse enabled, sibling groups are
+        generated separately instead (see _generate_frontier).
+
+        Args:
+            seeds: (seed_event, context) pairs
+            max_depth: Depth to expand to (1 = immediate outcomes only)
+            max_new_tokens: Generation length per node
+            token_budget: Max padded tokens (prompt + generation) per batch
+            max_batch_size: Max prompts per batch
+            use_baseline: Force using baseline (ignore current adapter)
+            beam_width: Per tree, expand only the most probable frontier nodes
+                (by cumulative path probability); None = all
+            max_nodes: Per tree, stop adding children once it has this many nodes
+            min_path_probability: Don't expand nodes whose path probability is below this
+            adapter_names: Per seed, the loaded adapter to generate with (None or
+                'baseline' = no adapter); rows for different adapters share batches
+
+        Returns:
+            One tree per seed, in input order
+        """
+        model, model_name = self._select_model(use_baseline)
+        tree_adapters = self._row_adapters(len(seeds), use_baseline, adapter_names)
+        if adapter_names is not None:
+            model_name = "/".join(dict.fromkeys(name or "baseline" for name in adapter_names))
+        print(f"\n🌲 Generating {len(seeds)} trees (depth {max_depth}) with '{model_name}' model...")
+
+        trees = [{"event": seed_event, "probability": 1.0, "children": []} for seed_event, _ in seeds]
+        node_counts = [1] * len(trees)
+
+        # (tree index, node, path from the seed, cumulative path probability)
+        frontier = [(t, tree, [tree["event"]], 1.0) for t, tree in enumerate(trees)]
+
+        for depth in range(1, max_depth + 1):
+            frontier = self._prune_frontier(frontier, node_counts, beam_width, max_nodes, min_path_probability)
+            if not frontier:
+                break
+
+            prompts = [
+                self._build_prompt(seeds[t][0], seeds[t][1], depth=depth, path=path)
+                for t, _, path, _ in frontier
+            ]
+            # Siblings (same tree and parent path) share everything up to the parent
+            groups = [(t, tuple(path[:-1])) for t, _, path, _ in frontier]
+            row_adapters = None if tree_adapters is None else [tree_adapters[t] for t, _, _, _ in frontier]
+            completions = self._generate_frontier(
+                model, prompts, groups, max_new_tokens, token_budget, max_batch_size, row_adapters
+            )
+            print(f"  Depth {depth}: expanded {len(frontier)} nodes")
+
+            next_frontier = []
+            for (t, node, path, path_probability), completion in zip(frontier, completions):
+                children = self._parse_outcomes(completion)
+                if max_nodes is not None:
+                    children = children[:max(max_nodes - node_counts[t], 0)]
+                node["children"] = children
+                node_counts[t] += len(children)
+                next_frontier.extend(
+                    (t, child, path + [child["event"]], path_probability * child["probability"])
+                    for child in children
+                )
+            frontier = next_frontier
+
+        return trees
+
+    def _generate_frontier(
+        self,
+        model,
+        prompts: List[str],
+        groups: List[Any],
+        max_new_tokens: int,
+        token_budget: int,
+        max_batch_size: int,
+        adapter_names: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Completions for a frontier, reusing the KV cache of shared prefixes
+
+        Without a prefix cache (the default) the whole frontier is one
+        length-bucketed batch. With one, prompts with the same group key
+        (siblings) are generated together on one prefilled prefix, at the cost
+        of one generate call per sibling group. Cached prefixes include the
+        parent path, so they are rarely reused across calls. This only pays
+        off when long shared prompts dominate and frontiers are small (few
+        seeds, wide trees). Group keys must not span adapters (siblings are in
+        one tree).
+        """
+        if self.prefix_cache is None:
+            return self._generate_batch(
+                model, prompts, max_new_tokens, token_budget, max_batch_size, adapter_names
+            )
+
+        members: Dict[Any, List[int]] = {}
+        for i, key in enumerate(groups):
+            members.setdefault(key, []).append(i)
+
+        completions = [""] * len(prompts)
+        singles = [ids[0] for ids in members.values() if len(ids) == 1]
+        if singles:
+            for i, text in zip(singles, self._generate_batch(
+                model, [prompts[i] for i in singles], max_new_tokens, token_budget, max_batch_size,
+                None if adapter_names is None else [adapter_names[i] for i in singles]
+            )):
+                completions[i] = text
+
+        for ids in members.values():
+            if len(ids) > 1:
+                for i, text in zip(ids, self._generate_shared_prefix(
+                    model, [prompts[i] for i in ids], max_new_tokens,
+                    adapter_name=None if adapter_names is None else adapter_names[ids[0]]
+                )):
+                    completions[i] = text
+
+        return completions
+
+    def _prefill(self, model, prefix_ids: List[int], adapter_name: Optional[str] = None) -> Any:
+        """KV cache of a prompt prefix (batch 1), from the prefix cache when possible"""
+        import torch
+
+        # One PeftModel serves every adapter, so the adapter's weights are part
+        # of the key: by checkpoint identity, not name, since names are reused
+        # after eviction or a reload from another path
+        name = self.current_adapter_name if adapter_name is None else adapter_name
+        key = (id(model), self.adapters.weights_key(name), tuple(prefix_ids))
+        cache = self.prefix_cache.get(key) if self.prefix_cache is not None else None
+        if cache is None:
+            with torch.no_grad():
+                cache = model(
+                    input_ids=torch.tensor([prefix_ids], device=model.device),
+                    use_cache=True,
+                    **self._adapter_kwargs(None if adapter_name is None else [adapter_name]),
+                ).past_key_values
+            if self.prefix_cache is not None:
+                self.prefix_cache.put(key, cache)
+        return cache
+
+    def _generate_shared_prefix(
+        self,
+        model,
+        prompts: List[str],
+        max_new_tokens: int = 512,
+        num_return_sequences: int = 1,
+        adapter_name: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Completions for prompts sharing a token prefix, prefilling it once
+
+        The common prefix is prefilled (or taken from the prefix cache) and
+        its KV cache repeated across the batch; only the differing suffixes
+        are processed per row. Shorter suffixes are padded between prefix and
+        suffix with the padding masked out, so positions stay contiguous.
+
+        Args:
+            adapter_name: peft adapter name for every row (None = active adapter)
+
+        Returns:
+            num_return_sequences completions per prompt, grouped by prompt
+        """
+        import torch
+
+        encoded = [self.tokenizer(prompt)["input_ids"] for prompt in prompts]
+        # Keep at least one uncached token per row for generate to start from
+        prefix_len = min(common_prefix_length(encoded), min(map(len, encoded)) - 1)
+        prefix = encoded[0][:prefix_len]
+        rows = [ids[prefix_len:] for ids in encoded for _ in range(num_return_sequences)]
+        width = max(map(len, rows))
+
+        input_ids = torch.full((len(rows), prefix_len + width), self.tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros_like(input_ids)
+        input_ids[:, :prefix_len] = torch.tensor(prefix, dtype=torch.long)
+        attention_mask[:, :prefix_len] = 1
+        for r, suffix in enumerate(rows):
+            input_ids[r, prefix_len + width - len(suffix):] = torch.tensor(suffix, dtype=torch.long)
+            attention_mask[r, prefix_len + width - len(suffix):] = 1
+
+        past_key_values = repeat_cache(self._prefill(model, prefix, adapter_name), len(rows)) if prefix_len else None
+
+        with torch.no_grad():
+            outputs = model.generate(
+                input_ids=input_ids.to(model.device),
+                attention_mask=attention_mask.to(model.device),
+                past_key_values=past_key_values,
+                max_new_tokens=max_new_tokens,
+                **self.sampling,
+                pad_token_id=self.tokenizer.pad_token_id,
+                **self._constraint_kwargs(),
+                **self._adapter_kwargs(None if adapter_name is None else [adapter_name] * len(rows)),
+            )
+
+        return self.tokenizer.batch_decode(outputs[:, input_ids.shape[1]:], skip_special_tokens=True)
+
+    def _prune_frontier(
+        self,
+        frontier: List[Tuple[int, Dict[str, Any], List[str], float]],
+        node_counts: List[int],
+        beam_width: Optional[int],
+        max_nodes: Optional[int],
+        min_path_probability: float,
+    ) -> List[Tuple[int, Dict[str, Any], List[str], float]]:
+        """Frontier nodes worth expanding: above the probability floor, within beam and node budget"""
+        kept = []
+        per_tree: Dict[int, int] = {}
+        # Most probable first, so the beam keeps the likeliest paths of each tree
+        for entry in sorted(frontier, key=lambda e: (e[0], -e[3])):
+            t, _, _, path_probability = entry
+            if path_probability < min_path_probability:
+                continue
+            if max_nodes is not None and node_counts[t] >= max_nodes:
+                continue
+            if beam_width is not None and per_tree.get(t, 0) >= beam_width:
+                continue
+            per_tree[t] = per_tree.get(t, 0) + 1
+            kept.append(entry)
+        return kept
+
+    def _length_buckets(
+        self,
+        lengths: List[int],
+        max_new_tokens: int,
+        token_budget: int,
+        max_batch_size: int,
+    ) -> List[List[int]]:
+        """Group indices (shortest first) into batches that fit the token budget"""
+        batches, batch = [], []
+        for i in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+            # Sorted ascending, so the newest prompt is the longest in the batch
+            padded = (len(batch) + 1) * (lengths[i] + max_new_tokens)
+            if batch and (padded > token_budget or len(batch) >= max_batch_size):
+                batches.append(batch)
+                batch = []
+            batch.append(i)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _generate_batch(
+        self,
+        model,
+        prompts: List[str],
+        max_new_tokens: int = 512,
+        token_budget: int = 16384,
+        max_batch_size: int = 32,
+        adapter_names: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Completions (new tokens only) for many prompts, in input order
+
+        adapter_names, if given, is the peft adapter name of each prompt's row
+        (see _row_adapters); rows with different adapters can share a batch.
+        """
+        import torch
+
+        encoded = [self.tokenizer(prompt)["input_ids"] for prompt in prompts]
+        buckets = self._length_buckets([len(ids) for ids in encoded], max_new_tokens, token_budget, max_batch_size)
+        completions = [""] * len(prompts)
+
+        # Left padding keeps every prompt's last token adjacent to its generation
+        padding_side = self.tokenizer.padding_side
+        self.tokenizer.padding_side = "left"
+        try:
+            for batch in buckets:
+                inputs = self.tokenizer.pad(
+                    {"input_ids": [encoded[i] for i in batch]},
+                    return_tensors="pt",
+                ).to(model.device)
+
+                with torch.no_grad():
+                    outputs = model.generate(
+                        **inputs,
+                        max_new_tokens=max_new_tokens,
+                        **self.sampling,
+                        pad_token_id=self.tokenizer.pad_token_id,
+                        **self._constraint_kwargs(),
+                        **self._adapter_kwargs(None if adapter_names is None else [adapter_names[i] for i in batch]),
+                    )
+
+                new_tokens = outputs[:, inputs["input_ids"].shape[1]:]
+                for i, text in zip(batch, self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)):
+                    completions[i] = text
+        finally:
+            self.tokenizer.padding_side = padding_side
+
+        return completions
+
+    def generation_signature(self) -> Dict[str, Any]:
+        """
+        Settings that determine generated trees (JSON-safe), for deciding
+        whether saved generations are still valid: base model, the active
+        adapter's checkpoint (path and mtime), decoding and sampling settings
+        """
+        weights = None if self.adapters is None else self.adapters.weights_key(self.current_adapter_name)
+        return {
+            "base_model": self.base_model_name,
+            "adapter": None if weights is None else {"path": str(Path(weights[0]).resolve()), "mtime_ns": weights[1]},
+            "constrained_decoding": self.constrained_decoding,
+            "sampling": self.sampling,
+        }
+
+    def _select_model(self, use_baseline: bool = False):
+        """(model, name) for the current adapter, or the base model"""
         self._load_base_model()
 
-        # Choose model
-        if use_baseline:
-            model = self.base_model
-            model_name = "baseline"
-        elif self.current_adapter is not None:
-            model = self.current_adapter
-            model_name = self.current_adapter_name
-        else:
-            model = self.base_model
-            model_name = "baseline"
+        # Once an adapter is loaded its layers live in the base model, so the
+        # baseline runs through the PeftModel too (see _row_adapters)
+        model = self.adapters.model or self.base_model
+        if use_baseline or self.current_adapter is None:
+            return model, "baseline"
+        return model, self.current_adapter_name
+
+    def _row_adapters(
+        self,
+        n: int,
+        use_baseline: bool = False,
+        adapter_names: Optional[List[Optional[str]]] = None,
+    ) -> Optional[List[str]]:
+        """
+        Per-row peft adapter names for n rows, or None to run the active adapter
+
+        Baseline rows are routed to peft's "no adapter" entry whenever
+        adapters are loaded, since the LoRA layers are part of the model.
+        """
+        if adapter_names is not None:
+            if len(adapter_names) != n:
+                raise ValueError(f"Expected {n} adapter names, got {len(adapter_names)}")
+            return [self.adapters.row_name(name) for name in adapter_names]
+        if self.adapters.model is not None and (use_baseline or self.adapters.active is None):
+            return [AdapterRegistry.BASE] * n
+        return None
+
+    def _constraint_kwargs(self) -> Dict[str, Any]:
+        """generate kwargs for constrained JSON decoding (empty when disabled)"""
+        if not self.constrained_decoding:
+            return {}
+        from constrained_decoding import JsonConstraint, generation_kwargs
+
+        if self._json_constraint is None:
+            # Decodes the vocabulary once; state masks are cached across calls
+            self._json_constraint = JsonConstraint(self.tokenizer)
+        return generation_kwargs(self._json_constraint)
+
+    @staticmethod
+    def _adapter_kwargs(adapter_names: Optional[List[str]]) -> Dict[str, Any]:
+        """forward/generate kwargs selecting per-row adapters"""
+        return {} if adapter_names is None else {"adapter_names": adapter_names}
+
+    def score_candidates_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        batch_size: int = 8,
+        use_baseline: bool = False,
+    ) -> List[float]:
+        """
+        Teacher-forced log-likelihood of continuations
+
+        Args:
+            pairs: (prompt, continuation) pairs
+            batch_size: Sequences per forward pass
+            use_baseline: Force using baseline (ignore current adapter)
 
-        print(f"\n🌲 Generating tree with '{model_name}' model...")
+        Returns:
+            Sum of token log-probabilities of each continuation given its
+            prompt, in input order
+        """
+        import torch
 
-        # Build prompt
-        prompt = self._build_prompt(seed_event, context, depth=1)
+        model, _ = self._select_model(use_baseline)
+        baseline_rows = self._row_adapters(1, use_baseline) is not None
+
+        # Prompt and continuation are tokenized separately so the boundary
+        # never merges into one token; identical prompts are tokenized once
+        prompt_ids: Dict[str, List[int]] = {}
+        sequences = []
+        for prompt, continuation in pairs:
+            if prompt not in prompt_ids:
+                prompt_ids[prompt] = self.tokenizer(prompt)["input_ids"]
+            continuation_ids = self.tokenizer(continuation, add_special_tokens=False)["input_ids"]
+            sequences.append((prompt_ids[prompt], continuation_ids))
+
+        # Length-sorted batches keep padding small
+        order = sorted(range(len(sequences)), key=lambda i: -sum(map(len, sequences[i])))
+        scores = [0.0] * len(sequences)
+
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            rows = [sequences[i][0] + sequences[i][1] for i in batch]
+            width = max(map(len, rows))
+
+            input_ids = torch.full((len(rows), width), self.tokenizer.pad_token_id, dtype=torch.long)
+            attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+            for r, ids in enumerate(rows):
+                input_ids[r, :len(ids)] = torch.tensor(ids)
+                attention_mask[r, :len(ids)] = 1
+
+            with torch.no_grad():
+                logits = model(
+                    input_ids=input_ids.to(model.device),
+                    attention_mask=attention_mask.to(model.device),
+                    **self._adapter_kwargs([AdapterRegistry.BASE] * len(rows) if baseline_rows else None),
+                ).logits
+
+            for r, i in enumerate(batch):
+                prompt_len, continuation = len(sequences[i][0]), sequences[i][1]
+                if not continuation:
+                    continue
+                # Only the continuation positions go through log_softmax
+                step_logits = logits[r, prompt_len - 1:prompt_len - 1 + len(continuation)].float()
+                targets = torch.tensor(continuation, device=step_logits.device)
+                log_probs = torch.log_softmax(step_logits, dim=-1).gather(1, targets[:, None])
+                scores[i] = log_probs.sum().item()
+
+        return scores
+
+    def stream_outcomes(
+        self,
+        seed_event: str,
+        context: str = "",
+        max_new_tokens: int = 512,
+        use_baseline: bool = False,
+        path: Optional[List[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Generate the outcomes of one event, yielding each node as soon as it is complete
 
-        # Generate
-        outputs = self._generate(model, prompt)
+        Generation runs on a background thread feeding a TextIteratorStreamer;
+        decoded text goes through OutcomeStreamParser, so the first node is
+        available once its JSON object closes rather than after the whole
+        response. Closing the generator early stops generation.
 
-        # Parse into tree structure
-        tree = self._parse_to_tree(seed_event, outputs)
+        Args:
+            seed_event: The initial event
+            context: Additional context
+            max_new_tokens: Generation length
+            use_baseline: Force using baseline (ignore current adapter)
+            path: Events from the seed to the node being expanded (None = the seed)
+
+        Yields:
+            Child nodes ({event, probability, timeframe_months, children}), in order
+        """
+        import threading
+        import torch
+        from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+        model, model_name = self._select_model(use_baseline)
+        depth = len(path) if path else 1
+        prompt = self._build_prompt(seed_event, context, depth=depth, path=path)
+        inputs = self.tokenizer(prompt, return_tensors="pt").to(model.device)
+
+        stop = threading.Event()
+
+        class _StopWhenClosed(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return torch.full((input_ids.shape[0],), stop.is_set(), dtype=torch.bool, device=input_ids.device)
+
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        errors: List[BaseException] = []
+
+        def run():
+            try:
+                with torch.no_grad():
+                    model.generate(
+                        **inputs,
+                        max_new_tokens=max_new_tokens,
+                        **self.sampling,
+                        pad_token_id=self.tokenizer.pad_token_id,
+                        streamer=streamer,
+                        stopping_criteria=StoppingCriteriaList([_StopWhenClosed()]),
+                        **self._constraint_kwargs(),
+                        **self._adapter_kwargs(self._row_adapters(1, use_baseline)),
+                    )
+            except BaseException as e:
+                errors.append(e)
+                streamer.end()  # Unblock the consumer
+
+        print(f"\n🌊 Streaming outcomes for '{path[-1] if path else seed_event}' with '{model_name}' model...")
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+
+        parser = OutcomeStreamParser()
+        try:
+            for text in streamer:
+                for outcome in parser.feed(text):
+                    yield self._outcome_node(outcome)
+        finally:
+            stop.set()
+            thread.join()
 
-        return tree
+        if errors:
+            raise errors[0]
+
+    async def astream_outcomes(
+        self,
+        seed_event: str,
+        context: str = "",
+        **kwargs,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async iterator over stream_outcomes (same arguments)
+
+        Each step waits on a worker thread, so the event loop keeps serving
+        other requests while tokens are generated.
+        """
+        import asyncio
+
+        nodes = self.stream_outcomes(seed_event, context, **kwargs)
+        done = object()
+        try:
+            while True:
+                node = await asyncio.to_thread(next, nodes, done)
+                if node is done:
+                    break
+                yield node
+        finally:
+            await asyncio.to_thread(nodes.close)
 
     def compare_models(
         self,
         seed_event: str,
         context: str = "",
         adapters: List[str] = None,
+        mixed_batch: bool = False,
     ) -> Dict[str, Dict[str, Any]]:
         """
         Generate trees with multiple models for comparison
@@ -151,12 +955,26 @@ class ProbabilityTreeInference:
             seed_event: The initial event
             context: Additional context
             adapters: List of adapter paths to compare (None = just baseline)
+            mixed_batch: Generate every model's tree together, one row per
+                adapter in each batched call, instead of one model at a time
 
         Returns:
             Dict mapping model name to generated tree
         """
         results = {}
 
+        if mixed_batch:
+            names = ["baseline"]
+            for i, adapter_path in enumerate(adapters or []):
+                self.load_adapter(adapter_path, f"adapter_{i}")
+                names.append(f"adapter_{i}")
+            trees = self.generate_trees_batch(
+                [(seed_event, context)] * len(names),
+                max_depth=3,
+                adapter_names=names,
+            )
+            return dict(zip(names, trees))
+
         # Baseline
         self.load_adapter(None)
         results["baseline"] = self.generate_tree(seed_event, context)
@@ -170,8 +988,25 @@ class ProbabilityTreeInference:
 
         return results
 
-    def _build_prompt(self, seed_event: str, context: str, depth: int) -> str:
-        """Build prompt for tree generation"""
+    def _build_prompt(self, seed_event: str, context: str, depth: int, path: Optional[List[str]] = None) -> str:
+        """Build prompt for tree generation (below depth 1, for the last event on path)"""
+        if depth > 1 and path:
+            return f"""Given this historical event and what followed it:
+
+Event: {seed_event}
+{f"Context: {context}" if context else ""}
+Path so far: {' → '.join(path)}
+Current event: {path[-1]}
+
+Predict the most likely outcomes of the current event over the following months. For each outcome, provide:
+- event: A specific, concrete event description
+- probability: Likelihood given the current event (all probabilities should sum to 1.0)
+- timeframe_months: Expected time until this event occurs
+
+Output a JSON array of outcomes, ordered by probability (highest first).
+
+Outcomes:"""
+
         prompt = f"""Given this historical event:
 
 Event: {seed_event}
@@ -190,32 +1025,10 @@ Outcomes:"""
 
     def _generate(self, model, prompt: str, max_new_tokens: int = 512) -> str:
         """Generate completion from model"""
-        import torch
+        return self._generate_batch(model, [prompt], max_new_tokens, adapter_names=self._row_adapters(1))[0]
 
-        inputs = self.tokenizer(prompt, return_tensors="pt").to(model.device)
-
-        with torch.no_grad():
-            outputs = model.generate(
-                **inputs,
-                max_new_tokens=max_new_tokens,
-                temperature=0.7,
-                do_sample=True,
-                pad_token_id=self.tokenizer.pad_token_id,
-            )
-
-        generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-
-        # Extract just the completion (after prompt)
-        completion = generated_text[len(prompt):]
-
-        return completion
-
-    def _parse_to_tree(self, seed_event: str, generation: str) -> Dict[str, Any]:
-        """
-        Parse generated JSON into tree structure
-
-        For now, simplified to depth 1 (just immediate outcomes)
-        """
+    def _parse_outcomes(self, generation: str) -> List[Dict[str, Any]]:
+        """Child nodes from a generated JSON array of outcomes ([] if unparseable)"""
         try:
             # Try to extract JSON from generation
             json_str = generation.strip()
@@ -226,36 +1039,44 @@ Outcomes:"""
             elif "```" in json_str:
                 json_str = json_str.split("```")[1].split("```")[0].strip()
 
-            outcomes = json.loads(json_str)
+            try:
+                outcomes = json.loads(json_str)
+            except json.JSONDecodeError:
+                # Cut off by max_new_tokens: keep the complete outcomes
+                from constrained_decoding import complete_outcomes
 
-            # Build tree structure
-            children = []
-            for outcome in outcomes:
-                children.append({
-                    "event": outcome.get("event", "Unknown event"),
-                    "probability": outcome.get("probability", 0.0),
-                    "timeframe_months": outcome.get("timeframe_months", 0),
-                    "children": [],  # Depth 1 only for now
-                })
+                salvaged = complete_outcomes(json_str)
+                if salvaged is None:
+                    raise
+                outcomes = json.loads(salvaged)
 
-            tree = {
-                "event": seed_event,
-                "probability": 1.0,
-                "children": children,
-            }
-
-            return tree
+            return [self._outcome_node(outcome) for outcome in outcomes]
 
         except Exception as e:
             print(f"⚠️  Failed to parse generation: {e}")
             print(f"Raw generation:\n{generation}")
+            return []
 
-            # Fallback: return minimal tree
-            return {
-                "event": seed_event,
-                "probability": 1.0,
-                "children": [],
-            }
+    def _outcome_node(self, outcome: Dict[str, Any]) -> Dict[str, Any]:
+        """Tree node for one generated outcome object"""
+        try:
+            probability = float(outcome.get("probability", 0.0))
+        except (TypeError, ValueError):
+            probability = 0.0
+        return {
+            "event": outcome.get("event", "Unknown event"),
+            "probability": probability,
+            "timeframe_months": outcome.get("timeframe_months", 0),
+            "children": [],
+        }
+
+    def _parse_to_tree(self, seed_event: str, generation: str) -> Dict[str, Any]:
+        """Parse generated JSON into a depth-1 tree (minimal tree if unparseable)"""
+        return {
+            "event": seed_event,
+            "probability": 1.0,
+            "children": self._parse_outcomes(generation),
+        }
 
 
 def demo_hot_swap():
@@ -313,4 +1134,8 @@ tree = inference.generate_tree(
     "Brexit vote passes",
     context="52% leave, 48% remain"
 )
+
+# Stream outcomes as they are generated
+for node in inference.stream_outcomes("Brexit vote passes"):
+    print(node["event"], node["probability"])
     """)
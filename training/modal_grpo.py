@@ -27,6 +27,7 @@ image = (
         "bitsandbytes>=0.41.0",
         "wandb>=0.16.0",
         "trl>=0.7.0",
+        "numpy",
     )
 )
 
@@ -37,6 +38,12 @@ image = (
     timeout=10800,  # 3 hours
     volumes={"/data": volume},
     secrets=[modal.Secret.from_name("huggingface-secret")],
+    # Calibration metrics shared with the evaluator (reward + per-epoch logging)
+    # and the outcome-JSON grammar used to constrain sampling
+    mounts=[
+        modal.Mount.from_local_file("training/evaluation/calibration.py", remote_path="/root/calibration.py"),
+        modal.Mount.from_local_file("training/constrained_decoding.py", remote_path="/root/constrained_decoding.py"),
+    ],
 )
 def train_grpo(
     sft_checkpoint: str = "/data/models/sft/final",
@@ -46,6 +53,7 @@ def train_grpo(
     learning_rate: float = 5e-4,
     num_epochs: int = 3,
     group_size: int = 4,
+    constrained_decoding: bool = True,
 ):
     """
     Train GRPO model with ultra-low rank LoRA
@@ -58,17 +66,22 @@ def train_grpo(
         learning_rate: Learning rate for RL
         num_epochs: Number of training epochs
         group_size: Number of trees to generate per seed (for group comparison)
+        constrained_decoding: Sample only schema-valid outcome JSON, so no
+            sample is lost to a parse failure
     """
     import torch
     from transformers import AutoModelForCausalLM, AutoTokenizer
     from peft import PeftModel, LoraConfig, get_peft_model, TaskType
     import wandb
+    from calibration import calibration_metrics
+    from constrained_decoding import JsonConstraint
 
     print(f"🚀 Starting GRPO training")
     print(f"  SFT Checkpoint: {sft_checkpoint}")
     print(f"  LoRA Rank: {lora_rank}")
     print(f"  Group Size: {group_size}")
     print(f"  Learning Rate: {learning_rate}")
+    print(f"  Constrained Decoding: {constrained_decoding}")
 
     # Initialize wandb
     try:
@@ -91,6 +104,7 @@ def train_grpo(
     tokenizer = AutoTokenizer.from_pretrained(base_model_name)
     if tokenizer.pad_token is None:
         tokenizer.pad_token = tokenizer.eos_token
+    constraint = JsonConstraint(tokenizer) if constrained_decoding else None
 
     # Load SFT model
     print(f"\n📥 Loading SFT checkpoint from {sft_checkpoint}...")
@@ -142,24 +156,26 @@ def train_grpo(
         print(f"{'='*60}\n")
 
         epoch_loss = 0.0
+        epoch_questions, epoch_groups = [], []
 
         for i, case in enumerate(cases):
-            # Generate group of trees
-            trees = []
-            for g in range(group_size):
-                tree = generate_tree_sample(
-                    model,
-                    tokenizer,
-                    case['seed_event'],
-                    case['context']
-                )
-                trees.append(tree)
+            # Generate group of trees (one shared prompt prefill for the whole group)
+            trees = generate_tree_group(
+                model,
+                tokenizer,
+                case['seed_event'],
+                case['context'],
+                group_size,
+                constraint
+            )
 
             # Score each tree
             scores = []
             for tree in trees:
                 score = compute_composite_score(tree, case)
                 scores.append(score)
+                epoch_questions.append(tree_question(tree, case))
+                epoch_groups.append(i)
 
             # GRPO: Compute advantages relative to group mean
             baseline_score = sum(scores) / len(scores)
@@ -182,8 +198,20 @@ def train_grpo(
         avg_epoch_loss = epoch_loss / len(cases)
         print(f"\n  Epoch {epoch + 1} Loss: {avg_epoch_loss:.4f}")
 
+        # Calibration of the sampled distributions (bootstrap over cases)
+        calibration = calibration_metrics(epoch_questions, groups=epoch_groups, n_bootstrap=200)
+        brier_low, brier_high = calibration.intervals.get("brier", [0.0, 0.0])
+        print(f"  Calibration: Brier {calibration.brier:.3f} [{brier_low:.3f}, {brier_high:.3f}], "
+              f"log loss {calibration.log_loss:.3f}, ECE {calibration.ece:.3f}")
+
         if wandb.run:
-            wandb.log({"epoch": epoch + 1, "loss": avg_epoch_loss})
+            wandb.log({
+                "epoch": epoch + 1,
+                "loss": avg_epoch_loss,
+                "calibration/brier": calibration.brier,
+                "calibration/log_loss": calibration.log_loss,
+                "calibration/ece": calibration.ece,
+            })
 
         # Save checkpoint
         checkpoint_dir = f"{output_dir}/epoch-{epoch+1}"
@@ -207,13 +235,20 @@ def train_grpo(
     }
 
 
-def generate_tree_sample(model, tokenizer, seed_event: str, context: str) -> dict:
+def generate_tree_group(model, tokenizer, seed_event: str, context: str, group_size: int, constraint=None) -> list:
     """
-    Generate a single tree sample
+    Generate a group of tree samples for one seed
+
+    The prompt is prefilled once and its KV cache repeated across the group,
+    so all samples decode from the same prefix instead of each re-encoding it.
+    With a constraint (constrained_decoding.JsonConstraint) every sample is a
+    valid outcome array and stops at its closing bracket.
 
-    Returns simplified tree structure with outcomes
+    Returns simplified tree structures with outcomes, one per sample
     """
+    import copy
     import torch
+    from constrained_decoding import generation_kwargs
 
     prompt = f"""Given this historical event:
 
@@ -226,20 +261,36 @@ Predict the most likely outcomes. Output a JSON array of outcomes with:
 
 Outcomes:"""
 
-    inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+    input_ids = tokenizer(prompt, return_tensors="pt")["input_ids"].to(model.device)
 
     with torch.no_grad():
+        # Prefill all but the last prompt token; generate starts from that token
+        past_key_values = model(input_ids=input_ids[:, :-1], use_cache=True).past_key_values
+        if hasattr(past_key_values, "batch_repeat_interleave"):
+            past_key_values = copy.deepcopy(past_key_values)
+            past_key_values.batch_repeat_interleave(group_size)
+        else:
+            past_key_values = tuple(
+                tuple(t.repeat_interleave(group_size, dim=0) for t in layer) for layer in past_key_values
+            )
+
         outputs = model.generate(
-            **inputs,
+            input_ids=input_ids.repeat(group_size, 1),
+            attention_mask=torch.ones_like(input_ids).repeat(group_size, 1),
+            past_key_values=past_key_values,
             max_new_tokens=256,
             temperature=0.8,
             do_sample=True,
+            pad_token_id=tokenizer.pad_token_id or tokenizer.eos_token_id,
+            **generation_kwargs(constraint),
         )
 
-    generated = tokenizer.decode(outputs[0], skip_special_tokens=True)
-    completion = generated[len(prompt):]
+    completions = tokenizer.batch_decode(outputs[:, input_ids.shape[1]:], skip_special_tokens=True)
+    return [parse_tree_sample(seed_event, completion) for completion in completions]
 
-    # Parse (simplified)
+
+def parse_tree_sample(seed_event: str, completion: str) -> dict:
+    """Parse a generated completion into a simplified tree ({seed_event, outcomes})"""
     try:
         # Extract JSON
         json_str = completion.strip()
@@ -248,7 +299,12 @@ Outcomes:"""
             if json_str.startswith("json"):
                 json_str = json_str[4:].strip()
 
-        outcomes = json.loads(json_str)
+        try:
+            outcomes = json.loads(json_str)
+        except json.JSONDecodeError:
+            # Cut off by max_new_tokens: keep the complete outcomes
+            from constrained_decoding import complete_outcomes
+            outcomes = json.loads(complete_outcomes(json_str))
 
         return {
             "seed_event": seed_event,
@@ -262,36 +318,69 @@ Outcomes:"""
         }
 
 
+def _outcome_probability(outcome: dict) -> float:
+    """Numeric probability of a generated outcome (0 if missing or malformed)"""
+    try:
+        return max(float(outcome.get('probability', 0.0)), 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def tree_question(tree: dict, ground_truth: dict):
+    """
+    Calibration question for a sampled (depth-1) tree
+
+    Returns (outcome probabilities, index of the outcome matching the actual
+    depth-1 event or -1), as used by calibration.calibration_metrics.
+    """
+    outcomes = tree.get('outcomes', [])
+    probs = [_outcome_probability(o) for o in outcomes]
+    actual = next((e['event'] for e in ground_truth['outcome_chain'] if e.get('depth', 1) == 1), None)
+
+    matched = -1
+    if actual is not None and outcomes:
+        similarities = [jaccard_similarity(actual, o.get('event', '')) for o in outcomes]
+        best = max(range(len(outcomes)), key=similarities.__getitem__)
+        if similarities[best] > 0.5:
+            matched = best
+
+    return probs, matched
+
+
 def compute_composite_score(tree: dict, ground_truth: dict) -> float:
     """
     Compute composite score for a tree
 
     Combines:
-    - Calibration: Did it predict what happened?
+    - Calibration: Proper multi-class Brier score of the outcome distribution
     - Sharpness: Confident probabilities?
     - Diversity: Different scenarios?
+
+    Both probability terms score the outcomes renormalized to sum to 1.
+    Scored raw, a sample could lower its Brier (unmatched mass counts as
+    "other", which is usually what happened) and its entropy just by
+    emitting near-zero probabilities.
     """
     import math
+    from calibration import question_scores
 
     outcomes = tree.get('outcomes', [])
-    actual_events = [e['event'] for e in ground_truth['outcome_chain']]
 
     if not outcomes:
         return 0.0
 
-    # 1. Calibration: Did we predict actual events?
-    calibration_score = 0.0
-    for actual in actual_events:
-        # Simple match: check if any predicted event is similar
-        for outcome in outcomes:
-            if jaccard_similarity(actual, outcome.get('event', '')) > 0.5:
-                prob = outcome.get('probability', 0.0)
-                calibration_score += prob
+    raw_probs, matched = tree_question(tree, ground_truth)
+    total = sum(raw_probs)
+    if total <= 0:
+        return 0.3 * min(len(outcomes) / 4.0, 1.0)  # Diversity only: no distribution to score
+    probs = [p / total for p in raw_probs]
 
-    calibration_score /= max(len(actual_events), 1)
+    # 1. Calibration: 1 - Brier/2 over the normalized outcomes, so
+    # probability on events that did not happen is penalised too
+    brier, _ = question_scores([(probs, matched)])
+    calibration_score = 1.0 - float(brier[0]) / 2.0
 
     # 2. Sharpness: Entropy (lower is sharper)
-    probs = [o.get('probability', 0.0) for o in outcomes]
     probs = [p for p in probs if p > 0]
 
     if probs:
@@ -19,12 +19,18 @@ from modal_sft import image
     timeout=600,
     volumes={"/data": volume},
     secrets=[modal.Secret.from_name("huggingface-secret")],
+    mounts=[modal.Mount.from_local_file("training/constrained_decoding.py", remote_path="/root/constrained_decoding.py")],
 )
-def test_inference():
-    """Load trained adapter and generate predictions for a test case"""
+def test_inference(constrained: bool = True):
+    """Load trained adapter and generate predictions for a test case
+
+    Args:
+        constrained: Decode with the outcome-JSON grammar (constrained_decoding.py)
+    """
     import os
     from unsloth import FastLanguageModel
     import torch
+    from constrained_decoding import JsonConstraint, complete_outcomes, generation_kwargs
 
     # Handle HF token
     hf_token = os.environ.get("HF_TOKEN") or os.environ.get("HUGGING_FACE_HUB_TOKEN")
@@ -104,21 +110,26 @@ Output JSON only:
     print("="*80)
 
     inputs = tokenizer(test_prompt, return_tensors="pt").to(model.device)
+    constraint = JsonConstraint(tokenizer) if constrained else None
 
     with torch.no_grad():
         outputs = model.generate(
             **inputs,
-            max_new_tokens=1024,  # Let it generate fully, hoping for JSON at end
+            # Constrained output stops at the closing bracket; unconstrained
+            # output needs room in case the JSON comes after some prose
+            max_new_tokens=512 if constrained else 1024,
             temperature=0.7,
             do_sample=True,
             pad_token_id=tokenizer.pad_token_id,
             eos_token_id=tokenizer.eos_token_id,
+            **generation_kwargs(constraint),
         )
 
-    generated_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
+    new_tokens = outputs[0, inputs["input_ids"].shape[1]:]
+    print(f"\n🔢 Generated {len(new_tokens)} tokens")
 
     # Extract completion (after prompt)
-    completion = generated_text[len(test_prompt):]
+    completion = tokenizer.decode(new_tokens, skip_special_tokens=True)
 
     print("\n" + "="*80)
     print("MODEL OUTPUT (RAW):")
@@ -144,7 +155,14 @@ Output JSON only:
         if start != -1 and end > start:
             json_str = json_str[start:end]
 
-        predictions = json.loads(json_str)
+        try:
+            predictions = json.loads(json_str)
+        except json.JSONDecodeError:
+            # Cut off by max_new_tokens: keep the complete predictions
+            salvaged = complete_outcomes(json_str)
+            if salvaged is None:
+                raise
+            predictions = json.loads(salvaged)
 
         print("\n✅ Successfully parsed predictions!\n")
 
@@ -178,9 +196,9 @@ Output JSON only:
 
 
 @app.local_entrypoint()
-def main():
-    """Run inference test"""
-    predictions = test_inference.remote()
+def main(unconstrained: bool = False):
+    """Run inference test (--unconstrained for free-form decoding)"""
+    predictions = test_inference.remote(constrained=not unconstrained)
 
     print("\n" + "="*80)
     print("INFERENCE TEST COMPLETE")
@@ -68,93 +68,120 @@ def train_grpo(lora_rank: int = 4):
     )
 
 
+def predicted_case_ids(output_path: str) -> set:
+    """case_ids already in a predictions JSONL (a torn last line is truncated)"""
+    path = Path(output_path)
+    if not path.exists():
+        return set()
+
+    data = path.read_bytes()
+    end = data.rfind(b"\n") + 1
+    if end < len(data):
+        with open(path, 'r+b') as f:
+            f.truncate(end)
+    return {json.loads(line)['case_id'] for line in data[:end].splitlines() if line.strip()}
+
+
+def predictions_signature_matches(output_path: str, signature: dict) -> bool:
+    """
+    Whether a predictions JSONL was generated with these settings
+
+    If not, the file is truncated and the new signature written next to it
+    ({output_path}.signature.json), so it is regenerated from scratch.
+    """
+    signature_path = Path(output_path + '.signature.json')
+    if signature_path.exists() and json.loads(signature_path.read_text()) == signature:
+        return True
+
+    if Path(output_path).exists():
+        print(f"  ⚠️  {output_path} was generated with other settings; regenerating")
+    open(output_path, 'w').close()
+    signature_path.write_text(json.dumps(signature, indent=2))
+    return False
+
+
+def predict_to_jsonl(inference, cases_path: str, output_path: str, max_depth: int = 3, chunk_size: int = 256):
+    """
+    Generate a tree per test case, streaming {case_id, tree} lines to disk
+
+    Resumes an interrupted run: if output_path was written with the same
+    generation settings (inference.generation_signature() and max_depth),
+    cases already in it are skipped and new lines are appended, so earlier
+    predictions (and an evaluation checkpoint over them) stay valid. Otherwise
+    (e.g. a retrained adapter) it is regenerated.
+    """
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    signature = {**inference.generation_signature(), 'max_depth': max_depth}
+    done = predicted_case_ids(output_path) if predictions_signature_matches(output_path, signature) else set()
+    if done:
+        print(f"  ♻️  {len(done)} predictions already in {output_path}")
+
+    def write_chunk(chunk, out):
+        trees = inference.generate_trees_batch(
+            [(case['seed_event'], case['context']) for case in chunk],
+            max_depth=max_depth
+        )
+        for case, tree in zip(chunk, trees):
+            out.write(json.dumps({"case_id": case['case_id'], "tree": tree}) + "\n")
+
+    # Cases are read and generated a chunk at a time (batched generate calls)
+    with open(cases_path) as cases, open(output_path, 'a') as out:
+        chunk = []
+        for line in cases:
+            case = json.loads(line)
+            if case['case_id'] in done:
+                continue
+            chunk.append(case)
+            if len(chunk) == chunk_size:
+                write_chunk(chunk, out)
+                chunk = []
+        if chunk:
+            write_chunk(chunk, out)
+
+
 def evaluate_models():
     """Step 4: Evaluate all models"""
     print("\n📈 Step 4: Evaluating Models")
     print("-" * 60)
 
-    from evaluation.evaluator import TreeEvaluator, print_metrics, save_metrics
+    from evaluation.evaluator import TreeEvaluator, print_metrics
+    from evaluation.stream_eval import stream_evaluate
     from inference import ProbabilityTreeInference
 
-    # Load test cases
-    test_cases = []
-    with open("training/data/synthetic_cases.jsonl") as f:
-        for line in f:
-            test_cases.append(json.loads(line))
-
-    print(f"  Loaded {len(test_cases)} test cases")
+    # Test cases and predictions are streamed from/to JSONL, never held in memory
+    test_cases_path = "training/data/synthetic_cases.jsonl"
 
     # Initialize inference engine
     inference = ProbabilityTreeInference()
     evaluator = TreeEvaluator(use_llm_matcher=False)
 
     results = {}
-
-    # Evaluate baseline
-    print("\n  Evaluating baseline...")
-    inference.load_adapter(None)
-
-    baseline_preds = []
-    for case in test_cases:
-        tree = inference.generate_tree(
-            seed_event=case['seed_event'],
-            context=case['context']
-        )
-        baseline_preds.append(tree)
-
-    baseline_metrics = evaluator.evaluate_batch(
-        baseline_preds,
-        test_cases,
-        model_name="baseline"
-    )
-
-    results['baseline'] = baseline_metrics
-    print_metrics(baseline_metrics)
-    save_metrics(baseline_metrics, "training/results/baseline_metrics.json")
-
-    # Evaluate SFT
-    print("\n  Evaluating SFT model...")
-    inference.load_adapter("/data/models/sft/final", "sft")
-
-    sft_preds = []
-    for case in test_cases:
-        tree = inference.generate_tree(
-            seed_event=case['seed_event'],
-            context=case['context']
-        )
-        sft_preds.append(tree)
-
-    sft_metrics = evaluator.evaluate_batch(
-        sft_preds,
-        test_cases,
-        model_name="sft"
-    )
-
-    results['sft'] = sft_metrics
-    print_metrics(sft_metrics)
-    save_metrics(sft_metrics, "training/results/sft_metrics.json")
-
-    # Evaluate GRPO
-    print("\n  Evaluating GRPO model...")
-    inference.load_adapter("/data/models/grpo/final", "grpo")
-
-    grpo_preds = []
-    for case in test_cases:
-        tree = inference.generate_tree(
-            seed_event=case['seed_event'],
-            context=case['context']
+    models = [
+        ("baseline", None),
+        ("sft", "/data/models/sft/final"),
+        ("grpo", "/data/models/grpo/final"),
+    ]
+
+    for name, adapter_path in models:
+        print(f"\n  Evaluating {name}...")
+        if adapter_path:
+            inference.load_adapter(adapter_path, name)
+        else:
+            inference.load_adapter(None)
+
+        predictions_path = f"training/results/{name}_predictions.jsonl"
+        predict_to_jsonl(inference, test_cases_path, predictions_path)
+
+        metrics = stream_evaluate(
+            predictions_path,
+            test_cases_path,
+            f"training/results/{name}_metrics.json",
+            model_name=name,
+            evaluator=evaluator
         )
-        grpo_preds.append(tree)
-
-    grpo_metrics = evaluator.evaluate_batch(
-        grpo_preds,
-        test_cases,
-        model_name="grpo"
-    )
 
-    results['grpo'] = grpo_metrics
-    print_metrics(grpo_metrics)
-    save_metrics(grpo_metrics, "training/results/grpo_metrics.json")
+        results[name] = metrics
+        print_metrics(metrics)
 
     return results
 